@@ -6,37 +6,45 @@ Add a detailed status property to the Notion database with
 
 import json
 import os
-import requests
-import time
 from typing import Dict, List, Optional, Any
 from dotenv import load_dotenv
 
+from services.mutation_buffer import MutationBuffer
+from services.notion_client import get_notion_client, iter_database_pages
+from services.schema import get_schema_cache
+
 load_dotenv()
 
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
-NOTION_VERSION = "2022-06-28"
-NOTION_BASE = "https://api.notion.com/v1"
+
+notion = get_notion_client()
 
 # The enhanced database ID
 ENHANCED_DB_ID = "2600693c-0443-81cc-ac0e-e94f2fa52616"
 
-def notion_headers() -> Dict[str, str]:
-    return {
-        "Authorization": f"Bearer {NOTION_TOKEN}",
-        "Notion-Version": NOTION_VERSION,
-        "Content-Type": "application/json",
+# Status 1 property with the three progress options
+STATUS_PROPERTY = {
+    "status": {
+        "options": [
+            {
+                "name": "Not started",
+                "color": "gray"
+            },
+            {
+                "name": "In progress", 
+                "color": "blue"
+            },
+            {
+                "name": "Done",
+                "color": "green"
+            }
+        ]
     }
+}
 
 def get_database_info():
-    """Get current database structure."""
-    url = f"{NOTION_BASE}/databases/{ENHANCED_DB_ID}"
-    response = requests.get(url, headers=notion_headers())
-    
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"❌ Failed to get database: {response.status_code}")
-        return None
+    """Get current database structure (served from the schema cache)."""
+    return get_schema_cache().get(ENHANCED_DB_ID)
 
 def add_detailed_status_property():
     """Add a detailed status property with proper options."""
@@ -56,90 +64,85 @@ def add_detailed_status_property():
     
     # Add Status 1 property with proper status options
     new_properties = current_properties.copy()
-    new_properties["Status 1"] = {
-        "status": {
-            "options": [
-                {
-                    "name": "Not started",
-                    "color": "gray"
-                },
-                {
-                    "name": "In progress", 
-                    "color": "blue"
-                },
-                {
-                    "name": "Done",
-                    "color": "green"
-                }
-            ]
-        }
-    }
+    new_properties["Status 1"] = STATUS_PROPERTY
     
     # Update database
-    url = f"{NOTION_BASE}/databases/{ENHANCED_DB_ID}"
+    path = f"databases/{ENHANCED_DB_ID}"
     payload = {"properties": new_properties}
     
-    response = requests.patch(url, headers=notion_headers(), json=payload)
+    response = notion.patch(path, json=payload)
     if response.status_code == 200:
+        get_schema_cache().invalidate(ENHANCED_DB_ID)
         print("✅ Added Status 1 property with status options!")
         return True
     else:
         print(f"❌ Failed to add Status 1 property: {response.status_code} - {response.text}")
         return False
 
-def get_all_pages():
-    """Get all pages from the database."""
-    url = f"{NOTION_BASE}/databases/{ENHANCED_DB_ID}/query"
-    payload = {"page_size": 100}
+def set_default_status_for_all_pages(buffer: Optional[MutationBuffer] = None):
+    """Set default status to 'Not started' for all pages.
     
-    response = requests.post(url, headers=notion_headers(), json=payload)
-    if response.status_code == 200:
-        return response.json().get("results", [])
-    else:
-        print(f"❌ Failed to query database: {response.status_code}")
-        return []
-
-def set_default_status_for_all_pages():
-    """Set default status to 'Not started' for all pages."""
+    With a ``buffer`` the updates are queued for the caller to flush instead of sent.
+    """
     print("📄 Setting default status for all pages...")
     
-    pages = get_all_pages()
-    if not pages:
-        print("❌ No pages found")
-        return False
-    
-    print(f"📊 Found {len(pages)} pages to update")
-    
+    # Only rows without a status yet (every row while the property is still being planned),
+    # and only the Week column for display
+    db_info = get_database_info() or {}
+    has_status = "Status 1" in db_info.get("properties", {})
+    pages = iter_database_pages(
+        ENHANCED_DB_ID,
+        filter={"property": "Status 1", "status": {"is_empty": True}} if has_status else None,
+        filter_properties=["Week"],
+    )
+    
+    page_count = 0
     success_count = 0
-    for page in pages:
-        page_id = page["id"]
-        properties = page.get("properties", {})
-        
-        # Get week number for display
-        week_num = "?"
-        if "Week" in properties and properties["Week"].get("number"):
-            week_num = properties["Week"]["number"]
-        
-        # Update page with default status
-        url = f"{NOTION_BASE}/pages/{page_id}"
-        payload = {
-            "properties": {
-                "Status 1": {
-                    "status": {"name": "Not started"}
+    try:
+        for page in pages:
+            page_count += 1
+            page_id = page["id"]
+            properties = page.get("properties", {})
+            
+            # Get week number for display
+            week_num = "?"
+            if "Week" in properties and properties["Week"].get("number"):
+                week_num = properties["Week"]["number"]
+            
+            # Update page with default status
+            path = f"pages/{page_id}"
+            payload = {
+                "properties": {
+                    "Status 1": {
+                        "status": {"name": "Not started"}
+                    }
                 }
             }
-        }
-        
-        response = requests.patch(url, headers=notion_headers(), json=payload)
-        if response.status_code == 200:
-            success_count += 1
-            print(f"   ✅ Set Week {week_num} to 'Not started'")
-        else:
-            print(f"   ❌ Failed Week {week_num}: {response.status_code}")
-        
-        time.sleep(0.2)  # Rate limiting
+            
+            if buffer is not None:
+                buffer.add(page_id, payload["properties"], week=week_num if week_num != "?" else None)
+                success_count += 1
+                continue
+            
+            response = notion.patch(path, json=payload)
+            if response.status_code == 200:
+                success_count += 1
+                print(f"   ✅ Set Week {week_num} to 'Not started'")
+            else:
+                print(f"   ❌ Failed Week {week_num}: {response.status_code}")
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return False
+    
+    if not page_count:
+        print("✅ Every page already has a status! No updates needed.")
+        return True
+    
+    if buffer is not None:
+        print(f"📦 Queued default status for {success_count} pages")
+        return True
     
-    print(f"\n🎉 Successfully updated {success_count}/{len(pages)} pages!")
+    print(f"\n🎉 Successfully updated {success_count}/{page_count} pages!")
     return success_count > 0
 
 def main():
@@ -3,31 +3,32 @@
 Parse CSV file and add daily subtasks to each week in Notion database.
 Ignores Week, Topic, Resources columns as requested.
 Uses Day, Learning, Deliverable, Task columns to create subtasks.
+
+Each day becomes a checkable to_do block inside the week's page, appended
+through the Blocks API in one request per week (up to 100 days).
 """
 
 import csv
-import json
 import os
-import requests
-import time
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dotenv import load_dotenv
 
+from config import Config
+from services.concurrency import TaskResult, run_ordered
+from services.journal import MutationJournal
+from services.notion_client import MAX_TEXT_LENGTH, get_notion_client
+
 load_dotenv()
 
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
-NOTION_VERSION = "2022-06-28"
-NOTION_BASE = "https://api.notion.com/v1"
+
+notion = get_notion_client()
 
 # The enhanced database ID
 ENHANCED_DB_ID = "2600693c-0443-81cc-ac0e-e94f2fa52616"
 
-def notion_headers() -> Dict[str, str]:
-    return {
-        "Authorization": f"Bearer {NOTION_TOKEN}",
-        "Notion-Version": NOTION_VERSION,
-        "Content-Type": "application/json",
-    }
+# Text prefix that marks the to_do blocks this importer creates
+SUBTASK_PREFIX = "📅 Day"
 
 def parse_csv_file(filename: str) -> Dict[int, List[Dict[str, str]]]:
     """Parse CSV file and group by week number."""
@@ -55,89 +56,104 @@ def parse_csv_file(filename: str) -> Dict[int, List[Dict[str, str]]]:
     
     return week_data
 
-def get_all_pages(db_id: str) -> List[Dict[str, Any]]:
-    """Get all pages from a database."""
-    url = f"{NOTION_BASE}/databases/{db_id}/query"
-    payload = {"page_size": 100}
-    
-    response = requests.post(url, headers=notion_headers(), json=payload)
-    if response.status_code == 200:
-        return response.json().get("results", [])
-    else:
-        print(f"❌ Failed to query database: {response.status_code}")
-        return []
-
-def add_subtasks_property_to_database():
-    """Add a Subtasks property to the database if it doesn't exist."""
-    url = f"{NOTION_BASE}/databases/{ENHANCED_DB_ID}"
-    
-    # Get current database structure
-    response = requests.get(url, headers=notion_headers())
-    if response.status_code != 200:
-        print(f"❌ Could not get database: {response.status_code}")
-        return False
-    
-    db_info = response.json()
-    current_properties = db_info.get("properties", {})
-    
-    # Check if Subtasks property already exists
-    if "Subtasks" in current_properties:
-        print("✅ Subtasks property already exists!")
-        return True
-    
-    # Add Subtasks property as rich_text
-    new_properties = current_properties.copy()
-    new_properties["Subtasks"] = {"rich_text": {}}
-    
-    payload = {"properties": new_properties}
-    
-    response = requests.patch(url, headers=notion_headers(), json=payload)
-    if response.status_code == 200:
-        print("✅ Added Subtasks property to database!")
-        return True
-    else:
-        print(f"❌ Failed to add Subtasks property: {response.status_code} - {response.text}")
-        return False
+def text_item(content: str) -> Dict[str, Any]:
+    """Rich text item, truncated to Notion's per-item limit."""
+    return {"type": "text", "text": {"content": content[:MAX_TEXT_LENGTH]}}
 
-def format_subtasks_content(subtasks: List[Dict[str, str]]) -> str:
-    """Format subtasks into a readable text format."""
-    content_lines = []
+def build_subtask_blocks(subtasks: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """One unchecked to_do block per day, with the learning goal and deliverable nested under it."""
+    blocks = []
     
     for subtask in sorted(subtasks, key=lambda x: x['day']):
-        day_num = subtask['day']
-        learning = subtask['learning']
-        deliverable = subtask['deliverable']
-        task = subtask['task']
-        
-        # Format each day's content
-        day_content = f"📅 Day {day_num}: {task}\n"
-        day_content += f"   🎯 Learning: {learning}\n"
-        day_content += f"   📋 Deliverable: {deliverable}\n"
-        
-        content_lines.append(day_content)
-    
-    return "\n".join(content_lines)
+        blocks.append({
+            "object": "block",
+            "type": "to_do",
+            "to_do": {
+                "rich_text": [text_item(f"{SUBTASK_PREFIX} {subtask['day']}: {subtask['task']}")],
+                "checked": False,
+                "children": [
+                    {"object": "block", "type": "paragraph",
+                     "paragraph": {"rich_text": [text_item(f"🎯 Learning: {subtask['learning']}")]}},
+                    {"object": "block", "type": "paragraph",
+                     "paragraph": {"rich_text": [text_item(f"📋 Deliverable: {subtask['deliverable']}")]}},
+                ],
+            },
+        })
+    
+    return blocks
 
-def update_page_with_subtasks(page_id: str, subtasks_content: str) -> bool:
-    """Update a page with subtasks content."""
-    url = f"{NOTION_BASE}/pages/{page_id}"
-    payload = {
-        "properties": {
-            "Subtasks": {
-                "rich_text": [{"type": "text", "text": {"content": subtasks_content}}]
-            }
-        }
-    }
-    
-    response = requests.patch(url, headers=notion_headers(), json=payload)
-    if response.status_code == 200:
-        return True
-    else:
-        print(f"❌ Failed to update page: {response.status_code} - {response.text}")
-        return False
+def has_subtask_checklist(page_id: str) -> bool:
+    """Check whether a page already carries an imported checklist."""
+    for block in notion.iter_block_children(page_id):
+        if block.get("type") == "to_do":
+            text = "".join(item.get("plain_text", "") for item in block["to_do"].get("rich_text", []))
+            if text.startswith(SUBTASK_PREFIX):
+                return True
+    return False
+
+def subtask_ledger(db_id: str = ENHANCED_DB_ID) -> MutationJournal:
+    """Journal of checklists already appended to each page.
+    
+    It is kept after the import finishes: appending blocks is not idempotent,
+    so the ledger is what lets re-runs skip finished weeks without reading
+    their blocks.
+    """
+    return MutationJournal(f"subtask-blocks-{db_id}")
+
+def plan_subtask_blocks(week_data: Dict[int, List[Dict[str, str]]], db_id: str = ENHANCED_DB_ID,
+                        ledger: Optional[MutationJournal] = None) -> Optional[List[Tuple[int, str, List[Dict[str, Any]]]]]:
+    """Return (week, page_id, blocks) for every week whose page still needs its checklist
+    (None when the week pages could not be looked up).
+    
+    Weeks the ledger has not acknowledged are checked against the page itself,
+    so a lost or fresh ledger (another machine, a deleted .journal) never leads
+    to a second checklist being appended.
+    """
+    ledger = ledger or subtask_ledger(db_id)
+    try:
+        page_ids = notion.find_pages_by_number(db_id, "Week", week_data.keys())
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return None
+    
+    missing = sorted(set(week_data) - set(page_ids))
+    if missing:
+        print(f"⚠️  No page found for weeks: {missing}")
+    
+    plan = []
+    for week_num in sorted(page_ids):
+        page_id = page_ids[week_num]
+        key = f"blocks:{page_id}"
+        if ledger.done(key):
+            continue
+        # The append may have landed without this ledger knowing (a run that died
+        # mid-request, or one from another checkout); look before sending
+        if has_subtask_checklist(page_id):
+            ledger.ack(key, True)
+            continue
+        plan.append((week_num, page_id, build_subtask_blocks(week_data[week_num])))
+    return plan
+
+def append_subtask_blocks(plan: List[Tuple[int, str, List[Dict[str, Any]]]],
+                          ledger: MutationJournal, max_workers: Optional[int] = None) -> List[TaskResult]:
+    """Append the planned checklists, several weeks in flight under the shared rate limiter."""
+    def append(item: Tuple[int, str, List[Dict[str, Any]]]) -> int:
+        week_num, page_id, blocks = item
+        return ledger.once(f"blocks:{page_id}", lambda: notion.append_block_children(page_id, blocks),
+                           data={"week": week_num, "count": len(blocks)})
+    
+    results = run_ordered(append, plan, max_workers or Config.NOTION_MAX_WORKERS)
+    for result in results:
+        week_num, _, blocks = result.item
+        if result.ok:
+            print(f"   ✅ Week {week_num}: {len(blocks)} subtasks ({result.value} request(s))")
+        else:
+            print(f"   ❌ Failed Week {week_num}: {result.error}")
+    ledger.close()
+    return results
 
-def add_subtasks_to_notion(csv_filename: str):
-    """Main function to add subtasks from CSV to Notion pages."""
+def add_subtasks_to_notion(csv_filename: str, db_id: str = ENHANCED_DB_ID, confirm: bool = True) -> bool:
+    """Main function to add subtasks from CSV to Notion pages as checklists."""
     print("📊 Parsing CSV file...")
     week_data = parse_csv_file(csv_filename)
     
@@ -145,66 +161,43 @@ def add_subtasks_to_notion(csv_filename: str):
     for week_num in sorted(week_data.keys())[:5]:  # Show first 5 weeks
         print(f"   Week {week_num}: {len(week_data[week_num])} days")
     
-    print("\n🔍 Getting Notion pages...")
-    pages = get_all_pages(ENHANCED_DB_ID)
-    
-    if not pages:
-        print("❌ No pages found in database")
+    print("\n🔍 Finding week pages that still need a checklist...")
+    ledger = subtask_ledger(db_id)
+    plan = plan_subtask_blocks(week_data, db_id, ledger)
+    if plan is None:
+        ledger.close()
         return False
     
-    # Create mapping of week number to page ID
-    week_to_page = {}
-    for page in pages:
-        properties = page.get("properties", {})
-        if "Week" in properties and properties["Week"].get("number"):
-            week_num = properties["Week"]["number"]
-            week_to_page[week_num] = page["id"]
-    
-    print(f"📋 Found {len(week_to_page)} weeks in Notion database")
+    if not plan:
+        print("✅ All weeks already have their subtask checklists! No updates needed.")
+        return True
     
     # Show preview of what will be added
     print("\n📝 Preview of subtasks to be added:")
-    for week_num in sorted(list(week_data.keys())[:3]):  # Show first 3 weeks
-        if week_num in week_to_page:
-            subtasks = week_data[week_num]
-            print(f"\n   Week {week_num} ({len(subtasks)} days):")
-            for i, subtask in enumerate(subtasks[:2]):  # Show first 2 days
-                print(f"     Day {subtask['day']}: {subtask['task'][:50]}...")
-            if len(subtasks) > 2:
-                print(f"     ... and {len(subtasks) - 2} more days")
-    
-    # Ask for confirmation
-    total_weeks = len([w for w in week_data.keys() if w in week_to_page])
-    confirm = input(f"\n❓ Add subtasks to {total_weeks} weeks? (y/N): ").lower().strip()
-    if confirm != 'y':
-        print("👋 Cancelled.")
-        return False
-    
-    print("\n🚀 Adding subtasks to Notion pages...")
-    success_count = 0
-    
-    for week_num in sorted(week_data.keys()):
-        if week_num not in week_to_page:
-            print(f"   ⚠️  Week {week_num} not found in Notion database")
-            continue
-        
-        page_id = week_to_page[week_num]
+    for week_num, _, _ in plan[:3]:  # Show first 3 weeks
         subtasks = week_data[week_num]
-        
-        # Format subtasks content
-        subtasks_content = format_subtasks_content(subtasks)
-        
-        print(f"   📝 Adding subtasks to Week {week_num} ({len(subtasks)} days)...")
-        if update_page_with_subtasks(page_id, subtasks_content):
-            success_count += 1
-            print(f"   ✅ Updated Week {week_num}")
-        else:
-            print(f"   ❌ Failed Week {week_num}")
-        
-        time.sleep(0.3)  # Rate limiting
+        print(f"\n   Week {week_num} ({len(subtasks)} days):")
+        for i, subtask in enumerate(subtasks[:2]):  # Show first 2 days
+            print(f"     ☐ Day {subtask['day']}: {subtask['task'][:50]}...")
+        if len(subtasks) > 2:
+            print(f"     ... and {len(subtasks) - 2} more days")
     
-    print(f"\n🎉 Successfully added subtasks to {success_count} weeks!")
-    print(f"🔗 Check your database: https://www.notion.so/{ENHANCED_DB_ID.replace('-', '')}")
+    # Ask for confirmation
+    if confirm:
+        answer = input(f"\n❓ Add subtask checklists to {len(plan)} weeks? (y/N): ").lower().strip()
+        if answer != 'y':
+            print("👋 Cancelled.")
+            return False
+    
+    print("\n🚀 Adding subtask checklists to Notion pages...")
+    results = append_subtask_blocks(plan, ledger)
+    success_count = sum(1 for r in results if r.ok)
+    request_count = sum(r.value for r in results if r.ok)
+    
+    print(f"\n🎉 Added checklists to {success_count} weeks in {request_count} append requests!")
+    if success_count < len(results):
+        print("⚠️  Re-run to retry the failed weeks")
+    print(f"🔗 Check your database: https://www.notion.so/{db_id.replace('-', '')}")
     
     return success_count > 0
 
@@ -212,7 +205,7 @@ def main():
     """Main function."""
     print("📋 CSV Subtasks Importer for Notion")
     print("=" * 50)
-    print("This will add daily subtasks from CSV to your Notion database")
+    print("This will add daily subtasks from CSV to your Notion database as checklists")
     print(f"Target database: {ENHANCED_DB_ID}")
     print("Ignoring columns: Week, Topic, Resources")
     print("Using columns: Day, Learning, Deliverable, Task")
@@ -228,14 +221,6 @@ def main():
         print(f"❌ CSV file not found: {csv_filename}")
         return
     
-    # Step 1: Add Subtasks property if needed
-    print("📋 Step 1: Adding Subtasks property to database...")
-    if not add_subtasks_property_to_database():
-        print("❌ Failed to add Subtasks property. Aborting.")
-        return
-    
-    # Step 2: Add subtasks from CSV
-    print("\n📝 Step 2: Adding subtasks from CSV...")
     add_subtasks_to_notion(csv_filename)
 
 if __name__ == "__main__":
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark: the full bootstrap against the local Notion and GitHub stand-ins.
+
+Starts notion_standin and github_standin in-process, points NOTION_BASE and
+GITHUB_API at them and runs the same stages as bootstrap_roadmap.main() (GitHub
+repos + scaffolds, Notion database, week pages, local folders) in a scratch
+directory. Reports wall time, request counts, 4xx/5xx responses (including the
+404s of existence checks), server-side p50/p99 latencies and the time the
+client spent on its own rate limiter per stage and service, then the
+client-side metrics summary. --rerun times a second, idempotent pass against
+the now-populated stand-ins.
+
+Usage: python benchmarks/bench_bootstrap.py [--notion-latency S] [--github-latency S]
+           [--notion-rate R] [--writes-per-minute N] [--rerun] [--verbose]
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from github_standin import GitHubStandIn  # noqa: E402
+from notion_standin import NotionStandIn  # noqa: E402
+
+PARENT_PAGE_ID = "parent-page"
+
+def percentile(values, pct):
+    """Nearest-rank percentile (0 for no values)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+def summarize(records, started, finished, waited):
+    """Requests, errors, p50 and p99 (ms) for the records that arrived in [started, finished],
+    plus the seconds the client spent waiting on its own limiter."""
+    window = [r for r in records if started <= r.started <= finished]
+    seconds = [r.seconds for r in window]
+    return (len(window), sum(1 for r in window if r.status >= 400),
+            percentile(seconds, 50) * 1000, percentile(seconds, 99) * 1000, waited)
+
+def limiter_waits():
+    from services.metrics import get_metrics
+    return {service: totals["limiter_wait_seconds"] for service, totals in get_metrics().services().items()}
+
+def run_bootstrap(servers, verbose):
+    """Run the bootstrap stages in order; return [(stage, seconds, {service: summary})]."""
+    import bootstrap_roadmap as bootstrap
+    from services.journal import MutationJournal
+    
+    journal = MutationJournal("bootstrap")
+    state = {}
+    stages = [
+        ("github repos", lambda: state.update(repo_urls=bootstrap.ensure_github_repos(journal))),
+        ("notion database", lambda: state.update(db_id=bootstrap.journaled(
+            journal, "notion:database", bootstrap.ensure_notion_database))),
+        ("notion weeks", lambda: state.update(ok=bootstrap.add_weeks_to_notion(
+            state["db_id"], bootstrap.build_weeks(), state["repo_urls"], journal))),
+        ("local folders", bootstrap.ensure_local_scaffolds),
+    ]
+    
+    results = []
+    for name, fn in stages:
+        out = io.StringIO()
+        waits_before = limiter_waits()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stdout if verbose else out):
+            fn()
+        finished = time.perf_counter()
+        waits = limiter_waits()
+        results.append((name, finished - started, {
+            service: summarize(server.records, started, finished,
+                               waits.get(service, 0.0) - waits_before.get(service, 0.0))
+            for service, server in servers.items()}))
+    
+    if state.get("ok") and not journal.pending():
+        journal.complete()
+    else:
+        journal.close()
+    return results
+
+def print_report(title, results):
+    print(f"\n📊 {title}")
+    print(f"   {'stage':<16} {'wall':>8} {'service':<8} {'reqs':>5} {'errors':>6} {'p50 ms':>8} {'p99 ms':>8} {'limiter s':>9}")
+    total_wall = 0.0
+    totals = {}
+    for name, wall, per_service in results:
+        total_wall += wall
+        rows = [(service, summary) for service, summary in per_service.items() if summary[0]]
+        if not rows:
+            print(f"   {name:<16} {wall:>7.2f}s {'-':<8} {0:>5}")
+        for i, (service, (count, errors, p50, p99, waited)) in enumerate(rows):
+            label, shown = (name, f"{wall:>7.2f}s") if i == 0 else ("", "")
+            print(f"   {label:<16} {shown:>8} {service:<8} {count:>5} {errors:>6} {p50:>8.1f} {p99:>8.1f} {waited:>9.2f}")
+            totals[service] = totals.get(service, 0) + count
+    print(f"   {'total':<16} {total_wall:>7.2f}s "
+          + ", ".join(f"{service} {count} reqs" for service, count in totals.items()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the full bootstrap against local API stand-ins.")
+    parser.add_argument("--notion-latency", type=float, default=0.05, help="seconds per Notion request")
+    parser.add_argument("--github-latency", type=float, default=0.1, help="seconds per GitHub request")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra random latency per request")
+    parser.add_argument("--notion-rate", type=float, default=3, help="Notion server rate limit (req/s)")
+    parser.add_argument("--notion-burst", type=int, default=10, help="Notion server burst")
+    parser.add_argument("--writes-per-minute", type=int, default=None,
+                        help="GitHub secondary limit on content-creating requests (GitHub: 80)")
+    parser.add_argument("--rerun", action="store_true", help="also time a second, idempotent run")
+    parser.add_argument("--verbose", action="store_true", help="show the bootstrap's own output")
+    args = parser.parse_args()
+    
+    notion = NotionStandIn(latency=args.notion_latency, jitter=args.jitter, rate=args.notion_rate,
+                           burst=args.notion_burst, seed=1).start()
+    github = GitHubStandIn(latency=args.github_latency, jitter=args.jitter,
+                           writes_per_minute=args.writes_per_minute, seed=1).start()
+    notion.state.add_page(PARENT_PAGE_ID)
+    servers = {"notion": notion, "github": github}
+    
+    scratch = tempfile.mkdtemp(prefix="bench-bootstrap-")
+    os.environ.update({
+        "NOTION_BASE": notion.base_url, "NOTION_TOKEN": "local", "NOTION_PARENT_PAGE_ID": PARENT_PAGE_ID,
+        "GITHUB_API": github.base_url, "GITHUB_TOKEN": "local", "GITHUB_USERNAME": github.owner,
+        "NOTION_JOURNAL_DIR": os.path.join(scratch, ".journal"),
+        "NOTION_MIRROR_PATH": os.path.join(scratch, "mirror.sqlite3"),
+    })
+    os.chdir(scratch)
+    
+    print(f"🧪 Notion stand-in {notion.base_url} ({args.notion_latency:g}s, {args.notion_rate:g} req/s), "
+          f"GitHub stand-in {github.base_url} ({args.github_latency:g}s)")
+    print(f"   scratch directory: {scratch}")
+    
+    print_report("First run", run_bootstrap(servers, args.verbose))
+    if args.rerun:
+        print_report("Re-run (everything exists)", run_bootstrap(servers, args.verbose))
+    
+    from services.metrics import get_metrics
+    get_metrics().print_summary()
+    
+    throttled = notion.stats.get("429", 0)
+    secondary = github.stats.get("403", 0)
+    print(f"\n   Notion 429s: {throttled}, GitHub 403s: {secondary}, "
+          f"repos: {len(github.repos)}, pages: {len(notion.state.pages)}")
+    notion.stop()
+    github.stop()
+
+if __name__ == "__main__":
+    main()
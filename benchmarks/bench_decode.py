@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: decoding query results with services.decoder.
+
+Builds synthetic pages shaped like the roadmap database (title, rich_text,
+select, status, multi_select, date, checkbox, relation, url, number) and times
+row and columnar decoding, plus the memory held by the decoded rows.
+
+Usage: python benchmarks/bench_decode.py [pages]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.decoder import PageDecoder  # noqa: E402
+
+def text(kind, content):
+    return {"type": kind, kind: [{"type": "text", "plain_text": content, "text": {"content": content}}]}
+
+def make_page(i):
+    return {
+        "id": f"page-{i}",
+        "properties": {
+            "Learning Topic": text("title", f"Topic {i}"),
+            "Details": text("rich_text", "• item one\n• item two"),
+            "Week": {"type": "number", "number": i % 24 + 1},
+            "Month": {"type": "select", "select": {"name": f"Month {i % 6 + 1}"}},
+            "Status 1": {"type": "status", "status": {"name": "Not started"}},
+            "Tags": {"type": "multi_select", "multi_select": [{"name": "sql"}, {"name": "aws"}]},
+            "Due": {"type": "date", "date": {"start": "2025-01-06", "end": None}},
+            "Done": {"type": "checkbox", "checkbox": i % 3 == 0},
+            "Related": {"type": "relation", "relation": [{"id": "rel-1"}]},
+            "GitHub Repo": {"type": "url", "url": "https://github.com/example/repo"},
+        },
+    }
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    pages = [make_page(i) for i in range(count)]
+    decoder = PageDecoder.for_page(pages[0])
+    
+    print(f"📏 Decoding {count:,} pages ({len(decoder.columns)} columns)")
+    
+    start = time.perf_counter()
+    rows = decoder.decode_all(pages)
+    elapsed = time.perf_counter() - start
+    print(f"   rows     {elapsed:7.3f}s  {count / elapsed:>10,.0f} pages/s")
+    
+    start = time.perf_counter()
+    columns = decoder.decode_columns(pages)
+    elapsed = time.perf_counter() - start
+    print(f"   columns  {elapsed:7.3f}s  {count / elapsed:>10,.0f} pages/s")
+    
+    # Memory held by the decoded rows (timed separately: tracing slows decoding down)
+    del rows
+    tracemalloc.start()
+    rows = decoder.decode_all(pages)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   memory   {held / 1e6:7.1f} MB for {count:,} rows ({held / count:.0f} B/row)")
+    
+    assert rows[0].get("Status 1") == "Not started" and columns["Week"][0] == 1
+    print(f"   sample   {rows[1].as_dict()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: page payload serialization for bulk week creation.
+
+Compares the original per-row dict builder + json.dumps with the precompiled
+PageTemplate.render_json path used by NotionService. No network access needed.
+
+Usage: python benchmarks/bench_page_payloads.py [rounds]
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import RoadmapData  # noqa: E402
+from services.notion_service import NotionService  # noqa: E402
+from services.page_template import JSON_BACKEND  # noqa: E402
+
+DB_ID = "00000000-0000-0000-0000-000000000000"
+
+def legacy_build_page_payload(db_id, week, repo_urls):
+    """The per-row builder NotionService used before templates."""
+    github_url = repo_urls.get(week.repo_hint or "", "")
+    month_names = {
+        1: "Month 1: SQL & ETL Basics",
+        2: "Month 2: Data Warehousing",
+        3: "Month 3: DataOps & Automation",
+        4: "Month 4: Big Data Processing",
+        5: "Month 5: Real-Time Streaming",
+        6: "Month 6: Capstone Projects"
+    }
+    if week.week <= 8:
+        priority = "🔥 High"
+    elif week.week <= 16:
+        priority = "⚡ Medium"
+    else:
+        priority = "📝 Low"
+    return {
+        "parent": {"database_id": db_id},
+        "properties": {
+            "Week": {"number": week.week},
+            "Month": {"select": {"name": month_names.get(week.month, f"Month {week.month}")}},
+            "Learning Topic": {"title": [{"type": "text", "text": {"content": week.topic}}]},
+            "Project Phase": {"rich_text": [{"type": "text", "text": {"content": week.project}}]},
+            "Details": {"rich_text": [{"type": "text", "text": {"content": week.details or ""}}]},
+            "Status": {"select": {"name": "📋 To Do"}},
+            "GitHub Repo": {"url": github_url or None},
+            "Dataset/Resource": {"url": week.dataset_url or None},
+            "Priority": {"select": {"name": priority}},
+            "Week Timeline": {"rich_text": [{"type": "text", "text": {"content": week.due_label}}]},
+        }
+    }
+
+def bench(label, fn, weeks, repo_urls, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for week in weeks:
+            fn(week, repo_urls)
+    elapsed = time.perf_counter() - start
+    rate = rounds * len(weeks) / elapsed
+    print(f"   {label:<32} {elapsed:7.3f}s  {rate:>10,.0f} payloads/s")
+    return elapsed
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    weeks = RoadmapData.build_weeks()
+    repo_urls = {w.repo_hint: f"https://github.com/example/{w.repo_hint}" for w in weeks if w.repo_hint}
+    template = NotionService()._page_template(DB_ID)
+    
+    # Both paths must produce the same request body
+    for week in weeks:
+        expected = legacy_build_page_payload(DB_ID, week, repo_urls)
+        assert json.loads(template.render_json(week, repo_urls)) == expected, f"mismatch for week {week.week}"
+        assert template.render(week, repo_urls) == expected, f"mismatch for week {week.week}"
+    
+    print(f"📏 {rounds} rounds x {len(weeks)} weeks (JSON backend: {JSON_BACKEND})")
+    legacy = bench("dict builder + json.dumps",
+                   lambda w, urls: json.dumps(legacy_build_page_payload(DB_ID, w, urls)).encode("utf-8"),
+                   weeks, repo_urls, rounds)
+    fast = bench("PageTemplate.render_json", template.render_json, weeks, repo_urls, rounds)
+    print(f"⚡ Speedup: {legacy / fast:.2f}x")
+
+if __name__ == "__main__":
+    main()
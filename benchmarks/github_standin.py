@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the subset of the GitHub REST API the bootstrap uses.
+
+Serves repositories (POST /user/repos, GET /repos/{owner}/{repo}), contents
+(GET/PUT /repos/{owner}/{repo}/contents/{path}), git data (refs, commits, trees
+with ?recursive=1, blobs) and GET /rate_limit from memory. File, tree and commit
+shas are content hashes, so the contents API's sha checks behave like GitHub's.
+
+Realism knobs: per-request latency (plus jitter), the primary rate limit
+(X-RateLimit-* headers, 403 once the hourly budget is spent) and the secondary
+limits GitHub applies to bursts of writes: at most ``--writes-per-minute``
+content-creating requests per rolling minute and ``--max-concurrent`` requests
+in flight, answered with 403 + Retry-After. GET /__stats returns request counts.
+
+    python benchmarks/github_standin.py --port 8766 --latency 0.1 --writes-per-minute 80
+    GITHUB_API=http://127.0.0.1:8766 GITHUB_TOKEN=local GITHUB_USERNAME=octocat python bootstrap_roadmap.py
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from standin import Reply, StandInServer
+
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+def _sha(kind: str, data: bytes) -> str:
+    """Git object id: sha1 over ``"<kind> <size>\\0"`` + data."""
+    return hashlib.sha1(f"{kind} {len(data)}\0".encode("utf-8") + data).hexdigest()
+
+
+class Repository:
+    """One repository's git objects: blobs, flat trees (path -> blob sha), commits and refs."""
+    
+    def __init__(self, owner: str, name: str, description: str = "", private: bool = False):
+        self.owner = owner
+        self.name = name
+        self.description = description
+        self.private = private
+        self.default_branch = "main"
+        self.blobs: Dict[str, bytes] = {}
+        self.trees: Dict[str, Dict[str, str]] = {}
+        self.commits: Dict[str, Dict[str, Any]] = {}
+        self.refs: Dict[str, str] = {}
+    
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "id": abs(hash(f"{self.owner}/{self.name}")) % 10**9,
+            "name": self.name,
+            "full_name": f"{self.owner}/{self.name}",
+            "owner": {"login": self.owner},
+            "private": self.private,
+            "description": self.description,
+            "default_branch": self.default_branch,
+            "html_url": f"https://github.com/{self.owner}/{self.name}",
+        }
+    
+    def put_blob(self, data: bytes) -> str:
+        sha = _sha("blob", data)
+        self.blobs[sha] = data
+        return sha
+    
+    def put_tree(self, files: Dict[str, str]) -> str:
+        listing = "\n".join(f"{path} {sha}" for path, sha in sorted(files.items())).encode("utf-8")
+        sha = _sha("tree", listing)
+        self.trees[sha] = dict(files)
+        return sha
+    
+    def put_commit(self, tree: str, parents: List[str], message: str) -> str:
+        sha = _sha("commit", json.dumps([tree, parents, message, time.time()]).encode("utf-8"))
+        self.commits[sha] = {"sha": sha, "tree": {"sha": tree}, "parents": [{"sha": p} for p in parents],
+                             "message": message}
+        return sha
+    
+    def head(self) -> Optional[str]:
+        return self.refs.get(f"heads/{self.default_branch}")
+    
+    def files(self, ref: Optional[str] = None) -> Dict[str, str]:
+        """path -> blob sha at ``ref`` (a branch, commit sha or HEAD)."""
+        commit = self.resolve(ref or "HEAD")
+        return dict(self.trees[self.commits[commit]["tree"]["sha"]]) if commit else {}
+    
+    def resolve(self, ref: str) -> Optional[str]:
+        if ref == "HEAD":
+            return self.head()
+        if ref in self.commits:
+            return ref
+        if ref in self.trees:
+            return None
+        return self.refs.get(f"heads/{ref}") or self.refs.get(ref)
+    
+    def commit_files(self, changes: Dict[str, Optional[bytes]], message: str) -> str:
+        """Commit file changes (None deletes) on the default branch and return the commit sha."""
+        files = self.files()
+        for path, data in changes.items():
+            if data is None:
+                files.pop(path, None)
+            else:
+                files[path] = self.put_blob(data)
+        parent = self.head()
+        commit = self.put_commit(self.put_tree(files), [parent] if parent else [], message)
+        self.refs[f"heads/{self.default_branch}"] = commit
+        return commit
+
+
+class GitHubStandIn(StandInServer):
+    """StandInServer with in-memory repositories and GitHub's primary and secondary limits."""
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 owner: str = "octocat", hourly_limit: int = 5000, writes_per_minute: Optional[int] = None,
+                 max_concurrent: Optional[int] = None, retry_after: float = 60.0, seed: Optional[int] = None):
+        super().__init__(host, port, latency, jitter, seed)
+        self.owner = owner
+        self.repos: Dict[Tuple[str, str], Repository] = {}
+        self.hourly_limit = hourly_limit
+        self.writes_per_minute = writes_per_minute
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.used = 0
+        self.reset_at = int(time.time()) + 3600
+        self._writes: Deque[float] = deque()
+        self._state_lock = threading.Lock()
+    
+    # Limits --------------------------------------------------------------------
+    def _rate_headers(self) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.hourly_limit),
+            "X-RateLimit-Remaining": str(max(0, self.hourly_limit - self.used)),
+            "X-RateLimit-Used": str(self.used),
+            "X-RateLimit-Reset": str(self.reset_at),
+            "X-RateLimit-Resource": "core",
+        }
+    
+    def reject(self, method: str, path: str) -> Optional[Reply]:
+        if path == "/rate_limit":
+            return None
+        with self._state_lock:
+            if time.time() >= self.reset_at:
+                self.used, self.reset_at = 0, int(time.time()) + 3600
+            if self.used >= self.hourly_limit:
+                return 403, {"message": "API rate limit exceeded for user."}, self._rate_headers()
+            self.used += 1
+            
+            secondary = self.max_concurrent is not None and self.in_flight > self.max_concurrent
+            if not secondary and self.writes_per_minute is not None and method in WRITE_METHODS:
+                now = time.monotonic()
+                while self._writes and now - self._writes[0] >= 60:
+                    self._writes.popleft()
+                secondary = len(self._writes) >= self.writes_per_minute
+                if not secondary:
+                    self._writes.append(now)
+        if secondary:
+            return (403, {"message": "You have exceeded a secondary rate limit. Please wait a few minutes before you try again.",
+                          "documentation_url": "https://docs.github.com/rest/overview/rate-limits-for-the-rest-api"},
+                    {"Retry-After": f"{self.retry_after:g}", **self._rate_headers()})
+        return None
+    
+    def unauthorized(self) -> Reply:
+        return 401, {"message": "Requires authentication"}, {}
+    
+    def bad_request(self, message: str) -> Reply:
+        return 400, {"message": f"Problems parsing JSON: {message}"}, {}
+    
+    def endpoint(self, method: str, path: str) -> str:
+        """Collapse owners, repos, shas and file paths so stats group by endpoint."""
+        parts = path.strip("/").split("/")
+        if parts[0] == "repos" and len(parts) >= 3:
+            rest = parts[3:]
+            if rest[:1] == ["contents"]:
+                rest = ["contents", "{path}"]
+            elif rest[:1] == ["git"] and len(rest) > 2:
+                rest = rest[:2] + ["{ref}"]
+            return f"{method} /repos/{{owner}}/{{repo}}{'/' if rest else ''}{'/'.join(rest)}"
+        return f"{method} {path}"
+    
+    def extra_stats(self) -> Dict[str, Any]:
+        return {"repos": len(self.repos), "rate_limit_remaining": max(0, self.hourly_limit - self.used)}
+    
+    # Seeding -------------------------------------------------------------------
+    def create_repo(self, name: str, description: str = "", private: bool = False,
+                    auto_init: bool = False, owner: Optional[str] = None) -> Repository:
+        repo = Repository(owner or self.owner, name, description, private)
+        if auto_init:
+            repo.commit_files({"README.md": f"# {name}\n\n{description}\n".encode("utf-8")}, "Initial commit")
+        self.repos[(repo.owner, name)] = repo
+        return repo
+    
+    # Routing -------------------------------------------------------------------
+    def route(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Reply:
+        status, payload = self._route(method, path, query, body)
+        return status, payload, self._rate_headers()
+    
+    def _route(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Tuple[int, Any]:
+        parts = path.strip("/").split("/")
+        
+        if parts == ["rate_limit"] and method == "GET":
+            core = {"limit": self.hourly_limit, "remaining": max(0, self.hourly_limit - self.used),
+                    "used": self.used, "reset": self.reset_at}
+            return 200, {"resources": {"core": core}, "rate": core}
+        if parts == ["user"] and method == "GET":
+            return 200, {"login": self.owner}
+        
+        if parts == ["user", "repos"] and method == "POST":
+            name = body.get("name")
+            if not name:
+                return _unprocessable("name is missing")
+            with self._state_lock:
+                if (self.owner, name) in self.repos:
+                    return _unprocessable("name already exists on this account")
+                repo = self.create_repo(name, body.get("description", ""), bool(body.get("private")),
+                                        bool(body.get("auto_init")))
+            return 201, repo.to_json()
+        
+        if parts[0] != "repos" or len(parts) < 3:
+            return 404, {"message": "Not Found"}
+        repo = self.repos.get((parts[1], parts[2]))
+        if repo is None:
+            return 404, {"message": "Not Found"}
+        rest = parts[3:]
+        
+        if not rest and method == "GET":
+            return 200, repo.to_json()
+        with self._state_lock:
+            if rest[:1] == ["contents"]:
+                return self._contents(repo, method, "/".join(rest[1:]), query, body)
+            if rest[:1] == ["git"]:
+                return self._git(repo, method, rest[1:], query, body)
+        return 404, {"message": "Not Found"}
+    
+    def _contents(self, repo: Repository, method: str, file_path: str,
+                  query: Dict[str, List[str]], body: Any) -> Tuple[int, Any]:
+        files = repo.files((query.get("ref") or [None])[0])
+        if method == "GET":
+            if file_path in files:
+                data = repo.blobs[files[file_path]]
+                return 200, {"type": "file", "name": file_path.rsplit("/", 1)[-1], "path": file_path,
+                             "sha": files[file_path], "size": len(data), "encoding": "base64",
+                             "content": base64.b64encode(data).decode("ascii")}
+            children = sorted({p[len(file_path) + 1:].split("/")[0] for p in files
+                               if not file_path or p.startswith(f"{file_path}/")})
+            if file_path and not children:
+                return 404, {"message": "Not Found"}
+            return 200, [{"name": name, "path": f"{file_path}/{name}".lstrip("/")} for name in children]
+        
+        if method == "PUT":
+            if "message" not in body or "content" not in body:
+                return _unprocessable("message and content are required")
+            existing = files.get(file_path)
+            if existing and body.get("sha") is None:
+                return _unprocessable("\"sha\" wasn't supplied.")
+            if existing and body["sha"] != existing:
+                return 409, {"message": f"{file_path} does not match {body['sha']}"}
+            try:
+                data = base64.b64decode(body["content"], validate=True)
+            except ValueError:
+                return _unprocessable("content is not valid Base64")
+            commit = repo.commit_files({file_path: data}, body["message"])
+            sha = repo.files()[file_path]
+            return (200 if existing else 201), {
+                "content": {"name": file_path.rsplit("/", 1)[-1], "path": file_path, "sha": sha, "size": len(data)},
+                "commit": {"sha": commit, "message": body["message"]},
+            }
+        
+        if method == "DELETE":
+            if file_path not in files:
+                return 404, {"message": "Not Found"}
+            if body.get("sha") != files[file_path]:
+                return 409, {"message": f"{file_path} does not match {body.get('sha')}"}
+            commit = repo.commit_files({file_path: None}, body.get("message", "delete"))
+            return 200, {"content": None, "commit": {"sha": commit}}
+        return 404, {"message": "Not Found"}
+    
+    def _git(self, repo: Repository, method: str, rest: List[str],
+             query: Dict[str, List[str]], body: Any) -> Tuple[int, Any]:
+        kind = rest[0] if rest else ""
+        key = "/".join(rest[1:])
+        
+        if kind in ("ref", "refs") and method == "GET":
+            if key not in repo.refs:
+                return (409, {"message": "Git Repository is empty."}) if not repo.refs else (404, {"message": "Not Found"})
+            return 200, {"ref": f"refs/{key}", "object": {"type": "commit", "sha": repo.refs[key]}}
+        if kind == "refs" and method == "PATCH":
+            if key not in repo.refs:
+                return _unprocessable("Reference does not exist")
+            target = body.get("sha")
+            if target not in repo.commits:
+                return _unprocessable("Object does not exist")
+            if not body.get("force") and not _is_ancestor(repo, repo.refs[key], target):
+                return _unprocessable("Update is not a fast forward")
+            repo.refs[key] = target
+            return 200, {"ref": f"refs/{key}", "object": {"type": "commit", "sha": target}}
+        if kind == "refs" and method == "POST":
+            ref = body.get("ref", "").replace("refs/", "", 1)
+            if ref in repo.refs:
+                return _unprocessable("Reference already exists")
+            repo.refs[ref] = body.get("sha")
+            return 201, {"ref": f"refs/{ref}", "object": {"type": "commit", "sha": body.get("sha")}}
+        
+        if kind == "blobs" and method == "POST":
+            content = body.get("content", "")
+            data = base64.b64decode(content) if body.get("encoding") == "base64" else content.encode("utf-8")
+            return 201, {"sha": repo.put_blob(data)}
+        if kind == "blobs" and method == "GET":
+            if key not in repo.blobs:
+                return 404, {"message": "Not Found"}
+            return 200, {"sha": key, "encoding": "base64", "content": base64.b64encode(repo.blobs[key]).decode("ascii")}
+        
+        if kind == "trees" and method == "POST":
+            files = dict(repo.trees.get(body.get("base_tree"), {}))
+            for entry in body.get("tree", []):
+                if entry.get("content") is not None:
+                    files[entry["path"]] = repo.put_blob(entry["content"].encode("utf-8"))
+                elif entry.get("sha") is None:
+                    files.pop(entry["path"], None)
+                else:
+                    files[entry["path"]] = entry["sha"]
+            sha = repo.put_tree(files)
+            return 201, {"sha": sha, "tree": _tree_entries(repo, files, recursive=True)}
+        if kind == "trees" and method == "GET":
+            if not repo.refs:
+                return 409, {"message": "Git Repository is empty."}
+            files = repo.trees.get(key)
+            if files is None:
+                commit = repo.resolve(key)
+                if commit is None:
+                    return 404, {"message": "Not Found"}
+                key = repo.commits[commit]["tree"]["sha"]
+                files = repo.trees[key]
+            recursive = bool(query.get("recursive"))
+            return 200, {"sha": key, "tree": _tree_entries(repo, files, recursive), "truncated": False}
+        
+        if kind == "commits" and method == "POST":
+            if body.get("tree") not in repo.trees:
+                return _unprocessable("Tree SHA does not exist")
+            sha = repo.put_commit(body["tree"], body.get("parents", []), body.get("message", ""))
+            return 201, repo.commits[sha]
+        if kind == "commits" and method == "GET":
+            if key not in repo.commits:
+                return 404, {"message": "Not Found"}
+            return 200, repo.commits[key]
+        return 404, {"message": "Not Found"}
+
+
+def _tree_entries(repo: Repository, files: Dict[str, str], recursive: bool) -> List[Dict[str, Any]]:
+    """Tree listing in GitHub's shape: blobs plus the directories above them."""
+    entries: Dict[str, Dict[str, Any]] = {}
+    for path, sha in files.items():
+        dirs = path.split("/")[:-1]
+        for i in range(1, len(dirs) + 1):
+            directory = "/".join(dirs[:i])
+            entries.setdefault(directory, {"path": directory, "mode": "040000", "type": "tree"})
+        entries[path] = {"path": path, "mode": "100644", "type": "blob", "sha": sha, "size": len(repo.blobs[sha])}
+    listing = sorted(entries.values(), key=lambda entry: entry["path"])
+    return listing if recursive else [entry for entry in listing if "/" not in entry["path"]]
+
+
+def _is_ancestor(repo: Repository, ancestor: str, commit: str) -> bool:
+    pending = [commit]
+    while pending:
+        sha = pending.pop()
+        if sha == ancestor:
+            return True
+        pending.extend(parent["sha"] for parent in repo.commits.get(sha, {}).get("parents", []))
+    return False
+
+
+def _unprocessable(message: str) -> Tuple[int, Dict[str, Any]]:
+    return 422, {"message": "Validation Failed", "errors": [{"message": message}]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the GitHub REST API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--owner", default="octocat", help="login that POST /user/repos creates repos under")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--hourly-limit", type=int, default=5000, help="primary rate limit (requests/hour)")
+    parser.add_argument("--writes-per-minute", type=int, default=None,
+                        help="secondary limit on content-creating requests (GitHub: 80)")
+    parser.add_argument("--max-concurrent", type=int, default=None,
+                        help="secondary limit on concurrent requests (GitHub: 100)")
+    parser.add_argument("--retry-after", type=float, default=60.0, help="Retry-After seconds on secondary limits")
+    args = parser.parse_args()
+    
+    standin = GitHubStandIn(args.host, args.port, args.latency, args.jitter, args.owner, args.hourly_limit,
+                            args.writes_per_minute, args.max_concurrent, args.retry_after)
+    print(f"🧪 GitHub stand-in listening on {standin.base_url} (owner: {args.owner})")
+    print(f"   export GITHUB_API={standin.base_url} GITHUB_USERNAME={args.owner}")
+    try:
+        standin.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+        print(json.dumps(dict(standin.stats), indent=1))
+
+
+if __name__ == "__main__":
+    main()
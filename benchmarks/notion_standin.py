@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the subset of the Notion API this repo uses.
+
+Serves /databases (create, get, update), /databases/{id}/query (filters, sorts,
+cursors, filter_properties), /pages (create, get, update/archive), /search and
+/blocks/{id}/children (list, append) from memory, so every Notion path can be
+run and timed without a token. Responses follow Notion's shapes closely enough
+for the scripts and services here: properties are returned in read format with
+ids, plain_text and types.
+
+Realism knobs: per-request latency (plus jitter), a server-side token bucket
+that answers 429 with Retry-After like Notion's ~3 req/s limit, and random 429
+injection. GET /__stats returns request counts per endpoint.
+
+Point the scripts at it with NOTION_BASE:
+
+    python benchmarks/notion_standin.py --port 8765 --latency 0.05 --rate 3 --burst 10
+    NOTION_BASE=http://127.0.0.1:8765/v1 NOTION_TOKEN=local python roadmap.py --plan p.json bootstrap
+
+or start it in-process with ``NotionStandIn(...).start()`` (see benchmarks).
+"""
+
+import argparse
+import copy
+import json
+import math
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from standin import Reply, StandInServer
+
+MAX_PAGE_SIZE = 100
+MAX_BLOCK_CHILDREN = 100
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _new_id() -> str:
+    return str(uuid.uuid4())
+
+
+def _rich_text(items: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Convert write-format rich text to read format (adds plain_text and annotations)."""
+    result = []
+    for item in items or []:
+        content = (item.get("text") or {}).get("content", item.get("plain_text", ""))
+        result.append({
+            "type": "text",
+            "text": {"content": content, "link": (item.get("text") or {}).get("link")},
+            "plain_text": content,
+            "href": None,
+        })
+    return result
+
+
+def _option(value: Optional[Dict[str, Any]], options: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not value or value.get("name") is None:
+        return None
+    for option in options:
+        if option["name"] == value["name"]:
+            return option
+    # Like Notion, selects grow new options on write
+    option = {"id": _new_id()[:4], "name": value["name"], "color": value.get("color", "default")}
+    options.append(option)
+    return option
+
+
+class NotionState:
+    """In-memory workspace: databases, pages and block children."""
+    
+    def __init__(self):
+        self.databases: Dict[str, Dict[str, Any]] = {}
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.children: Dict[str, List[Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+    
+    # Schema ----------------------------------------------------------------
+    @staticmethod
+    def _schema_property(name: str, spec: Dict[str, Any], existing: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        prop_type = spec.get("type") or next(k for k in spec if k not in ("id", "name", "type"))
+        config = copy.deepcopy(spec.get(prop_type) or {})
+        if prop_type in ("select", "multi_select", "status"):
+            options = config.setdefault("options", [])
+            for option in options:
+                option.setdefault("id", _new_id()[:4])
+                option.setdefault("color", "default")
+        prop_id = existing["id"] if existing else ("title" if prop_type == "title" else _new_id()[:4])
+        return {"id": prop_id, "name": name, "type": prop_type, prop_type: config}
+    
+    def create_database(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        db_id = _new_id()
+        now = _now()
+        title = _rich_text(body.get("title"))
+        database = {
+            "object": "database",
+            "id": db_id,
+            "created_time": now,
+            "last_edited_time": now,
+            "title": title,
+            "parent": body.get("parent", {}),
+            "archived": False,
+            "properties": {name: self._schema_property(name, spec)
+                           for name, spec in (body.get("properties") or {}).items()},
+        }
+        with self.lock:
+            self.databases[db_id] = database
+            parent_id = database["parent"].get("page_id")
+            if parent_id:
+                self.children.setdefault(parent_id, []).append({
+                    "object": "block", "id": db_id, "type": "child_database", "has_children": False,
+                    "child_database": {"title": "".join(item["plain_text"] for item in title)},
+                })
+        return database
+    
+    def update_database(self, db_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            database = self.databases[db_id]
+            schema = database["properties"]
+            for name, spec in (body.get("properties") or {}).items():
+                if spec is None:
+                    schema.pop(name, None)
+                else:
+                    schema[name] = self._schema_property(name, spec, schema.get(name))
+            if "title" in body:
+                database["title"] = _rich_text(body["title"])
+            database["last_edited_time"] = _now()
+            return database
+    
+    # Pages -----------------------------------------------------------------
+    def _read_value(self, prop: Dict[str, Any], value: Dict[str, Any]) -> Dict[str, Any]:
+        prop_type = prop["type"]
+        raw = value.get(prop_type) if prop_type in value else next(iter(value.values()), None)
+        if prop_type in ("title", "rich_text"):
+            raw = _rich_text(raw)
+        elif prop_type in ("select", "status"):
+            raw = _option(raw, prop[prop_type].setdefault("options", []))
+        elif prop_type == "multi_select":
+            options = prop[prop_type].setdefault("options", [])
+            raw = [_option(item, options) for item in raw or []]
+        elif prop_type == "checkbox":
+            raw = bool(raw)
+        return {"id": prop["id"], "type": prop_type, prop_type: raw}
+    
+    def _empty_value(self, prop: Dict[str, Any]) -> Dict[str, Any]:
+        prop_type = prop["type"]
+        empty: Any = None
+        if prop_type in ("title", "rich_text", "multi_select", "relation", "people", "files"):
+            empty = []
+        elif prop_type == "checkbox":
+            empty = False
+        return {"id": prop["id"], "type": prop_type, prop_type: empty}
+    
+    def create_page(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        db_id = (body.get("parent") or {}).get("database_id")
+        page_id = _new_id()
+        now = _now()
+        with self.lock:
+            if db_id not in self.databases:
+                raise KeyError(db_id)
+            schema = self.databases[db_id]["properties"]
+            properties = {name: self._empty_value(prop) for name, prop in schema.items()}
+            for name, value in (body.get("properties") or {}).items():
+                if name not in schema:
+                    raise ValueError(f"{name} is not a property that exists.")
+                properties[name] = self._read_value(schema[name], value)
+            page = {
+                "object": "page",
+                "id": page_id,
+                "created_time": now,
+                "last_edited_time": now,
+                "parent": {"type": "database_id", "database_id": db_id},
+                "archived": False,
+                "properties": properties,
+                "url": f"https://www.notion.so/{page_id.replace('-', '')}",
+            }
+            self.pages[page_id] = page
+            if body.get("children"):
+                self._append(page_id, body["children"])
+        return page
+    
+    def update_page(self, page_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            page = self.pages[page_id]
+            schema = self.databases[page["parent"]["database_id"]]["properties"]
+            for name, value in (body.get("properties") or {}).items():
+                if name not in schema:
+                    raise ValueError(f"{name} is not a property that exists.")
+                page["properties"][name] = self._read_value(schema[name], value)
+            if "archived" in body:
+                page["archived"] = bool(body["archived"])
+            page["last_edited_time"] = _now()
+            return page
+    
+    # Blocks ----------------------------------------------------------------
+    def _append(self, block_id: str, children: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        added = []
+        for child in children:
+            block = copy.deepcopy(child)
+            block.setdefault("object", "block")
+            block["id"] = _new_id()
+            block_type = block.get("type") or next(k for k in child if k not in ("object", "type"))
+            block["type"] = block_type
+            content = block.setdefault(block_type, {})
+            if "rich_text" in content:
+                content["rich_text"] = _rich_text(content["rich_text"])
+            nested = content.pop("children", None) or block.pop("children", None)
+            block["has_children"] = bool(nested)
+            self.children.setdefault(block["id"], [])
+            if nested:
+                self._append(block["id"], nested)
+            self.children.setdefault(block_id, []).append(block)
+            added.append(block)
+        return added
+    
+    def append_children(self, block_id: str, children: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if len(children) > MAX_BLOCK_CHILDREN:
+            raise ValueError(f"body.children.length should be ≤ {MAX_BLOCK_CHILDREN}, instead was {len(children)}.")
+        with self.lock:
+            if block_id not in self.pages and block_id not in self.children:
+                raise KeyError(block_id)
+            return self._append(block_id, children)
+    
+    # Seeding ---------------------------------------------------------------
+    def add_page(self, page_id: str):
+        """Make ``page_id`` exist as a (childless) parent page."""
+        with self.lock:
+            self.children.setdefault(page_id, [])
+    
+    def seed_roadmap(self, weeks: int = 24, parent_page_id: str = "parent-page",
+                     title: str = "6‑Month Data Engineering Career Plan") -> str:
+        """Create a roadmap-shaped database with ``weeks`` week pages; return its id."""
+        database = self.create_database({
+            "parent": {"type": "page_id", "page_id": parent_page_id},
+            "title": [{"type": "text", "text": {"content": title}}],
+            "properties": {
+                "Week": {"number": {}},
+                "Month": {"select": {"options": [{"name": str(m)} for m in range(1, 7)]}},
+                "Learning Topic": {"title": {}},
+                "Details": {"rich_text": {}},
+                "Project Phase": {"rich_text": {}},
+                "Status": {"select": {"options": [{"name": "To Do"}, {"name": "In Progress"}, {"name": "Done"}]}},
+                "Status 1": {"status": {"options": [{"name": "Not started"}, {"name": "In progress"}, {"name": "Done"}]}},
+                "Priority": {"select": {"options": [{"name": "High"}, {"name": "Medium"}, {"name": "Low"}]}},
+                "GitHub": {"url": {}},
+                "Dataset": {"url": {}},
+            },
+        })
+        for week in range(1, weeks + 1):
+            self.create_page({"parent": {"database_id": database["id"]}, "properties": {
+                "Week": {"number": week},
+                "Month": {"select": {"name": str(min(6, (week - 1) // 4 + 1))}},
+                "Learning Topic": {"title": [{"text": {"content": f"Week {week} topic - extra detail"}}]},
+                "Details": {"rich_text": [{"text": {"content": f"• Study item {week}\n• Build item {week}"}}]},
+                "Status": {"select": {"name": "To Do"}},
+            }})
+        return database["id"]
+
+
+# Query evaluation ----------------------------------------------------------
+def _plain(value: Dict[str, Any]) -> Any:
+    """Comparable scalar for one read-format property value."""
+    prop_type = value.get("type")
+    raw = value.get(prop_type)
+    if prop_type in ("title", "rich_text"):
+        return "".join(item.get("plain_text", "") for item in raw or [])
+    if prop_type in ("select", "status"):
+        return raw["name"] if raw else None
+    if prop_type == "multi_select":
+        return [item["name"] for item in raw or []]
+    return raw
+
+
+def _match_condition(page: Dict[str, Any], condition: Dict[str, Any]) -> bool:
+    if "or" in condition:
+        return any(_match_condition(page, c) for c in condition["or"])
+    if "and" in condition:
+        return all(_match_condition(page, c) for c in condition["and"])
+    if "timestamp" in condition:
+        stamp = page[condition["timestamp"]]
+        check = condition[condition["timestamp"]]
+        op, operand = next(iter(check.items()))
+        return {
+            "on_or_after": stamp >= operand, "after": stamp > operand,
+            "on_or_before": stamp <= operand, "before": stamp < operand,
+            "equals": stamp[:len(operand)] == operand,
+        }.get(op, True)
+    
+    value = page["properties"].get(condition["property"])
+    if value is None:
+        raise ValueError(f"Could not find property with name or id: {condition['property']}")
+    kind = next(k for k in condition if k != "property")
+    op, operand = next(iter(condition[kind].items()))
+    actual = _plain(value)
+    empty = actual in (None, "", [])
+    if op == "is_empty":
+        return empty
+    if op == "is_not_empty":
+        return not empty
+    if op == "equals":
+        return actual == operand
+    if op == "does_not_equal":
+        return actual != operand
+    if op == "contains":
+        return operand in (actual or "")
+    if op == "does_not_contain":
+        return operand not in (actual or "")
+    if op == "starts_with":
+        return (actual or "").startswith(operand)
+    if op in ("greater_than", "less_than", "greater_than_or_equal_to", "less_than_or_equal_to"):
+        if actual is None:
+            return False
+        return {"greater_than": actual > operand, "less_than": actual < operand,
+                "greater_than_or_equal_to": actual >= operand,
+                "less_than_or_equal_to": actual <= operand}[op]
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+def _sort_key(sort: Dict[str, Any]):
+    if "timestamp" in sort:
+        return lambda page: page[sort["timestamp"]]
+    name = sort["property"]
+    return lambda page: (_plain(page["properties"][name]) is None, _plain(page["properties"][name]) or 0)
+
+
+def _paginate(items: List[Dict[str, Any]], body: Dict[str, Any]) -> Dict[str, Any]:
+    start = int(body.get("start_cursor") or 0)
+    size = min(int(body.get("page_size") or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+    chunk = items[start:start + size]
+    has_more = start + size < len(items)
+    return {"object": "list", "results": chunk, "has_more": has_more,
+            "next_cursor": str(start + size) if has_more else None}
+
+
+# HTTP server ---------------------------------------------------------------
+class NotionStandIn(StandInServer):
+    """StandInServer serving a NotionState with Notion-like rate limits and 429 injection."""
+    
+    prefix = "/v1"
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 rate: Optional[float] = None, burst: int = 10, throttle_rate: float = 0.0,
+                 retry_after: Optional[float] = None, state: Optional[NotionState] = None, seed: Optional[int] = None):
+        super().__init__(host, port, latency, jitter, seed)
+        self.state = state or NotionState()
+        self.rate = rate
+        self.burst = burst
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._bucket_lock = threading.Lock()
+    
+    def _throttle(self) -> Optional[float]:
+        """Return a Retry-After delay when this request should get a 429."""
+        if self.throttle_rate and self.random.random() < self.throttle_rate:
+            return self.retry_after if self.retry_after is not None else 1.0
+        if not self.rate:
+            return None
+        with self._bucket_lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            wait = (1 - self._tokens) / self.rate
+        # Notion sends whole seconds; a fixed retry_after makes benchmarks faster
+        return self.retry_after if self.retry_after is not None else float(max(1, math.ceil(wait)))
+    
+    def reject(self, method: str, path: str) -> Optional[Reply]:
+        retry_after = self._throttle()
+        if retry_after is None:
+            return None
+        return (*_error(429, "rate_limited", "You have been rate limited."), {"Retry-After": f"{retry_after:g}"})
+    
+    def unauthorized(self) -> Reply:
+        return (*_error(401, "unauthorized", "API token is invalid."), {})
+    
+    def bad_request(self, message: str) -> Reply:
+        return (*_error(400, "validation_error", message), {})
+    
+    def endpoint(self, method: str, path: str) -> str:
+        """Collapse ids so stats group by endpoint."""
+        return f"{method} {re.sub(r'/[0-9a-f]{8}-[0-9a-f-]{27,}', '/{id}', path)}"
+    
+    # Routing ---------------------------------------------------------------
+    def route(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Reply:
+        return (*self._route(method, path, query, body), {})
+    
+    def _route(self, method: str, path: str, query: Dict[str, List[str]],
+               body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        state = self.state
+        parts = [part for part in path.split("/") if part]
+        if parts and parts[0] == "v1":
+            parts = parts[1:]
+        
+        if parts == ["databases"] and method == "POST":
+            return 200, state.create_database(body)
+        if len(parts) == 2 and parts[0] == "databases":
+            database = state.databases.get(parts[1])
+            if database is None:
+                return _error(404, "object_not_found", f"Could not find database with ID: {parts[1]}.")
+            if method == "GET":
+                return 200, database
+            if method == "PATCH":
+                return 200, state.update_database(parts[1], body)
+        if len(parts) == 3 and parts[0] == "databases" and parts[2] == "query" and method == "POST":
+            return self._query(parts[1], query, body)
+        
+        if parts == ["pages"] and method == "POST":
+            try:
+                return 200, state.create_page(body)
+            except KeyError:
+                return _error(404, "object_not_found", "Could not find the parent database.")
+        if len(parts) == 2 and parts[0] == "pages":
+            page = state.pages.get(parts[1])
+            if page is None:
+                return _error(404, "object_not_found", f"Could not find page with ID: {parts[1]}.")
+            if method == "GET":
+                return 200, page
+            if method == "PATCH":
+                return 200, state.update_page(parts[1], body)
+        
+        if parts == ["search"] and method == "POST":
+            return self._search(body)
+        
+        if len(parts) == 3 and parts[0] == "blocks" and parts[2] == "children":
+            block_id = parts[1]
+            if method == "GET":
+                if block_id not in state.children and block_id not in state.pages:
+                    return _error(404, "object_not_found", f"Could not find block with ID: {block_id}.")
+                with state.lock:
+                    blocks = list(state.children.get(block_id, []))
+                params = {k: v[0] for k, v in query.items()}
+                return 200, _paginate(blocks, params)
+            if method == "PATCH":
+                try:
+                    return 200, {"object": "list", "results": state.append_children(block_id, body.get("children", []))}
+                except KeyError:
+                    return _error(404, "object_not_found", f"Could not find block with ID: {block_id}.")
+        
+        return _error(400, "invalid_request_url", f"Invalid request URL: {method} /{'/'.join(parts)}")
+    
+    def _query(self, db_id: str, query: Dict[str, List[str]], body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        state = self.state
+        database = state.databases.get(db_id)
+        if database is None:
+            return _error(404, "object_not_found", f"Could not find database with ID: {db_id}.")
+        with state.lock:
+            pages = [page for page in state.pages.values()
+                     if page["parent"].get("database_id") == db_id and not page["archived"]]
+        if body.get("filter"):
+            pages = [page for page in pages if _match_condition(page, body["filter"])]
+        sorts = body.get("sorts") or [{"timestamp": "created_time", "direction": "descending"}]
+        for sort in reversed(sorts):
+            pages.sort(key=_sort_key(sort), reverse=sort.get("direction") == "descending")
+        
+        result = _paginate(pages, body)
+        wanted = set(query.get("filter_properties", []))
+        if wanted:
+            result["results"] = [
+                dict(page, properties={name: value for name, value in page["properties"].items()
+                                       if value["id"] in wanted})
+                for page in result["results"]
+            ]
+        return 200, result
+    
+    def _search(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        state = self.state
+        object_type = (body.get("filter") or {}).get("value")
+        with state.lock:
+            results: List[Dict[str, Any]] = []
+            if object_type in (None, "database"):
+                results += list(state.databases.values())
+            if object_type in (None, "page"):
+                results += [page for page in state.pages.values() if not page["archived"]]
+        text = (body.get("query") or "").lower()
+        if text:
+            results = [item for item in results
+                       if text in "".join(t["plain_text"] for t in item.get("title", [])).lower()]
+        sort = body.get("sort") or {"timestamp": "last_edited_time", "direction": "descending"}
+        results.sort(key=lambda item: item[sort.get("timestamp", "last_edited_time")],
+                     reverse=sort.get("direction", "descending") == "descending")
+        return 200, _paginate(results, body)
+
+
+def _error(status: int, code: str, message: str) -> Tuple[int, Dict[str, Any]]:
+    return status, {"object": "error", "status": status, "code": code, "message": message}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Notion API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--rate", type=float, default=None, help="requests/second before 429s (Notion: ~3)")
+    parser.add_argument("--burst", type=int, default=10, help="requests allowed in a burst")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=None, help="fixed Retry-After seconds for 429s")
+    parser.add_argument("--seed-roadmap", type=int, default=0, metavar="WEEKS",
+                        help="pre-create a roadmap database with this many week pages")
+    args = parser.parse_args()
+    
+    standin = NotionStandIn(args.host, args.port, args.latency, args.jitter, args.rate, args.burst,
+                            args.throttle_rate, args.retry_after)
+    if args.seed_roadmap:
+        db_id = standin.state.seed_roadmap(args.seed_roadmap)
+        print(f"🌱 Seeded roadmap database {db_id} with {args.seed_roadmap} weeks (parent page: parent-page)")
+    print(f"🧪 Notion stand-in listening on {standin.base_url}")
+    print(f"   export NOTION_BASE={standin.base_url}")
+    try:
+        standin.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+        print(json.dumps(dict(standin.stats), indent=1))
+
+
+if __name__ == "__main__":
+    main()
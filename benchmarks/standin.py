@@ -0,0 +1,157 @@
+"""
+HTTP plumbing shared by the local API stand-ins (notion_standin, github_standin).
+
+StandInServer runs a threaded JSON server, adds configurable latency, counts
+requests per endpoint and keeps one timing record per request (stamped with
+time.perf_counter() on arrival) so in-process benchmarks can slice latencies
+by stage. Subclasses implement ``route`` and, optionally, ``reject`` (rate
+limits) and ``endpoint`` (id collapsing for stats).
+"""
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# (status, JSON payload, extra headers)
+Reply = Tuple[int, Any, Dict[str, str]]
+
+
+@dataclass
+class RequestRecord:
+    """One request as seen by the server."""
+    endpoint: str
+    status: int
+    seconds: float
+    started: float
+
+
+class StandInServer:
+    """Threaded JSON API server with injected latency and per-request records."""
+    
+    prefix = ""
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.stats: Counter = Counter()
+        self.records: List[RequestRecord] = []
+        self.in_flight = 0
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.prefix}"
+    
+    def start(self):
+        """Serve from a background thread; return self."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def serve_forever(self):
+        self._server.serve_forever()
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    # Subclass hooks ----------------------------------------------------------
+    def route(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Reply:
+        raise NotImplementedError
+    
+    def reject(self, method: str, path: str) -> Optional[Reply]:
+        """Return a reply (e.g. a rate-limit error) to send instead of routing the request."""
+        return None
+    
+    def unauthorized(self) -> Reply:
+        return 401, {"message": "Bad credentials"}, {}
+    
+    def bad_request(self, message: str) -> Reply:
+        return 400, {"message": message}, {}
+    
+    def endpoint(self, method: str, path: str) -> str:
+        """Name the endpoint a request is counted under."""
+        return f"{method} {path}"
+    
+    def extra_stats(self) -> Dict[str, Any]:
+        return {}
+    
+    # Plumbing ------------------------------------------------------------------
+    def _handle(self, method: str, raw_path: str, headers, raw: bytes) -> Reply:
+        parsed = urlparse(raw_path)
+        if parsed.path == "/__stats":
+            return 200, dict(self.stats, **self.extra_stats()), {}
+        
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats[self.endpoint(method, parsed.path)] += 1
+        if not headers.get("Authorization"):
+            return self.unauthorized()
+        
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        
+        rejected = self.reject(method, parsed.path)
+        if rejected is not None:
+            with self._lock:
+                self.stats[str(rejected[0])] += 1
+            return rejected
+        
+        try:
+            body = json.loads(raw) if raw else {}
+            return self.route(method, parsed.path, parse_qs(parsed.query), body)
+        except ValueError as e:
+            return self.bad_request(str(e))
+    
+    def _handler_class(self):
+        standin = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, *args):
+                pass
+            
+            def _dispatch(self):
+                started = time.perf_counter()
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                with standin._lock:
+                    standin.in_flight += 1
+                try:
+                    status, payload, headers = standin._handle(self.command, self.path, self.headers, raw)
+                finally:
+                    with standin._lock:
+                        standin.in_flight -= 1
+                
+                data = json.dumps(payload).encode("utf-8") if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+                
+                if not self.path.startswith("/__stats"):
+                    finished = time.perf_counter()
+                    endpoint = standin.endpoint(self.command, urlparse(self.path).path)
+                    with standin._lock:
+                        standin.records.append(RequestRecord(endpoint, status, finished - started, started))
+            
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+        
+        return Handler
@@ -31,16 +31,14 @@ USAGE (one-time):
 
 Notes:
 - This script uses only official REST APIs (Notion & GitHub). No 3rd-party SDKs for Notion are required.
-- You can re-run safely; exists checks avoid duplication (idempotent-ish). Delete resources manually if you need a clean slate.
+- You can re-run safely: the database is found by title under the parent page and rows by Week number,
+  so only missing pieces are created. Delete resources manually if you need a clean slate.
 """
 
 from __future__ import annotations
 import base64
-import json
 import os
-import sys
-import time
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import requests
 
 try:
@@ -51,6 +49,12 @@ except Exception:
 
 # Import our updated models
 from models import WeekItem, RoadmapData
+from services.concurrency import create_unique, run_ordered
+from services.github_client import get_github_client
+from services.journal import MutationJournal
+from services.metrics import get_metrics, instrument_boto3
+from services.notion_client import get_notion_client
+from services.plan import ExecutionPlan
 
 # -----------------------------
 # Environment & Constants
@@ -62,9 +66,7 @@ GITHUB_USERNAME = os.getenv("GITHUB_USERNAME")
 AWS_REGION = os.getenv("AWS_REGION") or "us-east-1"
 AWS_BUDGET_EMAIL = os.getenv("AWS_BUDGET_EMAIL")
 
-NOTION_VERSION = "2022-06-28"  # stable
-NOTION_BASE = "https://api.notion.com/v1"
-GITHUB_API = "https://api.github.com"
+NOTION_MAX_WORKERS = int(os.getenv("NOTION_MAX_WORKERS") or 4)
 
 # Toggles
 CREATE_LOCAL_FOLDERS = True
@@ -78,6 +80,10 @@ if not NOTION_TOKEN or not NOTION_PARENT_PAGE_ID:
 if not GITHUB_TOKEN or not GITHUB_USERNAME:
     print("[!] Missing GitHub env vars. Please set GITHUB_TOKEN and GITHUB_USERNAME.")
 
+def journaled(journal: Optional[MutationJournal], key: str, fn: Callable[[], Any]) -> Any:
+    """Run a mutation through the journal when one is active."""
+    return journal.once(key, fn) if journal else fn()
+
 # Use the updated models from models.py
 def build_weeks() -> List[WeekItem]:
     """Build the 24-week roadmap data structure using the updated models."""
@@ -86,23 +92,11 @@ def build_weeks() -> List[WeekItem]:
 # -----------------------------
 # Notion helpers
 # -----------------------------
-def notion_headers() -> Dict[str, str]:
-    """Return headers for Notion API requests."""
-    return {
-        "Authorization": f"Bearer {NOTION_TOKEN}",
-        "Notion-Version": NOTION_VERSION,
-        "Content-Type": "application/json",
-    }
+DATABASE_TITLE = "6‑Month Data Engineering Career Plan"
 
-def ensure_notion_database(title: str = "6‑Month Data Engineering Career Plan") -> Optional[str]:
-    """Create a Notion database with the roadmap structure."""
-    if not NOTION_TOKEN or not NOTION_PARENT_PAGE_ID:
-        print("[Notion] Skipping (missing env vars)")
-        return None
-    
-    # Create database under a parent page
-    url = f"{NOTION_BASE}/databases"
-    payload = {
+def build_database_payload(title: str = DATABASE_TITLE) -> Dict:
+    """Build the create-database payload with the roadmap structure."""
+    return {
         "parent": {"type": "page_id", "page_id": NOTION_PARENT_PAGE_ID},
         "title": [{"type": "text", "text": {"content": title}}],
         "properties": {
@@ -128,54 +122,101 @@ def ensure_notion_database(title: str = "6‑Month Data Engineering Career Plan"
             "Dataset": {"url": {}},
         }
     }
+
+def ensure_notion_database(title: str = DATABASE_TITLE) -> Optional[str]:
+    """Create a Notion database with the roadmap structure."""
+    if not NOTION_TOKEN or not NOTION_PARENT_PAGE_ID:
+        print("[Notion] Skipping (missing env vars)")
+        return None
+    
+    payload = build_database_payload(title)
     
-    # Notion has no simple "find by title" for databases; we attempt create and fall back on conflict messages
-    resp = requests.post(url, headers=notion_headers(), data=json.dumps(payload))
-    if resp.status_code == 200:
-        db_id = resp.json()["id"]
-        print(f"[Notion] Database created: {db_id}")
+    # Reuse a database with the same title under the parent page instead of creating a duplicate
+    notion = get_notion_client()
+    db_id = notion.find_child_database(NOTION_PARENT_PAGE_ID, title)
+    if db_id:
+        print(f"[Notion] Database exists: {db_id}")
         return db_id
-    else:
-        # If you accidentally try to create duplicate, you may get 400/409. We'll print details.
-        print(f"[Notion] Create DB response: {resp.status_code} {resp.text}")
+    
+    try:
+        db_id = create_unique(lambda: notion.post("databases", json=payload),
+                              lambda: notion.find_child_database(NOTION_PARENT_PAGE_ID, title))
+    except (RuntimeError, requests.RequestException) as e:
+        print(f"[Notion] Create DB failed: {e}")
         return None
+    print(f"[Notion] Database created: {db_id}")
+    return db_id
 
-def add_weeks_to_notion(db_id: str, weeks: List[WeekItem], repo_urls: Dict[str, str]):
-    """Add all 24 weeks as pages in the Notion database."""
-    if not db_id:
-        return
+def build_week_page(db_id: str, w: WeekItem, repo_urls: Dict[str, str]) -> Dict:
+    """Build the Notion page payload for one week."""
+    github_url = repo_urls.get(w.repo_hint or "", "")
     
-    url = f"{NOTION_BASE}/pages"
-    headers = notion_headers()
+    # Determine priority based on month
+    priority = "High" if w.month <= 2 else "Medium" if w.month <= 4 else "Low"
     
-    for w in weeks:
-        github_url = repo_urls.get(w.repo_hint or "", "")
-        
-        # Determine priority based on month
-        priority = "High" if w.month <= 2 else "Medium" if w.month <= 4 else "Low"
-        
-        page = {
-            "parent": {"database_id": db_id},
-            "properties": {
-                "Week": {"number": w.week},
-                "Month": {"select": {"name": str(w.month)}},
-                "Learning Topic": {"title": [{"type": "text", "text": {"content": w.topic}}]},
-                "Details": {"rich_text": [{"type": "text", "text": {"content": w.details or ""}}]},
-                "Project Phase": {"rich_text": [{"type": "text", "text": {"content": w.project}}]},
-
-                "Status": {"select": {"name": "To Do"}},
-                "Priority": {"select": {"name": priority}},
-                "GitHub": {"url": github_url or None},
-                "Dataset": {"url": w.dataset_url or None},
-            }
+    return {
+        "parent": {"database_id": db_id},
+        "properties": {
+            "Week": {"number": w.week},
+            "Month": {"select": {"name": str(w.month)}},
+            "Learning Topic": {"title": [{"type": "text", "text": {"content": w.topic}}]},
+            "Details": {"rich_text": [{"type": "text", "text": {"content": w.details or ""}}]},
+            "Project Phase": {"rich_text": [{"type": "text", "text": {"content": w.project}}]},
+            
+            "Status": {"select": {"name": "To Do"}},
+            "Priority": {"select": {"name": priority}},
+            "GitHub": {"url": github_url or None},
+            "Dataset": {"url": w.dataset_url or None},
         }
-        
-        r = requests.post(url, headers=headers, data=json.dumps(page))
-        if r.status_code != 200:
-            print(f"[Notion] Failed to add Week {w.week}: {r.status_code} {r.text}")
+    }
+
+def create_week_page(db_id: str, w: WeekItem, repo_urls: Dict[str, str]) -> str:
+    """Create one week page and return its id.
+    
+    Transient failures are retried, but only after checking by Week number that
+    the timed-out attempt did not create the page after all.
+    """
+    notion = get_notion_client()
+    page = build_week_page(db_id, w, repo_urls)
+    return create_unique(lambda: notion.post("pages", json=page),
+                         lambda: notion.find_pages_by_number(db_id, "Week", [w.week]).get(w.week))
+
+def add_weeks_to_notion(db_id: str, weeks: List[WeekItem], repo_urls: Dict[str, str],
+                        journal: Optional[MutationJournal] = None) -> bool:
+    """Add all 24 weeks as pages in the Notion database, NOTION_MAX_WORKERS at a time.
+    
+    Weeks the journal already acknowledged are skipped, and the rest are matched
+    against existing rows by Week number in one query, so re-runs only create
+    what is missing. Returns True when every week exists.
+    """
+    if not db_id:
+        return False
+    
+    todo = [w for w in weeks if not (journal and journal.done(f"notion:week:{w.week}"))]
+    if len(todo) < len(weeks):
+        print(f"[Notion] {len(weeks) - len(todo)} weeks already added (journal)")
+    
+    try:
+        existing = get_notion_client().find_pages_by_number(db_id, "Week", [w.week for w in todo]) if todo else {}
+    except RuntimeError as e:
+        print(f"[Notion] Could not check existing weeks: {e}")
+        return False
+    if existing:
+        print(f"[Notion] {len(existing)} weeks already in the database: {sorted(existing)}")
+        for w in todo:
+            if w.week in existing and journal:
+                journal.ack(f"notion:week:{w.week}", existing[w.week])
+        todo = [w for w in todo if w.week not in existing]
+    
+    results = run_ordered(
+        lambda w: journaled(journal, f"notion:week:{w.week}", lambda: create_week_page(db_id, w, repo_urls)),
+        todo, NOTION_MAX_WORKERS)
+    for result in results:
+        if result.ok:
+            print(f"[Notion] Added Week {result.item.week}")
         else:
-            print(f"[Notion] Added Week {w.week}")
-        time.sleep(0.2)
+            print(f"[Notion] Failed to add Week {result.item.week}: {result.error}")
+    return all(result.ok for result in results)
 
 # -----------------------------
 # GitHub helpers
@@ -364,17 +405,9 @@ from pyspark.sql import SparkSession
 """,
 }
 
-def gh_headers() -> Dict[str, str]:
-    """Return headers for GitHub API requests."""
-    return {
-        "Authorization": f"Bearer {GITHUB_TOKEN}",
-        "Accept": "application/vnd.github+json",
-    }
-
 def github_repo_exists(name: str) -> bool:
     """Check if a GitHub repository already exists."""
-    url = f"{GITHUB_API}/repos/{GITHUB_USERNAME}/{name}"
-    r = requests.get(url, headers=gh_headers())
+    r = get_github_client().get(f"repos/{GITHUB_USERNAME}/{name}")
     return r.status_code == 200
 
 def create_github_repo(name: str, description: str) -> str:
@@ -387,7 +420,6 @@ def create_github_repo(name: str, description: str) -> str:
         print(f"[GitHub] Repo exists: {name}")
         return f"https://github.com/{GITHUB_USERNAME}/{name}"
     
-    url = f"{GITHUB_API}/user/repos"
     payload = {
         "name": name,
         "description": description,
@@ -395,7 +427,7 @@ def create_github_repo(name: str, description: str) -> str:
         "auto_init": True,
     }
     
-    r = requests.post(url, headers=gh_headers(), data=json.dumps(payload))
+    r = get_github_client().post("user/repos", json=payload)
     if r.status_code not in (201, 202):
         print(f"[GitHub] Failed to create repo {name}: {r.status_code} {r.text}")
         return ""
@@ -403,44 +435,72 @@ def create_github_repo(name: str, description: str) -> str:
     print(f"[GitHub] Created repo {name}")
     return f"https://github.com/{GITHUB_USERNAME}/{name}"
 
-def put_github_file(repo: str, path: str, content: str, message: str = "add file") -> bool:
-    """Add a file to a GitHub repository."""
-    url = f"{GITHUB_API}/repos/{GITHUB_USERNAME}/{repo}/contents/{path}"
-    data = {
+def github_file_body(content: str, message: str) -> Dict[str, str]:
+    """Build the contents-API payload that creates one file."""
+    return {
         "message": message,
         "content": base64.b64encode(content.encode("utf-8")).decode("utf-8"),
     }
+
+def put_github_file(repo: str, path: str, content: str, message: str = "add file") -> bool:
+    """Add a file to a GitHub repository."""
+    data = github_file_body(content, message)
     
-    r = requests.put(url, headers=gh_headers(), data=json.dumps(data))
+    r = get_github_client().put(f"repos/{GITHUB_USERNAME}/{repo}/contents/{path}", json=data)
     if r.status_code not in (201, 200):
         print(f"[GitHub] Failed to create {repo}:{path}: {r.status_code} {r.text}")
         return False
     return True
 
-def scaffold_repo(name: str):
-    """Create the folder structure and starter files for a repository."""
-    # README
-    readme = README_TEMPLATES.get(name, f"# {name}\n")
-    put_github_file(name, "README.md", readme, message="chore: add README")
-    
-    # Files/folders
+def scaffold_files(name: str) -> List[Tuple[str, str, str]]:
+    """Return (path, content, commit message) for the README and starter files of a repository."""
+    files = [("README.md", README_TEMPLATES.get(name, f"# {name}\n"), "chore: add README")]
     for rel in REPO_SCAFFOLDS.get(name, []):
         # If endswith .png/.ipynb placeholder binary vs text; we push empty placeholder for binary
         if rel.endswith(".png"):
             content = ""  # empty placeholder (GitHub will store an empty file)
         else:
             content = STARTER_FILE_CONTENT.get(rel, "# TODO\n")
-        put_github_file(name, rel, content, message=f"chore: scaffold {rel}")
-        time.sleep(0.2)
+        files.append((rel, content, f"chore: scaffold {rel}"))
+    return files
 
-def ensure_github_repos() -> Dict[str, str]:
+def list_github_files(name: str) -> Optional[set]:
+    """Return every file path in a repository's default branch (one API call), or None on errors."""
+    r = get_github_client().get(f"repos/{GITHUB_USERNAME}/{name}/git/trees/HEAD", params={"recursive": 1})
+    if r.status_code != 200:
+        return None
+    return {item["path"] for item in r.json().get("tree", []) if item.get("type") == "blob"}
+
+def scaffold_repo(name: str, journal: Optional[MutationJournal] = None):
+    """Create the folder structure and starter files for a repository.
+    
+    Files already in the repository are skipped (one tree read), so re-runs only
+    upload what is missing.
+    """
+    # A repo created moments ago may not list its tree yet; auto_init committed a README
+    existing = list_github_files(name) or {"README.md"}
+    skipped = 0
+    for rel, content, message in scaffold_files(name):
+        key = f"github:file:{name}/{rel}"
+        if journal and journal.done(key):
+            continue
+        if rel in existing:
+            skipped += 1
+            if journal:
+                journal.ack(key, True)
+            continue
+        journaled(journal, key, lambda: put_github_file(name, rel, content, message=message))
+    if skipped:
+        print(f"[GitHub] {skipped} files already in {name}")
+
+def ensure_github_repos(journal: Optional[MutationJournal] = None) -> Dict[str, str]:
     """Create all GitHub repositories and return their URLs."""
     repo_urls: Dict[str, str] = {}
     for repo, desc in PROJECTS:
-        url = create_github_repo(repo, desc)
+        url = journaled(journal, f"github:repo:{repo}", lambda: create_github_repo(repo, desc))
         if url:
             repo_urls[repo] = url
-            scaffold_repo(repo)
+            scaffold_repo(repo, journal)
     return repo_urls
 
 # -----------------------------
@@ -482,8 +542,8 @@ def create_aws_budget():
     
     try:
         import boto3
-        client = boto3.client("budgets", region_name=AWS_REGION)
-        account_id = boto3.client("sts").get_caller_identity()["Account"]
+        client = instrument_boto3(boto3.client("budgets", region_name=AWS_REGION))
+        account_id = instrument_boto3(boto3.client("sts")).get_caller_identity()["Account"]
         
         budget_name = "LearningBudget-$5"
         budget = {
@@ -514,22 +574,84 @@ def create_aws_budget():
     except Exception as e:
         print(f"[AWS] Skipping budget creation ({e})")
 
+# -----------------------------
+# Plan (dry run)
+# -----------------------------
+def plan_bootstrap(plan: Optional[ExecutionPlan] = None) -> Optional[ExecutionPlan]:
+    """Plan every GitHub and Notion write a bootstrap run would make, reading state only.
+    
+    Existing repos, files, the database and weeks already in it are skipped, the
+    same way a real run skips them. Local folders and the AWS budget are not
+    API calls and are left out. Returns None when the existing weeks could not
+    be read.
+    """
+    plan = plan if plan is not None else ExecutionPlan("bootstrap")
+    repo_urls: Dict[str, str] = {}
+    
+    if GITHUB_TOKEN and GITHUB_USERNAME:
+        for repo, desc in PROJECTS:
+            if github_repo_exists(repo):
+                existing = list_github_files(repo) or set()
+            else:
+                plan.add("github", "POST", "user/repos", f"github:repo:{repo}",
+                         {"name": repo, "description": desc, "private": REPOS_PRIVATE, "auto_init": True},
+                         label=f"Create repo {repo}", idempotent=False)
+                existing = {"README.md"}  # auto_init commits a README
+            repo_urls[repo] = f"https://github.com/{GITHUB_USERNAME}/{repo}"
+            for rel, content, message in scaffold_files(repo):
+                if rel not in existing:
+                    plan.add("github", "PUT", f"repos/{GITHUB_USERNAME}/{repo}/contents/{rel}",
+                             f"github:file:{repo}/{rel}", github_file_body(content, message),
+                             label=f"Add {repo}/{rel}", phase=1)
+    
+    if NOTION_TOKEN and NOTION_PARENT_PAGE_ID:
+        notion = get_notion_client()
+        weeks = build_weeks()
+        db_id = notion.find_child_database(NOTION_PARENT_PAGE_ID, DATABASE_TITLE)
+        if db_id:
+            try:
+                existing_weeks = notion.find_pages_by_number(db_id, "Week", [w.week for w in weeks])
+            except RuntimeError as e:
+                print(f"❌ {e}")
+                return None
+        else:
+            plan.add("notion", "POST", "databases", "notion:database", build_database_payload(),
+                     label="Create roadmap database", idempotent=False)
+            db_id, existing_weeks = "{ref:notion:database}", {}
+        for w in weeks:
+            if w.week not in existing_weeks:
+                plan.add("notion", "POST", "pages", f"notion:week:{w.week}", build_week_page(db_id, w, repo_urls),
+                         label=f"Add Week {w.week}", phase=1, idempotent=False)
+    return plan
+
 # -----------------------------
 # Main Orchestration
 # -----------------------------
-def main():
-    """Main function to orchestrate the entire setup process."""
+def main() -> bool:
+    """Main function to orchestrate the entire setup process; True when every journaled step succeeded."""
     print("🚀 Starting Data Engineering Roadmap Bootstrap...")
     
+    # Mutations are journaled so an interrupted run resumes where it stopped
+    journal = MutationJournal("bootstrap")
+    if journal.resuming:
+        print(f"♻️  Resuming interrupted bootstrap ({len(journal.pending())} unacknowledged steps in {journal.path})")
+    
     # 1) GitHub repos
     print("\n📁 Creating GitHub repositories...")
-    repo_urls = ensure_github_repos()
+    repo_urls = ensure_github_repos(journal)
     
     # 2) Notion database + rows
     print("\n📊 Setting up Notion database...")
-    db_id = ensure_notion_database()
+    db_id = journaled(journal, "notion:database", ensure_notion_database)
     weeks = build_weeks()
-    add_weeks_to_notion(db_id, weeks, repo_urls)
+    weeks_ok = add_weeks_to_notion(db_id, weeks, repo_urls, journal)
+    # Failed GitHub and Notion steps stay planned but unacknowledged; keep the journal for those
+    ok = weeks_ok and not journal.pending()
+    if ok:
+        journal.complete()
+    else:
+        journal.close()
+        print(f"⚠️  Some steps did not finish; re-run to resume from {journal.path}")
     
     # 3) Local mirrors (optional)
     print("\n💻 Creating local project folders...")
@@ -549,11 +671,15 @@ def main():
     else:
         print("Notion: database not created (check logs)")
     
+    # Where the time went: API latency vs. our own rate limiting
+    get_metrics().print_summary()
+    
     print("\n🎯 Next steps:")
     print("1. Check your Notion database for the 24-week roadmap")
     print("2. Clone the GitHub repos locally to start coding")
     print("3. Set up your AWS account for the projects")
     print("4. Start with Week 1 - SQL basics!")
+    return ok
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
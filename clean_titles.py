@@ -6,39 +6,21 @@ since that information is already in the Details section.
 
 import json
 import os
-import requests
-import time
 from typing import Dict, List, Optional, Any
 from dotenv import load_dotenv
 
+from services.mutation_buffer import MutationBuffer
+from services.notion_client import get_notion_client, iter_database_pages
+
 load_dotenv()
 
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
-NOTION_VERSION = "2022-06-28"
-NOTION_BASE = "https://api.notion.com/v1"
+
+notion = get_notion_client()
 
 # The enhanced database ID
 ENHANCED_DB_ID = "2600693c-0443-81cc-ac0e-e94f2fa52616"
 
-def notion_headers() -> Dict[str, str]:
-    return {
-        "Authorization": f"Bearer {NOTION_TOKEN}",
-        "Notion-Version": NOTION_VERSION,
-        "Content-Type": "application/json",
-    }
-
-def get_all_pages(db_id: str) -> List[Dict[str, Any]]:
-    """Get all pages from a database."""
-    url = f"{NOTION_BASE}/databases/{db_id}/query"
-    payload = {"page_size": 100}
-    
-    response = requests.post(url, headers=notion_headers(), json=payload)
-    if response.status_code == 200:
-        return response.json().get("results", [])
-    else:
-        print(f"❌ Failed to query database: {response.status_code}")
-        return []
-
 def clean_title(title: str) -> str:
     """Remove content after hyphen (-) from title."""
     if " - " in title:
@@ -52,7 +34,7 @@ def clean_title(title: str) -> str:
 
 def update_page_title(page_id: str, new_title: str) -> bool:
     """Update a page's Learning Topic title."""
-    url = f"{NOTION_BASE}/pages/{page_id}"
+    path = f"pages/{page_id}"
     payload = {
         "properties": {
             "Learning Topic": {
@@ -61,52 +43,64 @@ def update_page_title(page_id: str, new_title: str) -> bool:
         }
     }
     
-    response = requests.patch(url, headers=notion_headers(), json=payload)
+    response = notion.patch(path, json=payload)
     if response.status_code == 200:
         return True
     else:
         print(f"❌ Failed to update page: {response.status_code} - {response.text}")
         return False
 
-def clean_all_titles():
-    """Clean up all Learning Topic titles in the database."""
-    print("🔍 Getting all pages from database...")
-    pages = get_all_pages(ENHANCED_DB_ID)
+def clean_all_titles(buffer: Optional[MutationBuffer] = None):
+    """Clean up all Learning Topic titles in the database.
     
-    if not pages:
-        print("❌ No pages found")
-        return False
+    With a ``buffer`` the title updates are queued (no prompt) for the caller
+    to flush together with other stages.
+    """
+    print("🔍 Getting pages with hyphenated titles from database...")
     
-    print(f"📄 Found {len(pages)} pages")
+    # Only titles containing a hyphen can need cleaning; fetch just the two columns we read
+    pages = iter_database_pages(
+        ENHANCED_DB_ID,
+        filter={"property": "Learning Topic", "title": {"contains": "-"}},
+        filter_properties=["Learning Topic", "Week"],
+    )
     
-    # Analyze and clean titles
+    # Analyze and clean titles while later pages are still streaming in
+    page_count = 0
     updates_needed = []
     
-    for page in pages:
-        page_id = page["id"]
-        properties = page.get("properties", {})
-        
-        # Get current title
-        current_title = ""
-        week_num = "?"
-        
-        if "Learning Topic" in properties:
-            title_items = properties["Learning Topic"].get("title", [])
-            current_title = "".join([item.get("plain_text", "") for item in title_items])
-        
-        if "Week" in properties and properties["Week"].get("number"):
-            week_num = properties["Week"]["number"]
-        
-        # Clean the title
-        cleaned_title = clean_title(current_title)
-        
-        if cleaned_title != current_title:
-            updates_needed.append({
-                "page_id": page_id,
-                "week": week_num,
-                "old_title": current_title,
-                "new_title": cleaned_title
-            })
+    try:
+        for page in pages:
+            page_count += 1
+            page_id = page["id"]
+            properties = page.get("properties", {})
+            
+            # Get current title
+            current_title = ""
+            week_num = "?"
+            
+            if "Learning Topic" in properties:
+                title_items = properties["Learning Topic"].get("title", [])
+                current_title = "".join([item.get("plain_text", "") for item in title_items])
+            
+            if "Week" in properties and properties["Week"].get("number"):
+                week_num = properties["Week"]["number"]
+            
+            # Clean the title
+            cleaned_title = clean_title(current_title)
+            
+            if cleaned_title != current_title:
+                updates_needed.append({
+                    "page_id": page_id,
+                    "week": week_num,
+                    "old_title": current_title,
+                    "new_title": cleaned_title
+                })
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return False
+    
+    print(f"📄 Found {page_count} pages with hyphenated titles")
     
     if not updates_needed:
         print("✅ All titles are already clean! No updates needed.")
@@ -121,6 +115,14 @@ def clean_all_titles():
         if i == 4 and len(updates_needed) > 5:
             print(f"   ... and {len(updates_needed) - 5} more")
     
+    if buffer is not None:
+        for update in updates_needed:
+            buffer.add(update["page_id"], {"Learning Topic": {
+                "title": [{"type": "text", "text": {"content": update["new_title"]}}]
+            }}, week=update["week"] if update["week"] != "?" else None)
+        print(f"📦 Queued {len(updates_needed)} title updates")
+        return True
+    
     # Ask for confirmation
     confirm = input(f"\n❓ Update {len(updates_needed)} titles? (y/N): ").lower().strip()
     if confirm != 'y':
@@ -141,8 +143,6 @@ def clean_all_titles():
             print(f"   ✅ Updated Week {week}: {new_title}")
         else:
             print(f"   ❌ Failed Week {week}")
-        
-        time.sleep(0.3)  # Rate limiting
     
     print(f"\n🎉 Successfully updated {success_count}/{len(updates_needed)} titles!")
     print(f"🔗 Check your database: https://www.notion.so/{ENHANCED_DB_ID.replace('-', '')}")
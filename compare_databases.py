@@ -3,92 +3,82 @@
 Compare Notion databases in detail to see which has better content.
 """
 
-import json
 import os
-import requests
-from typing import Dict, List, Optional, Any
+from itertools import combinations
 from dotenv import load_dotenv
 
+from config import Config
+from services.concurrency import run_ordered
+from services.digest import DatabaseDigest, DigestDiff
+from services.mirror import get_mirror
+
 load_dotenv()
 
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
-NOTION_VERSION = "2022-06-28"
-NOTION_BASE = "https://api.notion.com/v1"
-
-def notion_headers() -> Dict[str, str]:
-    return {
-        "Authorization": f"Bearer {NOTION_TOKEN}",
-        "Notion-Version": NOTION_VERSION,
-        "Content-Type": "application/json",
-    }
 
-def get_all_pages(db_id: str) -> List[Dict[str, Any]]:
-    """Get all pages from a database."""
-    url = f"{NOTION_BASE}/databases/{db_id}/query"
-    all_pages = []
-    has_more = True
-    next_cursor = None
+def print_digest_diff(name_a: str, name_b: str, diff: DigestDiff, limit: int = 20):
+    """Print the row-level differences between two databases."""
+    print(f"\n🔀 {name_a} → {name_b}")
+    if diff.identical:
+        print("   ✅ Identical content (Merkle roots match)")
+        return
     
-    while has_more:
-        payload = {"page_size": 100}
-        if next_cursor:
-            payload["start_cursor"] = next_cursor
-            
-        response = requests.post(url, headers=notion_headers(), json=payload)
-        if response.status_code == 200:
-            data = response.json()
-            all_pages.extend(data.get("results", []))
-            has_more = data.get("has_more", False)
-            next_cursor = data.get("next_cursor")
-        else:
-            print(f"❌ Failed to query database: {response.status_code}")
-            break
-    
-    return all_pages
+    print(f"   {len(diff.added)} added, {len(diff.removed)} removed, {len(diff.changed)} changed rows "
+          f"({diff.buckets_compared}/{DatabaseDigest.BUCKETS} buckets differ)")
+    lines = [f"   + Week {key} only in {name_b}" for key in diff.added]
+    lines += [f"   - Week {key} only in {name_a}" for key in diff.removed]
+    lines += [f"   ~ Week {key}: {', '.join(props)}" for key, props in diff.changed.items()]
+    for line in lines[:limit]:
+        print(line)
+    if len(lines) > limit:
+        print(f"   ... and {len(lines) - limit} more")
 
-def extract_text_from_property(prop: Dict[str, Any]) -> str:
-    """Extract text content from various Notion property types."""
-    prop_type = prop.get("type", "")
+def compare_databases(sync: bool = True):
+    """Compare the three databases in detail.
     
-    if prop_type == "title":
-        items = prop.get("title", [])
-        return "".join([item.get("plain_text", "") for item in items])
-    elif prop_type == "rich_text":
-        items = prop.get("rich_text", [])
-        return "".join([item.get("plain_text", "") for item in items])
-    elif prop_type == "select":
-        select_obj = prop.get("select")
-        return select_obj.get("name", "") if select_obj else ""
-    elif prop_type == "number":
-        return str(prop.get("number", "")) if prop.get("number") is not None else ""
-    elif prop_type == "url":
-        return prop.get("url", "") or ""
-    else:
-        return f"[{prop_type}]"
-
-def compare_databases():
-    """Compare the three databases in detail."""
+    Reads come from the local mirror; with ``sync`` only pages edited since the
+    last run are fetched from Notion first, for all databases concurrently.
+    Each database is summarized by a Merkle root over its row hashes, and every
+    pair is diffed row by row (matched by Week) over the properties both
+    databases share. Returns True when every database could be fetched.
+    """
     databases = [
         ("Database 1 (Latest)", "2600693c-0443-81e9-ac47-e287876d151f"),
         ("Database 2 (Enhanced)", "2600693c-0443-81cc-ac0e-e94f2fa52616"), 
         ("Database 3 (Original)", "2600693c-0443-81f6-b1f3-d813609556d8")
     ]
     
-    for name, db_id in databases:
+    mirror = get_mirror()
+    available = []
+    
+    def fetch(database):
+        """Refresh one database in the mirror; return (synced pages, database object)."""
+        _, db_id = database
+        changed = mirror.sync(db_id) if sync else None
+        return changed, mirror.database(db_id)
+    
+    # Sync all databases concurrently under the shared rate limiter, then report in order
+    print(f"🔄 Fetching {len(databases)} databases...")
+    fetched = run_ordered(fetch, databases, Config.NOTION_MAX_WORKERS)
+    
+    for (name, db_id), result in zip(databases, fetched):
         print(f"\n{'='*60}")
         print(f"🔍 {name}")
         print(f"ID: {db_id}")
         print('='*60)
         
-        # Get database info
-        db_url = f"{NOTION_BASE}/databases/{db_id}"
-        db_response = requests.get(db_url, headers=notion_headers())
+        if not result.ok:
+            print(f"❌ Could not fetch database: {result.error}")
+            continue
         
-        if db_response.status_code != 200:
-            print(f"❌ Could not access database: {db_response.status_code}")
+        changed, db_info = result.value
+        if changed is not None:
+            print(f"🔄 Synced {changed} changed pages")
+        
+        if not db_info:
+            print("❌ Could not access database")
             continue
-            
-        db_info = db_response.json()
+        
         properties = db_info.get("properties", {})
         
         print(f"📋 Properties ({len(properties)}):")
@@ -96,25 +86,34 @@ def compare_databases():
             prop_type = prop_info.get("type", "unknown")
             print(f"   • {prop_name}: {prop_type}")
         
-        # Get all pages
-        pages = get_all_pages(db_id)
-        print(f"\n📄 Total Pages: {len(pages)}")
-        
-        if pages:
-            print(f"\n📝 Sample Content (First 3 rows):")
-            for i, page in enumerate(pages[:3]):
-                print(f"\n   Row {i+1}:")
-                page_props = page.get("properties", {})
-                
-                for prop_name, prop_data in page_props.items():
-                    content = extract_text_from_property(prop_data)
-                    if content:  # Only show non-empty content
-                        # Truncate long content
-                        if len(content) > 100:
-                            content = content[:100] + "..."
-                        print(f"     {prop_name}: {content}")
+        digest = DatabaseDigest.build(mirror.pages(db_id), properties)
+        print(f"\n📄 Total Pages: {mirror.count(db_id)}")
+        print(f"🌳 Merkle root: {digest.root[:16]} ({len(digest.rows)} rows by Week)")
+        if digest.duplicates or digest.unkeyed:
+            print(f"   ⚠️  {digest.duplicates} duplicate weeks, {digest.unkeyed} rows without a Week")
         
         print(f"\n🔗 Direct Link: https://www.notion.so/{db_id.replace('-', '')}")
+        available.append((name, db_id, properties))
+    
+    ok = len(available) == len(databases)
+    if len(available) < 2:
+        return ok
+    
+    print(f"\n{'='*60}")
+    print("🧮 Row-level differences (matched by Week, shared properties only)")
+    print('='*60)
+    for (name_a, id_a, schema_a), (name_b, id_b, schema_b) in combinations(available, 2):
+        shared = [prop_name for prop_name in schema_a if prop_name in schema_b]
+        only_a = [prop_name for prop_name in schema_a if prop_name not in schema_b]
+        only_b = [prop_name for prop_name in schema_b if prop_name not in schema_a]
+        
+        digest_a = DatabaseDigest.build(mirror.pages(id_a), schema_a, shared)
+        digest_b = DatabaseDigest.build(mirror.pages(id_b), schema_b, shared)
+        print_digest_diff(name_a, name_b, digest_a.diff(digest_b))
+        if only_a or only_b:
+            print(f"   Schema: only in {name_a}: {only_a or '-'}; only in {name_b}: {only_b or '-'}")
+    
+    return ok
 
 if __name__ == "__main__":
     compare_databases()
\ No newline at end of file
@@ -12,10 +12,10 @@ except ImportError:
 class Config:
     """Configuration class to manage environment variables and settings."""
     
-    # API Endpoints
-    NOTION_BASE = "https://api.notion.com/v1"
+    # API Endpoints (can point at the local stand-ins in benchmarks/)
+    NOTION_BASE = os.getenv("NOTION_BASE", "https://api.notion.com/v1")
     NOTION_VERSION = "2022-06-28"
-    GITHUB_API = "https://api.github.com"
+    GITHUB_API = os.getenv("GITHUB_API", "https://api.github.com")
     
     # Environment Variables
     NOTION_TOKEN = os.getenv("NOTION_TOKEN")
@@ -25,6 +25,34 @@ class Config:
     AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
     AWS_BUDGET_EMAIL = os.getenv("AWS_BUDGET_EMAIL")
     
+    # HTTP Connection Pooling
+    NOTION_POOL_SIZE = int(os.getenv("NOTION_POOL_SIZE", "10"))
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+    
+    # Rate Limiting (Notion allows ~3 requests/second on average with short bursts)
+    NOTION_RATE_LIMIT = float(os.getenv("NOTION_RATE_LIMIT", "3"))
+    NOTION_BURST = int(os.getenv("NOTION_BURST", "5"))
+    NOTION_MAX_RETRIES = int(os.getenv("NOTION_MAX_RETRIES", "5"))
+    NOTION_MAX_WORKERS = int(os.getenv("NOTION_MAX_WORKERS", "4"))
+    
+    # Schema Cache
+    SCHEMA_CACHE_TTL = float(os.getenv("SCHEMA_CACHE_TTL", "300"))
+    
+    # Local Mirror
+    MIRROR_PATH = os.getenv("NOTION_MIRROR_PATH", ".notion_mirror.sqlite3")
+    
+    # Write-Ahead Journal (resume interrupted bulk writes)
+    JOURNAL_DIR = os.getenv("NOTION_JOURNAL_DIR", ".journal")
+    
+    # Rollback manifests written by bulk archive operations
+    ARCHIVE_MANIFEST_DIR = os.getenv("NOTION_ARCHIVE_DIR", ".archive_manifests")
+    
+    # Plan/apply wall-time estimates (assumed seconds per request round-trip)
+    PLAN_REQUEST_LATENCY = float(os.getenv("PLAN_REQUEST_LATENCY", "0.35"))
+    
+    # Request metrics written at exit (.prom/.txt: Prometheus text, otherwise JSON)
+    METRICS_PATH = os.getenv("METRICS_PATH")
+    
     # Feature Toggles
     CREATE_LOCAL_FOLDERS = True
     CREATE_AWS_BUDGET = False
@@ -6,50 +6,33 @@ while preserving its visual enhancements.
 
 import json
 import os
-import requests
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
 from dotenv import load_dotenv
-from models import RoadmapData
+
+from services.mutation_buffer import MutationBuffer
+from services.notion_client import get_notion_client
+from services.reconcile import DesiredState, Reconciler, text_property
+from services.schema import get_schema_cache
+from models import RoadmapData, WeekItem
 
 load_dotenv()
 
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
-NOTION_VERSION = "2022-06-28"
-NOTION_BASE = "https://api.notion.com/v1"
+
+notion = get_notion_client()
 
 # The enhanced database ID
 ENHANCED_DB_ID = "2600693c-0443-81cc-ac0e-e94f2fa52616"
 
-def notion_headers() -> Dict[str, str]:
-    return {
-        "Authorization": f"Bearer {NOTION_TOKEN}",
-        "Notion-Version": NOTION_VERSION,
-        "Content-Type": "application/json",
-    }
-
-def get_all_pages(db_id: str) -> List[Dict[str, Any]]:
-    """Get all pages from a database."""
-    url = f"{NOTION_BASE}/databases/{db_id}/query"
-    payload = {"page_size": 100}
-    
-    response = requests.post(url, headers=notion_headers(), json=payload)
-    if response.status_code == 200:
-        return response.json().get("results", [])
-    else:
-        print(f"❌ Failed to query database: {response.status_code}")
-        return []
-
 def add_details_property_to_database():
     """Add a Details property to the enhanced database."""
-    url = f"{NOTION_BASE}/databases/{ENHANCED_DB_ID}"
+    path = f"databases/{ENHANCED_DB_ID}"
     
-    # First get current database structure
-    response = requests.get(url, headers=notion_headers())
-    if response.status_code != 200:
-        print(f"❌ Could not get database: {response.status_code}")
+    # First get current database structure (shared with the other stages via the schema cache)
+    db_info = get_schema_cache().get(ENHANCED_DB_ID)
+    if not db_info:
         return False
     
-    db_info = response.json()
     current_properties = db_info.get("properties", {})
     
     # Check if Details property already exists
@@ -63,92 +46,64 @@ def add_details_property_to_database():
     
     payload = {"properties": new_properties}
     
-    response = requests.patch(url, headers=notion_headers(), json=payload)
+    response = notion.patch(path, json=payload)
     if response.status_code == 200:
+        get_schema_cache().invalidate(ENHANCED_DB_ID)
         print("✅ Added Details property to database!")
         return True
     else:
         print(f"❌ Failed to add Details property: {response.status_code} - {response.text}")
         return False
 
-def update_pages_with_enhanced_content():
-    """Update existing pages with our enhanced content."""
+def build_enhanced_state(weeks: List[WeekItem]) -> DesiredState:
+    """Desired Learning Topic, Details, Project Phase and Dataset/Resource per week."""
+    desired: DesiredState = {}
+    for week in weeks:
+        props = {
+            "Learning Topic": text_property("title", week.topic),
+            "Project Phase": text_property("rich_text", week.project),
+        }
+        # Add Details field with bullet points
+        if week.details:
+            props["Details"] = text_property("rich_text", week.details)
+        # Update Dataset/Resource if available
+        if week.dataset_url:
+            props["Dataset/Resource"] = {"url": week.dataset_url}
+        desired[week.week] = props
+    return desired
+
+def update_pages_with_enhanced_content(buffer: Optional[MutationBuffer] = None,
+                                       planned_properties: Iterable[str] = ()):
+    """Update existing pages with our enhanced content, patching only what differs.
+    
+    With a ``buffer`` the patches are queued for the caller to flush instead of sent.
+    ``planned_properties`` names columns that will exist by the time they are.
+    """
     print("🔄 Getting enhanced roadmap data...")
     weeks = RoadmapData.build_weeks()
     
-    # Create a mapping of week number to enhanced data
-    week_data = {w.week: w for w in weeks}
-    
-    print("📄 Getting existing pages...")
-    pages = get_all_pages(ENHANCED_DB_ID)
-    
-    if not pages:
-        print("❌ No pages found in database")
+    print("📄 Comparing existing pages with enhanced content...")
+    reconciler = Reconciler(ENHANCED_DB_ID)
+    # Keep decorated titles (e.g. emoji prefixes) that already contain the clean topic
+    patches = reconciler.plan(build_enhanced_state(weeks), contains_ok=["Learning Topic"],
+                              planned_properties=planned_properties)
+    if patches is None:
         return False
     
-    print(f"📝 Updating {len(pages)} pages with enhanced content...")
+    if not patches:
+        print("   ℹ️  All pages are up to date - no updates needed")
+        return True
+    
+    if buffer is not None:
+        buffer.extend(patches)
+        print(f"📦 Queued enhanced content for {len(patches)} pages")
+        return True
     
-    success_count = 0
-    for page in pages:
-        page_id = page["id"]
-        properties = page.get("properties", {})
-        
-        # Get the week number from this page
-        week_num = None
-        if "Week" in properties and properties["Week"].get("number"):
-            week_num = properties["Week"]["number"]
-        
-        if not week_num or week_num not in week_data:
-            print(f"   ⚠️  Skipping page - could not determine week number")
-            continue
-        
-        enhanced_week = week_data[week_num]
-        
-        # Prepare updates
-        updates = {}
-        
-        # Update Learning Topic with clean title (preserve existing format if it's good)
-        current_topic = ""
-        if "Learning Topic" in properties:
-            title_items = properties["Learning Topic"].get("title", [])
-            current_topic = "".join([item.get("plain_text", "") for item in title_items])
-        
-        # Only update if current topic is different from our clean version
-        if enhanced_week.topic not in current_topic:
-            updates["Learning Topic"] = {
-                "title": [{"type": "text", "text": {"content": enhanced_week.topic}}]
-            }
-        
-        # Add Details field with bullet points
-        if enhanced_week.details:
-            updates["Details"] = {
-                "rich_text": [{"type": "text", "text": {"content": enhanced_week.details}}]
-            }
-        
-        # Update Project Phase with clean format
-        updates["Project Phase"] = {
-            "rich_text": [{"type": "text", "text": {"content": enhanced_week.project}}]
-        }
-        
-        # Update Dataset/Resource if available
-        if enhanced_week.dataset_url and "Dataset/Resource" in properties:
-            updates["Dataset/Resource"] = {"url": enhanced_week.dataset_url}
-        
-        # Apply updates
-        if updates:
-            url = f"{NOTION_BASE}/pages/{page_id}"
-            payload = {"properties": updates}
-            
-            response = requests.patch(url, headers=notion_headers(), json=payload)
-            if response.status_code == 200:
-                success_count += 1
-                print(f"   ✅ Updated Week {week_num}")
-            else:
-                print(f"   ❌ Failed Week {week_num}: {response.status_code}")
-        else:
-            print(f"   ℹ️  Week {week_num} - no updates needed")
+    print(f"📝 Updating {len(patches)} pages with enhanced content...")
+    results = reconciler.apply(patches)
+    success_count = sum(1 for r in results if r.ok)
     
-    print(f"\n🎉 Successfully updated {success_count} pages!")
+    print(f"\n🎉 Successfully updated {success_count}/{len(patches)} pages!")
     return success_count > 0
 
 def main():
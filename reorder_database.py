@@ -5,175 +5,254 @@ Reorder the Notion database so Week 1 appears at the top (ascending order).
 
 import json
 import os
-import requests
-import time
 from typing import Dict, List, Optional, Any
 from dotenv import load_dotenv
 
+from add_subtasks_from_csv import subtask_ledger
+from services.archiver import BulkArchiver
+from services.journal import MutationJournal
+from services.notion_client import MAX_BLOCK_CHILDREN, get_notion_client, iter_database_pages
+
 load_dotenv()
 
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
-NOTION_VERSION = "2022-06-28"
-NOTION_BASE = "https://api.notion.com/v1"
+
+notion = get_notion_client()
 
 # The enhanced database ID
 ENHANCED_DB_ID = "2600693c-0443-81cc-ac0e-e94f2fa52616"
 
-def notion_headers() -> Dict[str, str]:
-    return {
-        "Authorization": f"Bearer {NOTION_TOKEN}",
-        "Notion-Version": NOTION_VERSION,
-        "Content-Type": "application/json",
-    }
+# Computed or system-managed properties that cannot be written on create
+READ_ONLY_PROPERTY_TYPES = {
+    "formula", "rollup", "created_time", "created_by", "last_edited_time", "last_edited_by",
+    "unique_id", "verification", "button",
+}
 
-def get_all_pages(db_id: str) -> List[Dict[str, Any]]:
-    """Get all pages from a database."""
-    url = f"{NOTION_BASE}/databases/{db_id}/query"
-    payload = {"page_size": 100}
-    
-    response = requests.post(url, headers=notion_headers(), json=payload)
-    if response.status_code == 200:
-        return response.json().get("results", [])
-    else:
-        print(f"❌ Failed to query database: {response.status_code}")
-        return []
+# Blocks the API lists but will not create
+UNCOPYABLE_BLOCK_TYPES = {"child_page", "child_database", "synced_block", "unsupported"}
 
 def extract_page_data(page: Dict[str, Any]) -> Dict[str, Any]:
-    """Extract all data from a page."""
+    """Extract every writable property of a page as a create payload."""
     properties = page.get("properties", {})
     extracted = {}
     
     for prop_name, prop_data in properties.items():
         prop_type = prop_data.get("type", "")
+        if prop_type in READ_ONLY_PROPERTY_TYPES:
+            continue
+        value = prop_data.get(prop_type)
         
-        if prop_type == "title":
-            items = prop_data.get("title", [])
-            extracted[prop_name] = {"title": items}
-        elif prop_type == "rich_text":
-            items = prop_data.get("rich_text", [])
-            extracted[prop_name] = {"rich_text": items}
-        elif prop_type == "select":
-            select_obj = prop_data.get("select")
-            if select_obj:
-                extracted[prop_name] = {"select": {"name": select_obj.get("name", "")}}
-        elif prop_type == "number":
-            number = prop_data.get("number")
-            if number is not None:
-                extracted[prop_name] = {"number": number}
-        elif prop_type == "url":
-            url = prop_data.get("url")
-            if url:
-                extracted[prop_name] = {"url": url}
+        if prop_type in ("title", "rich_text"):
+            extracted[prop_name] = {prop_type: value or []}
+        elif prop_type in ("select", "status"):
+            if value:
+                extracted[prop_name] = {prop_type: {"name": value.get("name", "")}}
+        elif prop_type == "multi_select":
+            extracted[prop_name] = {"multi_select": [{"name": option.get("name", "")} for option in value or []]}
+        elif prop_type in ("people", "relation"):
+            extracted[prop_name] = {prop_type: [{"id": item["id"]} for item in value or []]}
+        elif prop_type == "files":
+            # Notion-hosted files carry expiring URLs and cannot be re-attached; external links can
+            external = [item for item in value or [] if item.get("type") == "external"]
+            extracted[prop_name] = {"files": external}
+        elif prop_type == "checkbox":
+            extracted[prop_name] = {"checkbox": bool(value)}
+        elif value is not None:
+            # number, date, url, email, phone_number
+            extracted[prop_name] = {prop_type: value}
     
     return extracted
 
-def create_page_with_data(db_id: str, page_data: Dict[str, Any]) -> bool:
-    """Create a new page with the given data."""
-    url = f"{NOTION_BASE}/pages"
+def copy_block_tree(block_id: str, depth: int = 0) -> List[Dict[str, Any]]:
+    """Rebuild a page's content as block create payloads, two levels deep (the most one request accepts)."""
+    blocks = []
+    for block in notion.iter_block_children(block_id):
+        block_type = block.get("type", "")
+        if block_type in UNCOPYABLE_BLOCK_TYPES:
+            print(f"   ⚠️  Skipping {block_type} block (cannot be recreated through the API)")
+            continue
+        content = {key: value for key, value in block.get(block_type, {}).items() if key != "children"}
+        if block.get("has_children"):
+            if depth < 1:
+                content["children"] = copy_block_tree(block["id"], depth + 1)
+            else:
+                print(f"   ⚠️  Dropping content nested deeper than two levels under a {block_type} block")
+        blocks.append({"object": "block", "type": block_type, block_type: content})
+    return blocks
+
+def create_page_with_data(db_id: str, page_data: Dict[str, Any],
+                          children: Optional[List[Dict[str, Any]]] = None) -> Optional[str]:
+    """Create a new page with the given properties and content; return its id."""
+    children = children or []
+    path = "pages"
     payload = {
         "parent": {"database_id": db_id},
         "properties": page_data
     }
+    if children:
+        payload["children"] = children[:MAX_BLOCK_CHILDREN]
     
-    response = requests.post(url, headers=notion_headers(), json=payload)
-    if response.status_code == 200:
-        return True
-    else:
+    response = notion.post(path, json=payload)
+    if response.status_code != 200:
         print(f"❌ Failed to create page: {response.status_code} - {response.text}")
-        return False
+        return None
+    
+    page_id = response.json()["id"]
+    if len(children) > MAX_BLOCK_CHILDREN:
+        try:
+            notion.append_block_children(page_id, children[MAX_BLOCK_CHILDREN:])
+        except RuntimeError as e:
+            print(f"⚠️  Created page but could not copy all of its content: {e}")
+    return page_id
 
-def archive_page(page_id: str) -> bool:
-    """Archive a page."""
-    url = f"{NOTION_BASE}/pages/{page_id}"
-    payload = {"archived": True}
+def plan_moves(pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return the pages that must be recreated, in week order.
     
-    response = requests.patch(url, headers=notion_headers(), json=payload)
-    return response.status_code == 200
+    ``pages`` is the current display (creation) order. Recreated pages can
+    only be appended at the end, so a plain longest increasing subsequence is
+    not enough: the pages left in place must be the lowest weeks and already
+    in increasing order. That is the longest prefix of the target order whose
+    current positions increase; everything after it is moved.
+    """
+    target = sorted(range(len(pages)), key=lambda i: (pages[i]["week"], i))
+    kept = 0
+    last_position = -1
+    for position in target:
+        if position < last_position:
+            break
+        last_position = position
+        kept += 1
+    return [pages[i] for i in target[kept:]]
 
-def reorder_database():
-    """Reorder the database so Week 1 is at the top."""
+def collect_pages() -> Optional[List[Dict[str, Any]]]:
+    """Read every page with a week number, in current (creation) order (None on errors)."""
     print("🔄 Getting all pages from database...")
-    pages = get_all_pages(ENHANCED_DB_ID)
     
-    if not pages:
-        print("❌ No pages found")
-        return False
-    
-    print(f"📄 Found {len(pages)} pages")
-    
-    # Extract page data and sort by week number
+    page_count = 0
     page_data_list = []
-    for page in pages:
-        properties = page.get("properties", {})
-        week_num = None
-        
-        if "Week" in properties and properties["Week"].get("number"):
-            week_num = properties["Week"]["number"]
-        
-        if week_num:
-            page_data = extract_page_data(page)
-            page_data_list.append({
-                "week": week_num,
-                "page_id": page["id"],
-                "data": page_data
-            })
+    pages = iter_database_pages(ENHANCED_DB_ID, sorts=[{"timestamp": "created_time", "direction": "ascending"}])
+    try:
+        for page in pages:
+            page_count += 1
+            properties = page.get("properties", {})
+            week_num = None
+            
+            if "Week" in properties and properties["Week"].get("number"):
+                week_num = properties["Week"]["number"]
+            
+            if week_num:
+                page_data = extract_page_data(page)
+                page_data_list.append({
+                    "week": week_num,
+                    "page_id": page["id"],
+                    "data": page_data
+                })
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return None
     
-    # Sort by week number (ascending - Week 1 first)
-    page_data_list.sort(key=lambda x: x["week"])
+    if not page_count:
+        print("❌ No pages found")
+        return None
     
-    print(f"📊 Sorted {len(page_data_list)} pages by week number")
+    print(f"📄 Found {page_count} pages")
+    return page_data_list
+
+def reorder_database(confirm: bool = True):
+    """Reorder the database so Week 1 is at the top, moving as few pages as possible.
     
-    # Ask for confirmation
-    print(f"\n🎯 This will recreate all pages in ascending order (Week 1 → Week 24)")
-    print(f"📍 Database: https://www.notion.so/{ENHANCED_DB_ID.replace('-', '')}")
+    Only out-of-place pages are recreated (with all properties and content)
+    and their old copies archived. Every create and archive goes through a
+    write-ahead journal; an interrupted run replays the journaled plan instead
+    of re-reading the half-reordered database. ``confirm=False`` skips the prompt.
+    """
+    journal = MutationJournal(f"reorder-{ENHANCED_DB_ID}")
     
-    confirm = input("\n❓ Continue with reordering? (y/N): ").lower().strip()
-    if confirm != 'y':
-        print("👋 Cancelled.")
-        return False
+    if journal.resuming:
+        moves = [data for key, data in journal.planned() if key.startswith("create:")]
+        print(f"♻️  Resuming interrupted reorder of {len(moves)} pages from {journal.path}")
+    else:
+        pages = collect_pages()
+        if not pages:
+            return False
+        
+        moves = plan_moves(pages)
+        if not moves:
+            print("✅ Pages are already in week order! No moves needed.")
+            return True
+        
+        print(f"📊 {len(pages) - len(moves)} pages are already in order; "
+              f"{len(moves)} need to move: weeks {[item['week'] for item in moves]}")
+        
+        # Ask for confirmation
+        print(f"\n🎯 This will recreate {len(moves)} pages at the end and archive their old copies "
+              f"({2 * len(moves)} writes)")
+        print(f"📍 Database: https://www.notion.so/{ENHANCED_DB_ID.replace('-', '')}")
+        
+        if confirm:
+            answer = input("\n❓ Continue with reordering? (y/N): ").lower().strip()
+            if answer != 'y':
+                print("👋 Cancelled.")
+                return False
+        
+        # Journal the whole plan (including page content) before the first write
+        for item in moves:
+            item["children"] = copy_block_tree(item["page_id"])
+            journal.plan(f"create:{item['page_id']}", item)
     
     print("\n🚀 Starting reorder process...")
+    ledger = subtask_ledger(ENHANCED_DB_ID)
     
-    # Create pages in the correct order (Week 1 first)
+    # Create pages in the correct order (lowest moved week first)
     success_count = 0
-    for item in page_data_list:
+    for item in moves:
         week_num = item["week"]
-        page_data = item["data"]
+        key = f"create:{item['page_id']}"
+        
+        if journal.done(key):
+            success_count += 1
+            print(f"   ⏭️  Week {week_num} already created")
+            continue
         
         print(f"   📝 Creating Week {week_num}...")
-        if create_page_with_data(ENHANCED_DB_ID, page_data):
+        new_page_id = create_page_with_data(ENHANCED_DB_ID, item["data"], item.get("children"))
+        if new_page_id:
+            journal.ack(key, new_page_id)
+            # The copied checklist came along; keep the subtask importer from appending it again
+            if ledger.done(f"blocks:{item['page_id']}"):
+                ledger.ack(f"blocks:{new_page_id}", True)
             success_count += 1
             print(f"   ✅ Created Week {week_num}")
         else:
             print(f"   ❌ Failed Week {week_num}")
-        
-        time.sleep(0.3)  # Rate limiting
+    ledger.close()
     
-    print(f"\n📊 Successfully created {success_count}/{len(page_data_list)} pages")
+    print(f"\n📊 Successfully created {success_count}/{len(moves)} pages")
     
-    if success_count == len(page_data_list):
+    if success_count == len(moves):
         print("\n🗑️  Now archiving old pages...")
-        archived_count = 0
-        for item in page_data_list:
-            page_id = item["page_id"]
-            week_num = item["week"]
-            
-            if archive_page(page_id):
-                archived_count += 1
-                print(f"   🗑️  Archived old Week {week_num}")
-            else:
-                print(f"   ❌ Failed to archive Week {week_num}")
-            
-            time.sleep(0.2)
+        to_archive = [item["page_id"] for item in moves if not journal.done(f"archive:{item['page_id']}")]
+        results = BulkArchiver().archive(to_archive, label=f"reorder-{ENHANCED_DB_ID}")
+        for result in results:
+            if result.ok:
+                journal.ack(f"archive:{result.item}", True)
+        archived_count = len(moves) - len(to_archive) + sum(1 for r in results if r.ok)
+        
+        if archived_count == len(moves):
+            journal.complete()
+        else:
+            journal.close()
+            print(f"\n⚠️  Re-run to finish archiving (journal: {journal.path})")
         
         print(f"\n🎉 Reordering complete!")
-        print(f"✅ Created {success_count} new pages in correct order")
+        print(f"✅ Moved {success_count} pages into place")
         print(f"🗑️  Archived {archived_count} old pages")
         print(f"🔗 Check your database: https://www.notion.so/{ENHANCED_DB_ID.replace('-', '')}")
         print("\n📈 Week 1 should now be at the top!")
-        
+    
     else:
-        print("\n❌ Some pages failed to create. Please check manually.")
+        journal.close()
+        print("\n❌ Some pages failed to create. Re-run to retry only the missing ones.")
     
     return success_count > 0
 
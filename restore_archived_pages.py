@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Un-archive a batch of Notion pages from a rollback manifest.
+
+Bulk archive operations (reorder, clearing a database) write a manifest of
+every archived page id under NOTION_ARCHIVE_DIR. Pass one to restore the batch.
+
+Usage: python restore_archived_pages.py <manifest.jsonl>
+"""
+
+import glob
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from config import Config
+from services.archiver import BulkArchiver
+
+load_dotenv()
+
+NOTION_TOKEN = os.getenv("NOTION_TOKEN")
+
+def main():
+    """Main function."""
+    print("♻️  Notion Archive Rollback")
+    print("=" * 50)
+    
+    if not NOTION_TOKEN:
+        print("❌ NOTION_TOKEN not found")
+        return
+    
+    if len(sys.argv) < 2:
+        manifests = sorted(glob.glob(os.path.join(Config.ARCHIVE_MANIFEST_DIR, "*.jsonl")))
+        print("Usage: python restore_archived_pages.py <manifest.jsonl>")
+        if manifests:
+            print("\nAvailable manifests:")
+            for path in manifests:
+                print(f"   {path}")
+        return
+    
+    manifest_path = sys.argv[1]
+    if not os.path.exists(manifest_path):
+        print(f"❌ Manifest not found: {manifest_path}")
+        return
+    
+    results = BulkArchiver().restore(manifest_path)
+    if results and all(r.ok for r in results):
+        print("\n🎉 All pages restored!")
+
+if __name__ == "__main__":
+    main()
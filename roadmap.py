@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Roadmap maintenance CLI: run one or more stages in a single process.
+
+Stages run in the order given and share one Notion connection pool, one schema
+cache and one local mirror. Property updates from clean, enhance and status are
+queued in a shared MutationBuffer and sent as one PATCH per page, right before
+the next stage that reads or rewrites pages (or at the end of the run).
+
+Usage: python roadmap.py [--yes] [--full] [--metrics FILE] <stage> [<stage> ...]
+       python roadmap.py --plan plan.json <stage> [<stage> ...]
+       python roadmap.py [--yes] --apply plan.json
+
+Stages:
+    scan       Scan the workspace for roadmap databases (incremental; --full rescans)
+    compare    Compare the roadmap databases row by row
+    enhance    Add the Details property and enhanced content
+    clean      Strip redundant suffixes from Learning Topic titles
+    status     Add the Status 1 property and default pages to "Not started"
+    subtasks   Append the daily CSV subtasks as checklists
+    reorder    Move pages so Week 1 is at the top
+    bootstrap  Create the GitHub repos and the Notion roadmap from scratch
+
+--plan reads the current state and records every request the stages would send
+(GitHub repo creates and file PUTs, Notion database/page creates, PATCHes and
+block appends) with a request count and wall-time estimate; --apply sends a
+saved plan later without re-reading anything. scan and compare are read-only;
+reorder cannot be planned.
+
+--metrics prints request counts, p50/p99 latency, 429s, retries and limiter
+wait per endpoint at the end and writes them as JSON (or Prometheus text for
+.prom files).
+
+Example (nightly maintenance): python roadmap.py --yes clean enhance status subtasks compare
+"""
+
+import argparse
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from services.metrics import get_metrics
+from services.mutation_buffer import MutationBuffer
+from services.notion_client import MAX_BLOCK_CHILDREN
+from services.plan import ExecutionPlan, apply_plan
+from services.schema import get_schema_cache
+
+load_dotenv()
+
+NOTION_TOKEN = os.getenv("NOTION_TOKEN")
+
+CSV_FILENAME = "data_engineering_6_month_plan_detailed.csv"
+
+@dataclass
+class RunContext:
+    """State shared by every stage of one invocation."""
+    assume_yes: bool = False
+    full: bool = False
+    buffer: MutationBuffer = field(default_factory=MutationBuffer)
+    
+    def confirm(self, question: str) -> bool:
+        """Ask a y/N question unless --yes was given."""
+        if self.assume_yes:
+            return True
+        return input(f"\n❓ {question} (y/N): ").lower().strip() == 'y'
+
+def flush_updates(ctx: RunContext) -> bool:
+    """Send the queued property updates, one PATCH per page."""
+    if not len(ctx.buffer):
+        return True
+    
+    print(f"\n📤 {len(ctx.buffer)} pages have queued updates ({ctx.buffer.queued} changes)")
+    if not ctx.confirm(f"Send updates to {len(ctx.buffer)} pages?"):
+        ctx.buffer = MutationBuffer()
+        print("👋 Discarded queued updates.")
+        return False
+    
+    results = ctx.buffer.flush()
+    return all(result.ok for result in results)
+
+def stage_scan(ctx: RunContext) -> bool:
+    from scan_notion_databases import scan_workspace
+    return scan_workspace(full=ctx.full) is not None
+
+def stage_compare(ctx: RunContext) -> bool:
+    from compare_databases import compare_databases
+    return compare_databases()
+
+def stage_enhance(ctx: RunContext) -> bool:
+    from enhance_best_database import add_details_property_to_database, update_pages_with_enhanced_content
+    if not add_details_property_to_database():
+        return False
+    return update_pages_with_enhanced_content(buffer=ctx.buffer)
+
+def stage_clean(ctx: RunContext) -> bool:
+    from clean_titles import clean_all_titles
+    return clean_all_titles(buffer=ctx.buffer)
+
+def stage_status(ctx: RunContext) -> bool:
+    from add_detailed_status import add_detailed_status_property, set_default_status_for_all_pages
+    if not add_detailed_status_property():
+        return False
+    return set_default_status_for_all_pages(buffer=ctx.buffer)
+
+def stage_subtasks(ctx: RunContext) -> bool:
+    from add_subtasks_from_csv import ENHANCED_DB_ID, add_subtasks_to_notion
+    if not os.path.exists(CSV_FILENAME):
+        print(f"❌ CSV file not found: {CSV_FILENAME}")
+        return False
+    return add_subtasks_to_notion(CSV_FILENAME, ENHANCED_DB_ID, confirm=not ctx.assume_yes)
+
+def stage_reorder(ctx: RunContext) -> bool:
+    from reorder_database import reorder_database
+    return reorder_database(confirm=not ctx.assume_yes)
+
+def stage_bootstrap(ctx: RunContext) -> bool:
+    from bootstrap_roadmap import main as bootstrap_main
+    return bootstrap_main()
+
+# Stage name -> (runner, whether it only queues updates into the shared buffer)
+STAGES: Dict[str, Tuple[Callable[[RunContext], bool], bool]] = {
+    "scan": (stage_scan, False),
+    "compare": (stage_compare, False),
+    "enhance": (stage_enhance, True),
+    "clean": (stage_clean, True),
+    "status": (stage_status, True),
+    "subtasks": (stage_subtasks, False),
+    "reorder": (stage_reorder, False),
+    "bootstrap": (stage_bootstrap, False),
+}
+
+def plan_schema_property(plan: ExecutionPlan, db_id: str, name: str, schema: Dict[str, Any]) -> bool:
+    """Plan adding one property to a database unless it already exists; True if it was planned."""
+    if name in get_schema_cache().properties(db_id):
+        return False
+    plan.add("notion", "PATCH", f"databases/{db_id}", f"schema:{db_id}:{name}",
+             {"properties": {name: schema}}, label=f"Add {name} property")
+    return True
+
+def plan_enhance(ctx: RunContext, plan: ExecutionPlan) -> bool:
+    from enhance_best_database import ENHANCED_DB_ID, update_pages_with_enhanced_content
+    # The page patches run in a later phase, so diff them as if Details already existed
+    planned = ["Details"] if plan_schema_property(plan, ENHANCED_DB_ID, "Details", {"rich_text": {}}) else []
+    return update_pages_with_enhanced_content(buffer=ctx.buffer, planned_properties=planned)
+
+def plan_status(ctx: RunContext, plan: ExecutionPlan) -> bool:
+    from add_detailed_status import ENHANCED_DB_ID, STATUS_PROPERTY, set_default_status_for_all_pages
+    plan_schema_property(plan, ENHANCED_DB_ID, "Status 1", STATUS_PROPERTY)
+    return set_default_status_for_all_pages(buffer=ctx.buffer)
+
+def plan_subtasks(ctx: RunContext, plan: ExecutionPlan) -> bool:
+    from add_subtasks_from_csv import ENHANCED_DB_ID, parse_csv_file, plan_subtask_blocks, subtask_ledger
+    if not os.path.exists(CSV_FILENAME):
+        print(f"❌ CSV file not found: {CSV_FILENAME}")
+        return False
+    ledger = subtask_ledger(ENHANCED_DB_ID)
+    pending = plan_subtask_blocks(parse_csv_file(CSV_FILENAME), ENHANCED_DB_ID, ledger)
+    ledger.close()
+    if pending is None:
+        return False
+    for week_num, page_id, blocks in pending:
+        chunks = [blocks[i:i + MAX_BLOCK_CHILDREN] for i in range(0, len(blocks), MAX_BLOCK_CHILDREN)]
+        for i, chunk in enumerate(chunks):
+            # The subtask ledger learns about the page once its last chunk landed
+            last = i == len(chunks) - 1
+            plan.add("notion", "PATCH", f"blocks/{page_id}/children", f"blocks:{page_id}:{i}",
+                     {"children": chunk}, label=f"Append Week {week_num} subtasks", phase=2,
+                     ledger=[ledger.name, f"blocks:{page_id}"] if last else None, idempotent=False)
+    print(f"📋 {len(pending)} weeks need subtask checklists")
+    return True
+
+def plan_bootstrap(ctx: RunContext, plan: ExecutionPlan) -> bool:
+    from bootstrap_roadmap import plan_bootstrap as plan_bootstrap_calls
+    return plan_bootstrap_calls(plan) is not None
+
+def plan_read_only(ctx: RunContext, plan: ExecutionPlan) -> bool:
+    print("ℹ️  Read-only stage - nothing to plan")
+    return True
+
+# Stage name -> planner that records the stage's writes (queued patches are added at the end)
+PLANNERS: Dict[str, Callable[[RunContext, ExecutionPlan], bool]] = {
+    "scan": plan_read_only,
+    "compare": plan_read_only,
+    "enhance": plan_enhance,
+    "clean": lambda ctx, plan: stage_clean(ctx),
+    "status": plan_status,
+    "subtasks": plan_subtasks,
+    "bootstrap": plan_bootstrap,
+}
+
+def build_plan(stages: List[str], ctx: RunContext) -> Optional[ExecutionPlan]:
+    """Record every write the stages would make, without sending any of them."""
+    plan = ExecutionPlan("-".join(stages))
+    for name in stages:
+        print(f"\n🧮 Planning {name}...")
+        planner = PLANNERS.get(name)
+        if planner is None:
+            print(f"❌ '{name}' cannot be planned ahead (it reads the pages it rewrites); run it directly")
+            return None
+        try:
+            ok = planner(ctx, plan)
+        except Exception as e:
+            print(f"❌ {type(e).__name__}: {e}")
+            ok = False
+        if not ok:
+            print(f"❌ Planning '{name}' failed")
+            return None
+    
+    for patch in ctx.buffer.pending():
+        week = patch.week if patch.week is not None else "?"
+        plan.add("notion", "PATCH", f"pages/{patch.page_id}", patch.key, {"properties": patch.properties},
+                 label=f"Update Week {week} ({', '.join(patch.properties)})", phase=1)
+    ctx.buffer = MutationBuffer()
+    return plan
+
+def run_stages(stages: List[str], ctx: RunContext) -> bool:
+    """Run stages in order, flushing queued updates before any stage that doesn't queue.
+    
+    Stops at the first failing stage (an exception counts as a failure);
+    updates it or earlier stages queued are not sent.
+    """
+    for name in stages:
+        runner, buffered = STAGES[name]
+        if not buffered and not flush_updates(ctx):
+            print(f"❌ Stopping before '{name}': queued updates were not all applied")
+            return False
+        
+        print(f"\n{'='*60}")
+        print(f"▶️  {name}")
+        print('='*60)
+        try:
+            ok = runner(ctx)
+        except Exception as e:
+            print(f"❌ {type(e).__name__}: {e}")
+            ok = False
+        if not ok:
+            print(f"❌ Stage '{name}' failed; stopping")
+            if len(ctx.buffer):
+                print(f"   ({len(ctx.buffer)} queued page updates were not sent)")
+            return False
+    
+    return flush_updates(ctx)
+
+def report_metrics(paths: List[str], code: int) -> int:
+    """Print where API time went and write the metrics to each path; pass the exit code through."""
+    if paths:
+        metrics = get_metrics()
+        metrics.print_summary()
+        for path in paths:
+            metrics.export(path)
+            print(f"📈 Metrics written to {path}")
+    return code
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        prog="roadmap",
+        description="Run roadmap maintenance stages in one process.",
+        epilog="Example: python roadmap.py --yes clean enhance status subtasks compare",
+    )
+    parser.add_argument("stages", nargs="*", metavar="stage",
+                        help=f"one or more of: {', '.join(STAGES)}")
+    parser.add_argument("-y", "--yes", action="store_true", help="answer yes to every confirmation")
+    parser.add_argument("--full", action="store_true", help="scan: rescan every database, ignoring the watermark")
+    parser.add_argument("--plan", metavar="FILE",
+                        help="write every request the stages would send to FILE (with a time estimate) instead of running them")
+    parser.add_argument("--apply", metavar="FILE", help="send the requests recorded in a plan FILE")
+    parser.add_argument("--metrics", metavar="FILE", action="append", default=[],
+                        help="print per-endpoint API metrics and write them to FILE "
+                             "(.prom for Prometheus text, otherwise JSON; repeatable)")
+    args = parser.parse_args(argv)
+    
+    if args.apply and (args.stages or args.plan):
+        parser.error("--apply takes no stages")
+    if not args.apply and not args.stages:
+        parser.error("give at least one stage (or --apply FILE)")
+    unknown = [name for name in args.stages if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+    
+    if not NOTION_TOKEN:
+        print("❌ NOTION_TOKEN not found. Please set it in your .env file.")
+        return 1
+    
+    if args.apply:
+        if not os.path.exists(args.apply):
+            print(f"❌ Plan not found: {args.apply}")
+            return 1
+        plan = ExecutionPlan.load(args.apply)
+        print(f"📂 Loaded plan '{plan.name}' from {plan.created_at[:19]}")
+        plan.print_summary()
+        if plan.calls and not RunContext(assume_yes=args.yes).confirm(f"Send {len(plan)} requests?"):
+            print("👋 Cancelled.")
+            return 1
+        return report_metrics(args.metrics, 0 if apply_plan(plan) else 1)
+    
+    ctx = RunContext(assume_yes=args.yes, full=args.full)
+    if args.plan:
+        plan = build_plan(args.stages, ctx)
+        if plan is None:
+            return 1
+        print()
+        plan.print_summary()
+        plan.save(args.plan)
+        print(f"💾 Plan written to {args.plan}; run it with: python roadmap.py --apply {args.plan}")
+        return report_metrics(args.metrics, 0)
+    
+    ok = run_stages(args.stages, ctx)
+    print(f"\n{'🎉 All stages completed' if ok else '⚠️  Finished with errors'}: {' → '.join(args.stages)}")
+    return report_metrics(args.metrics, 0 if ok else 1)
+
+if __name__ == "__main__":
+    sys.exit(main())
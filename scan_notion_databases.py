@@ -11,89 +11,57 @@ This script will:
 
 import json
 import os
-import requests
+import sys
 from typing import Dict, List, Optional, Any
 from dotenv import load_dotenv
 
+from config import Config
+from services.archiver import BulkArchiver
+from services.concurrency import run_ordered
+from services.decoder import property_text
+from services.mirror import get_mirror
+from services.notion_client import get_notion_client
+from services.schema import PropertyEncoder, get_schema_cache
+
 load_dotenv()
 
 # Import our enhanced models
 from models import RoadmapData
 
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
-NOTION_VERSION = "2022-06-28"
-NOTION_BASE = "https://api.notion.com/v1"
 
-def notion_headers() -> Dict[str, str]:
-    """Return headers for Notion API requests."""
-    return {
-        "Authorization": f"Bearer {NOTION_TOKEN}",
-        "Notion-Version": NOTION_VERSION,
-        "Content-Type": "application/json",
-    }
+notion = get_notion_client()
 
-def search_databases() -> List[Dict[str, Any]]:
-    """Search for all databases in the workspace."""
-    url = f"{NOTION_BASE}/search"
-    payload = {
-        "filter": {
-            "value": "database",
-            "property": "object"
-        }
-    }
-    
-    response = requests.post(url, headers=notion_headers(), json=payload)
-    if response.status_code == 200:
-        return response.json().get("results", [])
-    else:
-        print(f"❌ Search failed: {response.status_code} - {response.text}")
-        return []
+SCAN_WATERMARK_KEY = "scan:last_edited_time"
 
-def get_database_info(db_id: str) -> Optional[Dict[str, Any]]:
-    """Get detailed information about a database."""
-    url = f"{NOTION_BASE}/databases/{db_id}"
-    response = requests.get(url, headers=notion_headers())
+def search_databases(since: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """Search for databases in the workspace, most recently edited first.
     
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"❌ Failed to get database {db_id}: {response.status_code}")
+    Follows next_cursor through every page of results; with ``since`` the
+    search stops at the first database last edited before that timestamp.
+    Returns None when the search fails part-way.
+    """
+    databases = []
+    try:
+        for db in notion.iter_search("database"):
+            if since and db.get("last_edited_time", "") < since:
+                break
+            databases.append(db)
+    except RuntimeError as e:
+        print(f"❌ {e}")
         return None
+    return databases
 
-def get_database_pages(db_id: str, limit: int = 5) -> List[Dict[str, Any]]:
-    """Get sample pages from a database."""
-    url = f"{NOTION_BASE}/databases/{db_id}/query"
-    payload = {"page_size": limit}
-    
-    response = requests.post(url, headers=notion_headers(), json=payload)
-    if response.status_code == 200:
-        return response.json().get("results", [])
-    else:
-        print(f"❌ Failed to query database {db_id}: {response.status_code}")
-        return []
-
-def extract_text_from_property(prop: Dict[str, Any]) -> str:
-    """Extract text content from various Notion property types."""
-    prop_type = prop.get("type", "")
-    
-    if prop_type == "title":
-        items = prop.get("title", [])
-        return "".join([item.get("plain_text", "") for item in items])
-    elif prop_type == "rich_text":
-        items = prop.get("rich_text", [])
-        return "".join([item.get("plain_text", "") for item in items])
-    elif prop_type == "select":
-        select_obj = prop.get("select")
-        return select_obj.get("name", "") if select_obj else ""
-    elif prop_type == "number":
-        return str(prop.get("number", ""))
-    elif prop_type == "url":
-        return prop.get("url", "")
-    else:
-        return f"[{prop_type}]"
+def get_database_info(db_id: str) -> Optional[Dict[str, Any]]:
+    """Get detailed information about a database (served from the schema cache)."""
+    return get_schema_cache().get(db_id)
 
-def analyze_database(db_info: Dict[str, Any]) -> Dict[str, Any]:
-    """Analyze a database and return summary information."""
+def analyze_database(db_info: Dict[str, Any], sync: bool = True) -> Dict[str, Any]:
+    """Analyze a database and return summary information.
+    
+    Pages are read from the local mirror, which ``sync`` first refreshes with
+    the pages edited since the last scan.
+    """
     title = ""
     title_items = db_info.get("title", [])
     if title_items:
@@ -101,8 +69,15 @@ def analyze_database(db_info: Dict[str, Any]) -> Dict[str, Any]:
     
     properties = db_info.get("properties", {})
     
-    # Get sample pages
-    pages = get_database_pages(db_info["id"])
+    # Refresh the mirror, then take sample pages from disk
+    mirror = get_mirror()
+    if sync:
+        mirror.sync(db_info["id"], db_info=db_info)
+    pages = []
+    for page in mirror.pages(db_info["id"]):
+        pages.append(page)
+        if len(pages) == 3:
+            break
     
     analysis = {
         "id": db_info["id"],
@@ -110,15 +85,15 @@ def analyze_database(db_info: Dict[str, Any]) -> Dict[str, Any]:
         "created_time": db_info.get("created_time", ""),
         "last_edited_time": db_info.get("last_edited_time", ""),
         "properties": list(properties.keys()),
-        "page_count": len(pages),
+        "page_count": mirror.count(db_info["id"]),
         "sample_content": []
     }
     
     # Analyze sample pages
-    for page in pages[:3]:  # Show first 3 pages
+    for page in pages:  # Show first 3 pages
         page_content = {}
         for prop_name, prop_data in page.get("properties", {}).items():
-            page_content[prop_name] = extract_text_from_property(prop_data)
+            page_content[prop_name] = property_text(prop_data)
         analysis["sample_content"].append(page_content)
     
     return analysis
@@ -150,83 +125,34 @@ def update_database_with_enhanced_content(db_id: str) -> bool:
     
     if clear_existing == 'y':
         print("🗑️  Clearing existing pages...")
-        existing_pages = get_database_pages(db_id, limit=100)
-        for page in existing_pages:
-            # Archive the page
-            url = f"{NOTION_BASE}/pages/{page['id']}"
-            payload = {"archived": True}
-            requests.patch(url, headers=notion_headers(), json=payload)
-        print(f"   Archived {len(existing_pages)} existing pages")
+        archiver = BulkArchiver()
+        if archiver.archive_database(db_id) is None:
+            return False
+        if archiver.last_manifest:
+            print(f"   ↩️  Undo with: python restore_archived_pages.py {archiver.last_manifest}")
+    
+    # Get database structure once and compile the WeekItem -> property encoder
+    db_info = get_database_info(db_id)
+    if not db_info:
+        print(f"❌ Could not get database info for {db_id}")
+        return False
+    
+    encoder = PropertyEncoder.compile(db_info.get("properties", {}))
     
     # Add enhanced content
     print("📝 Adding enhanced roadmap content...")
-    url = f"{NOTION_BASE}/pages"
+    path = "pages"
     
     success_count = 0
     for w in weeks:
-        # Determine priority
-        priority = "High" if w.month <= 2 else "Medium" if w.month <= 4 else "Low"
-        
-        # Create page payload - adapt to existing database structure
+        # Create page payload - adapted to the existing database structure
         page = {
             "parent": {"database_id": db_id},
-            "properties": {}
-        }
-        
-        # Try different property name variations
-        property_mappings = {
-            "week": ["Week", "week", "Week #", "Week Number"],
-            "month": ["Month", "month", "Month #"],
-            "topic": ["Learning Topic", "Topic", "Learning", "Title", "Name"],
-            "details": ["Details", "Description", "Notes", "Content"],
-            "project": ["Project Phase", "Project", "Phase"],
-            "status": ["Status", "status"],
-            "priority": ["Priority", "priority"],
-            "github": ["GitHub", "Github", "Repo", "Repository"],
-            "dataset": ["Dataset", "Data", "Source"]
+            "properties": encoder.encode(w)
         }
         
-        # Get database structure to match properties
-        db_info = get_database_info(db_id)
-        if not db_info:
-            print(f"❌ Could not get database info for {db_id}")
-            return False
-        
-        existing_props = db_info.get("properties", {})
-        
-        # Map our data to existing properties
-        for our_key, possible_names in property_mappings.items():
-            for prop_name in existing_props.keys():
-                if prop_name in possible_names:
-                    prop_type = existing_props[prop_name]["type"]
-                    
-                    if our_key == "week" and prop_type == "number":
-                        page["properties"][prop_name] = {"number": w.week}
-                    elif our_key == "month" and prop_type in ["select", "number"]:
-                        if prop_type == "select":
-                            page["properties"][prop_name] = {"select": {"name": str(w.month)}}
-                        else:
-                            page["properties"][prop_name] = {"number": w.month}
-                    elif our_key == "topic" and prop_type == "title":
-                        page["properties"][prop_name] = {"title": [{"type": "text", "text": {"content": w.topic}}]}
-                    elif our_key == "details" and prop_type == "rich_text":
-                        page["properties"][prop_name] = {"rich_text": [{"type": "text", "text": {"content": w.details or ""}}]}
-                    elif our_key == "project" and prop_type == "rich_text":
-                        page["properties"][prop_name] = {"rich_text": [{"type": "text", "text": {"content": w.project}}]}
-                    elif our_key == "status" and prop_type == "select":
-                        page["properties"][prop_name] = {"select": {"name": "To Do"}}
-                    elif our_key == "priority" and prop_type == "select":
-                        page["properties"][prop_name] = {"select": {"name": priority}}
-                    elif our_key == "github" and prop_type == "url":
-                        # We'll leave this empty for now since we don't have the repo URLs in this context
-                        pass
-                    elif our_key == "dataset" and prop_type == "url":
-                        if w.dataset_url:
-                            page["properties"][prop_name] = {"url": w.dataset_url}
-                    break
-        
         # Create the page
-        response = requests.post(url, headers=notion_headers(), json=page)
+        response = notion.post(path, json=page)
         if response.status_code == 200:
             success_count += 1
             print(f"   ✅ Added Week {w.week}")
@@ -236,26 +162,52 @@ def update_database_with_enhanced_content(db_id: str) -> bool:
     print(f"\n✅ Successfully added {success_count}/{len(weeks)} weeks to database!")
     return success_count > 0
 
-def main():
-    """Main function to scan and analyze Notion databases."""
-    if not NOTION_TOKEN:
-        print("❌ NOTION_TOKEN not found. Please set it in your .env file.")
-        return
+def scan_workspace(full: bool = False) -> Optional[List[Dict[str, Any]]]:
+    """Scan and report the workspace's databases; return the likely roadmap databases.
     
-    print("🔍 Scanning for Notion databases...")
-    databases = search_databases()
+    Only databases created or edited since the previous scan are analyzed;
+    the cached analyses are reused for the rest. ``full`` rescans everything.
+    Returns None when the search fails.
+    """
+    mirror = get_mirror()
+    watermark = None if full else mirror.get_state(SCAN_WATERMARK_KEY)
+    cached = {} if full else mirror.analyses()
     
-    if not databases:
+    if watermark:
+        print(f"🔍 Scanning for databases edited since {watermark}...")
+    else:
+        print("🔍 Scanning for Notion databases...")
+    databases = search_databases(since=watermark)
+    if databases is None:
+        return None
+    
+    if not databases and not cached:
         print("❌ No databases found or search failed.")
-        return
+        return []
     
-    print(f"📊 Found {len(databases)} databases. Analyzing...")
+    print(f"📊 Found {len(databases)} new or edited databases ({len(cached)} cached). Analyzing...")
     
     roadmap_databases = []
     
-    for db in databases:
-        print(f"\n📋 Analyzing: {db['id']}")
-        analysis = analyze_database(db)
+    # Sync and analyze the changed databases concurrently; reuse cached analyses for the rest
+    results = run_ordered(analyze_database, databases, Config.NOTION_MAX_WORKERS)
+    fresh = {result.item["id"]: result.value for result in results if result.ok}
+    failed = [result for result in results if not result.ok]
+    for result in failed:
+        print(f"\n📋 Analyzing: {result.item['id']}")
+        print(f"   ❌ Analysis failed: {result.error}")
+    
+    mirror.save_analyses(fresh.values(), replace=full and not failed)
+    if failed:
+        # Rescan from the oldest failure next time so nothing is skipped
+        watermark = min(result.item.get("last_edited_time", "") for result in failed)
+    elif databases:
+        watermark = max(db.get("last_edited_time", "") for db in databases)
+    mirror.set_state(SCAN_WATERMARK_KEY, watermark)
+    
+    analyses = sorted({**cached, **fresh}.values(), key=lambda a: a["last_edited_time"], reverse=True)
+    for analysis in analyses:
+        print(f"\n📋 Analyzing: {analysis['id']}{'' if analysis['id'] in fresh else ' (cached)'}")
         
         print(f"   Title: '{analysis['title']}'")
         print(f"   Properties: {', '.join(analysis['properties'])}")
@@ -273,7 +225,7 @@ def main():
     
     if not roadmap_databases:
         print("\n❌ No roadmap databases found.")
-        return
+        return roadmap_databases
     
     print(f"\n🎯 Found {len(roadmap_databases)} potential roadmap database(s):")
     
@@ -283,6 +235,18 @@ def main():
         print(f"   Last edited: {db['last_edited_time'][:10]}")
         print(f"   Pages: {db['page_count']}")
     
+    return roadmap_databases
+
+def main(full: bool = False):
+    """Main function to scan and analyze Notion databases."""
+    if not NOTION_TOKEN:
+        print("❌ NOTION_TOKEN not found. Please set it in your .env file.")
+        return
+    
+    roadmap_databases = scan_workspace(full)
+    if not roadmap_databases:
+        return
+    
     # Ask user which database to update
     if len(roadmap_databases) == 1:
         choice = input(f"\n❓ Update this database with enhanced content? (y/N): ").lower().strip()
@@ -304,4 +268,4 @@ def main():
             print("❌ Invalid input.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(full="--full" in sys.argv)
\ No newline at end of file
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Search the local Notion mirror offline.
+
+Answers questions like "which database mentions Kinesis in Details" from the
+full-text index that scans, compares and syncs keep up to date, without any
+API calls. Run scan_notion_databases.py (or any script that syncs the mirror)
+first to populate it.
+
+Usage: python search_mirror.py <words...> [--property NAME] [--database ID] [--limit N]
+       python search_mirror.py --databases <words...>
+"""
+
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from services.mirror import get_mirror
+
+def parse_args(args: List[str]) -> Tuple[List[str], Optional[str], Optional[str], int, bool]:
+    """Split argv into query words and the --property/--database/--limit/--databases options."""
+    words, prop, db_id, limit, databases = [], None, None, 20, False
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--databases":
+            databases = True
+        elif arg in ("--property", "--database", "--limit") and i + 1 < len(args):
+            i += 1
+            if arg == "--property":
+                prop = args[i]
+            elif arg == "--database":
+                db_id = args[i]
+            else:
+                limit = int(args[i])
+        else:
+            words.append(arg)
+        i += 1
+    return words, prop, db_id, limit, databases
+
+def main():
+    """Main function."""
+    try:
+        words, prop, db_id, limit, databases = parse_args(sys.argv[1:])
+    except ValueError:
+        print("❌ --limit expects a number")
+        return
+    
+    if not words:
+        print("Usage: python search_mirror.py <words...> [--property NAME] [--database ID] [--limit N]")
+        print("       python search_mirror.py --databases <words...>")
+        return
+    
+    query = " ".join(words)
+    mirror = get_mirror()
+    started = time.perf_counter()
+    
+    if databases:
+        hits = mirror.search_databases(query, limit=limit)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"🔎 {len(hits)} database(s) matching '{query}' ({elapsed:.1f} ms)")
+        for hit in hits:
+            print(f"\n📋 {hit['title'] or '(untitled)'} ({hit['database_id']})")
+            print(f"   Properties: {', '.join(hit['properties'])}")
+        return
+    
+    hits = mirror.search(query, property=prop, db_id=db_id, limit=limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    scope = f" in {prop}" if prop else ""
+    print(f"🔎 {len(hits)} match(es) for '{query}'{scope} ({elapsed:.1f} ms)")
+    
+    for hit in hits:
+        print(f"\n📋 {hit['database_title'] or hit['database_id']} → page {hit['page_id']}")
+        print(f"   {hit['property']}: {hit['snippet']}")
+    
+    if hits:
+        counts = {}
+        for hit in hits:
+            key = hit["database_title"] or hit["database_id"]
+            counts[key] = counts.get(key, 0) + 1
+        print("\n📊 By database: " + ", ".join(f"{name} ({count})" for name, count in counts.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Concurrent bulk archiving of Notion pages with a rollback manifest."""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import Config
+from services.concurrency import TaskResult, run_ordered, send_with_retries
+from services.notion_client import NotionClient, get_notion_client
+
+
+class BulkArchiver:
+    """Archive or restore many pages at once under the shared rate limiter.
+    
+    Every page archived is appended to a JSON-lines manifest as soon as the API
+    confirms it, so even an interrupted batch can be rolled back with
+    ``restore(manifest_path)``.
+    """
+    
+    def __init__(self, client: Optional[NotionClient] = None, max_workers: Optional[int] = None,
+                 manifest_dir: Optional[str] = None):
+        self.client = client or get_notion_client()
+        self.max_workers = max_workers or Config.NOTION_MAX_WORKERS
+        self.manifest_dir = manifest_dir or Config.ARCHIVE_MANIFEST_DIR
+        self._lock = threading.Lock()
+        self.last_manifest: Optional[str] = None
+    
+    def archive_database(self, db_id: str, filter: Optional[Dict[str, Any]] = None,
+                         label: Optional[str] = None) -> Optional[List[TaskResult[str]]]:
+        """Archive every page of a database (optionally only those matching ``filter``).
+        
+        All ids are collected before the first write: archiving while paging
+        would shift the query results under the cursor and skip pages. Returns
+        None, archiving nothing, when the pages could not all be listed.
+        """
+        print("🔍 Collecting pages to archive...")
+        try:
+            page_ids = [page["id"] for page in self.client.iter_database_pages(db_id, filter=filter)]
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return None
+        return self.archive(page_ids, label or f"database-{db_id}")
+    
+    def archive(self, page_ids: Iterable[str], label: str = "pages") -> List[TaskResult[str]]:
+        """Archive pages concurrently, recording each success in a new manifest."""
+        page_ids = list(page_ids)
+        if not page_ids:
+            print("✅ Nothing to archive")
+            return []
+        
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        manifest_path = os.path.join(self.manifest_dir, f"{label}-{stamp}.jsonl")
+        print(f"🗑️  Archiving {len(page_ids)} pages (manifest: {manifest_path})")
+        
+        with open(manifest_path, "a", encoding="utf-8") as manifest:
+            def record(page_id: str):
+                with self._lock:
+                    manifest.write(json.dumps({"page_id": page_id}) + "\n")
+                    manifest.flush()
+            
+            results = self._run(page_ids, archived=True, on_success=record)
+        
+        self._summary("Archived", results)
+        self.last_manifest = manifest_path
+        return results
+    
+    def restore(self, manifest_path: str) -> List[TaskResult[str]]:
+        """Un-archive every page listed in a manifest."""
+        page_ids = []
+        with open(manifest_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    page_ids.append(json.loads(line)["page_id"])
+                except (ValueError, KeyError):
+                    continue
+        print(f"♻️  Restoring {len(page_ids)} pages from {manifest_path}")
+        results = self._run(page_ids, archived=False)
+        self._summary("Restored", results)
+        return results
+    
+    def _run(self, page_ids: List[str], archived: bool, on_success=None) -> List[TaskResult[str]]:
+        total = len(page_ids)
+        step = max(1, total // 10)
+        completed = 0
+        
+        def update(page_id: str):
+            nonlocal completed
+            resp = send_with_retries(lambda: self.client.patch(f"pages/{page_id}", json={"archived": archived}))
+            if resp.status_code != 200:
+                raise RuntimeError(f"{resp.status_code} {resp.text}")
+            if on_success:
+                on_success(page_id)
+            with self._lock:
+                completed += 1
+                if completed % step == 0 or completed == total:
+                    print(f"   ... {completed}/{total}")
+        
+        return run_ordered(update, page_ids, self.max_workers)
+    
+    @staticmethod
+    def _summary(verb: str, results: List[TaskResult[str]]):
+        failed = [r for r in results if not r.ok]
+        print(f"   {verb} {len(results) - len(failed)}/{len(results)} pages")
+        for result in failed[:5]:
+            print(f"   ❌ {result.item}: {result.error}")
+        if len(failed) > 5:
+            print(f"   ... and {len(failed) - 5} more failures")
@@ -1,6 +1,7 @@
 """AWS service for budget management."""
 
 from config import Config
+from services.metrics import instrument_boto3
 
 
 class AWSService:
@@ -19,8 +20,8 @@ class AWSService:
             import boto3
             
             # Initialize clients
-            budgets_client = boto3.client("budgets", region_name=self.config.AWS_REGION)
-            sts_client = boto3.client("sts")
+            budgets_client = instrument_boto3(boto3.client("budgets", region_name=self.config.AWS_REGION))
+            sts_client = instrument_boto3(boto3.client("sts"))
             
             # Get account ID
             account_id = sts_client.get_caller_identity()["Account"]
@@ -0,0 +1,103 @@
+"""Small thread-pool helpers for running API calls concurrently."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Iterable, List, Optional, TypeVar
+import requests
+
+from services.metrics import get_metrics
+
+T = TypeVar("T")
+
+TRANSIENT_STATUS_CODES = (500, 502, 503, 504)
+
+
+@dataclass
+class TaskResult(Generic[T]):
+    """Outcome of one item processed by run_ordered."""
+    item: T
+    value: Any = None
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_ordered(fn: Callable[[T], Any], items: Iterable[T], max_workers: int = 4) -> List[TaskResult[T]]:
+    """Apply ``fn`` to every item on a thread pool and return results in input order.
+    
+    Exceptions are captured per item instead of aborting the batch.
+    """
+    def call(item: T) -> TaskResult[T]:
+        try:
+            return TaskResult(item, fn(item))
+        except Exception as e:
+            return TaskResult(item, error=str(e))
+    
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [call(item) for item in items]
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(call, items))
+
+
+def record_retry(request: Optional[requests.PreparedRequest]):
+    """Count a retry against the endpoint of the request being resent."""
+    if request is None or request.url is None:
+        return
+    metrics = get_metrics()
+    service, endpoint = metrics.resolve(request.url)
+    metrics.retry(service, request.method or "GET", endpoint)
+
+
+def send_with_retries(send: Callable[[], requests.Response], attempts: int = 3,
+                      backoff: float = 0.5) -> requests.Response:
+    """Call ``send`` and retry connection errors and 5xx responses with exponential backoff."""
+    attempt = 0
+    while True:
+        last_attempt = attempt >= attempts - 1
+        try:
+            resp = send()
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if last_attempt:
+                raise
+            record_retry(e.request)
+        else:
+            if resp.status_code not in TRANSIENT_STATUS_CODES or last_attempt:
+                return resp
+            record_retry(resp.request)
+        time.sleep(backoff * (2 ** attempt))
+        attempt += 1
+
+
+def create_unique(send: Callable[[], requests.Response], lookup: Callable[[], Optional[str]],
+                  attempts: int = 3, backoff: float = 0.5) -> str:
+    """Send a create request and return the new object's id without ever duplicating it.
+    
+    A create that timed out or failed with a 5xx may still have been applied, so
+    before every retry ``lookup`` (a query by the object's natural key) runs and
+    its id is returned when the object turns out to exist.
+    """
+    attempt = 0
+    while True:
+        last_attempt = attempt >= attempts - 1
+        try:
+            resp = send()
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if last_attempt:
+                raise
+            record_retry(e.request)
+        else:
+            if resp.ok:
+                return resp.json()["id"]
+            if resp.status_code not in TRANSIENT_STATUS_CODES or last_attempt:
+                raise RuntimeError(f"{resp.status_code} {resp.text}")
+            record_retry(resp.request)
+        time.sleep(backoff * (2 ** attempt))
+        attempt += 1
+        existing = lookup()
+        if existing:
+            return existing
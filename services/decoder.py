@@ -0,0 +1,179 @@
+"""Table-driven decoding of Notion property values into compact rows."""
+
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+Decoder = Callable[[Any], Any]
+
+
+def _plain_text(items: Optional[List[Dict[str, Any]]]) -> str:
+    return "".join(item.get("plain_text", "") for item in items or [])
+
+
+def _name(option: Optional[Dict[str, Any]]) -> Optional[str]:
+    return sys.intern(option["name"]) if option and option.get("name") is not None else None
+
+
+def _names(options: Optional[List[Dict[str, Any]]]) -> Tuple[str, ...]:
+    return tuple(sys.intern(option.get("name", "")) for option in options or [])
+
+
+def _date(value: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not value:
+        return None
+    return f"{value['start']} → {value['end']}" if value.get("end") else value.get("start")
+
+
+def _user(user: Optional[Dict[str, Any]]) -> Optional[str]:
+    return (user.get("name") or user.get("id")) if user else None
+
+
+def _formula(value: Optional[Dict[str, Any]]) -> Any:
+    if not value:
+        return None
+    inner_type = value.get("type", "")
+    inner = value.get(inner_type)
+    return _date(inner) if inner_type == "date" else inner
+
+
+def _rollup(value: Optional[Dict[str, Any]]) -> Any:
+    if not value:
+        return None
+    inner_type = value.get("type", "")
+    if inner_type == "array":
+        return tuple(decode_value(item) for item in value.get("array") or [])
+    inner = value.get(inner_type)
+    return _date(inner) if inner_type == "date" else inner
+
+
+def _unique_id(value: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not value or value.get("number") is None:
+        return None
+    prefix = value.get("prefix")
+    return f"{prefix}-{value['number']}" if prefix else str(value["number"])
+
+
+# Property type -> decoder of the raw value stored under that type's key
+DECODERS: Dict[str, Decoder] = {
+    "title": _plain_text,
+    "rich_text": _plain_text,
+    "number": lambda v: v,
+    "select": _name,
+    "status": _name,
+    "multi_select": _names,
+    "date": _date,
+    "checkbox": bool,
+    "url": lambda v: v,
+    "email": lambda v: v,
+    "phone_number": lambda v: v,
+    "people": lambda v: tuple(_user(user) for user in v or []),
+    "relation": lambda v: tuple(item["id"] for item in v or []),
+    "files": lambda v: tuple(item.get("name", "") for item in v or []),
+    "formula": _formula,
+    "rollup": _rollup,
+    "created_time": lambda v: v,
+    "last_edited_time": lambda v: v,
+    "created_by": _user,
+    "last_edited_by": _user,
+    "unique_id": _unique_id,
+    "verification": lambda v: v.get("state") if v else None,
+    "button": lambda v: None,
+}
+
+
+def decode_value(prop: Optional[Dict[str, Any]]) -> Any:
+    """Decode one property object (as returned by the API) to a plain Python value."""
+    if not prop:
+        return None
+    prop_type = prop.get("type", "")
+    decoder = DECODERS.get(prop_type)
+    return decoder(prop.get(prop_type)) if decoder else None
+
+
+def to_text(value: Any) -> str:
+    """Render a decoded value for display."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, tuple):
+        return ", ".join(to_text(item) for item in value)
+    return str(value)
+
+
+def property_text(prop: Optional[Dict[str, Any]]) -> str:
+    """Extract display text from any Notion property type."""
+    return to_text(decode_value(prop))
+
+
+class Row(tuple):
+    """Decoded page: ``(page_id, value, value, ...)`` in the decoder's column order.
+    
+    Rows are plain tuples (no per-row dict); each decoder creates a subclass
+    that carries the shared column index for lookups by property name.
+    """
+    __slots__ = ()
+    columns: Tuple[str, ...] = ()
+    _index: Dict[str, int] = {}
+    
+    @property
+    def id(self) -> str:
+        return self[0]
+    
+    def get(self, name: str, default: Any = None) -> Any:
+        index = self._index.get(name)
+        return self[index] if index is not None else default
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(zip(self.columns, self[1:]))
+
+
+class PageDecoder:
+    """Page -> Row decoder compiled once from a database schema.
+    
+    The decoder for each column is looked up from the property type at compile
+    time, so decoding a page is one precompiled call per column.
+    """
+    
+    def __init__(self, columns: List[Tuple[str, str]]):
+        self.columns = tuple(name for name, _ in columns)
+        self._plan = [(name, prop_type, DECODERS.get(prop_type, lambda v: None)) for name, prop_type in columns]
+        index = {name: position + 1 for position, name in enumerate(self.columns)}
+        self.row_type = type("Row", (Row,), {"__slots__": (), "columns": self.columns, "_index": index})
+    
+    @classmethod
+    def compile(cls, schema: Dict[str, Any]) -> "PageDecoder":
+        """Build a decoder from a database's ``properties`` schema."""
+        return cls([(name, prop.get("type", "")) for name, prop in schema.items()])
+    
+    @classmethod
+    def for_page(cls, page: Dict[str, Any]) -> "PageDecoder":
+        """Build a decoder from the property types of a sample page."""
+        return cls([(name, prop.get("type", "")) for name, prop in page.get("properties", {}).items()])
+    
+    def decode(self, page: Dict[str, Any]) -> Row:
+        """Decode one page into a row."""
+        properties = page.get("properties", {})
+        values = [page.get("id")]
+        for name, prop_type, decoder in self._plan:
+            prop = properties.get(name)
+            values.append(decoder(prop.get(prop_type)) if prop else None)
+        return self.row_type(values)
+    
+    def decode_all(self, pages: Iterable[Dict[str, Any]]) -> List[Row]:
+        return [self.decode(page) for page in pages]
+    
+    def decode_columns(self, pages: Iterable[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """Decode a result set column-wise: ``{"id": [...], property: [...]}``."""
+        ids: List[Any] = []
+        columns: List[List[Any]] = [[] for _ in self._plan]
+        plan = list(zip(self._plan, columns))
+        for page in pages:
+            ids.append(page.get("id"))
+            properties = page.get("properties", {})
+            for (name, prop_type, decoder), column in plan:
+                prop = properties.get(name)
+                column.append(decoder(prop.get(prop_type)) if prop else None)
+        result = {"id": ids}
+        result.update(zip(self.columns, columns))
+        return result
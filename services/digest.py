@@ -0,0 +1,123 @@
+"""Row hashes and Merkle-style database summaries for content comparison."""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from services.decoder import PageDecoder
+
+
+def stable_hash(value: Any) -> str:
+    """Hash a JSON-serializable value independently of dict ordering."""
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _sort_key(key: Any):
+    return (str(type(key)), key)
+
+
+def _normalize_key(key: Any) -> Any:
+    return int(key) if isinstance(key, float) and key.is_integer() else key
+
+
+@dataclass
+class RowDigest:
+    """Content hash of one row plus the hash of each compared property."""
+    key: Any
+    page_id: str
+    digest: str
+    properties: Dict[str, str]
+
+
+@dataclass
+class DigestDiff:
+    """Row-level differences between two databases, matched by key."""
+    added: List[Any] = field(default_factory=list)
+    removed: List[Any] = field(default_factory=list)
+    changed: Dict[Any, List[str]] = field(default_factory=dict)
+    buckets_compared: int = 0
+    
+    @property
+    def identical(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+
+class DatabaseDigest:
+    """Merkle-style summary of a database's rows.
+    
+    Rows are keyed by a natural key (the Week number by default) and hashed
+    over a fixed list of properties. Row hashes are grouped into buckets by a
+    hash of their key, bucket hashes are combined into a root, and two digests
+    are compared top-down: equal roots mean equal content, and only buckets
+    whose hashes differ are opened to compare rows.
+    """
+    
+    BUCKETS = 64
+    
+    def __init__(self, rows: Dict[Any, RowDigest], columns: List[str], duplicates: int = 0, unkeyed: int = 0):
+        self.rows = rows
+        self.columns = columns
+        self.duplicates = duplicates
+        self.unkeyed = unkeyed
+        self.buckets: Dict[int, List[Any]] = {}
+        for key in rows:
+            self.buckets.setdefault(self.bucket_of(key), []).append(key)
+        self.bucket_hashes = {
+            bucket: stable_hash(sorted((str(key), rows[key].digest) for key in keys))
+            for bucket, keys in self.buckets.items()
+        }
+        self.root = stable_hash([self.bucket_hashes.get(bucket) for bucket in range(self.BUCKETS)])
+    
+    @classmethod
+    def bucket_of(cls, key: Any) -> int:
+        return int(stable_hash(str(key))[:8], 16) % cls.BUCKETS
+    
+    @classmethod
+    def build(cls, pages: Iterable[Dict[str, Any]], schema: Dict[str, Any],
+              columns: Optional[Iterable[str]] = None, key: str = "Week") -> "DatabaseDigest":
+        """Hash every page over ``columns`` (default: the whole schema except the key)."""
+        names = [name for name in (columns if columns is not None else schema) if name != key and name in schema]
+        decoder = PageDecoder.compile({name: schema[name] for name in [key, *names] if name in schema})
+        
+        rows: Dict[Any, RowDigest] = {}
+        duplicates = unkeyed = 0
+        for page in pages:
+            row = decoder.decode(page)
+            row_key = _normalize_key(row.get(key))
+            if row_key is None:
+                unkeyed += 1
+                continue
+            if row_key in rows:
+                duplicates += 1
+                continue
+            prop_hashes = {name: stable_hash(row.get(name)) for name in names}
+            digest = stable_hash([prop_hashes[name] for name in names])
+            rows[row_key] = RowDigest(row_key, row.id, digest, prop_hashes)
+        return cls(rows, names, duplicates, unkeyed)
+    
+    def diff(self, other: "DatabaseDigest") -> DigestDiff:
+        """Report rows only in ``other`` (added), only in self (removed) and changed properties."""
+        result = DigestDiff()
+        if self.root == other.root:
+            return result
+        
+        for bucket in range(self.BUCKETS):
+            if self.bucket_hashes.get(bucket) == other.bucket_hashes.get(bucket):
+                continue
+            result.buckets_compared += 1
+            mine = set(self.buckets.get(bucket, []))
+            theirs = set(other.buckets.get(bucket, []))
+            result.added.extend(theirs - mine)
+            result.removed.extend(mine - theirs)
+            for row_key in mine & theirs:
+                a, b = self.rows[row_key], other.rows[row_key]
+                if a.digest != b.digest:
+                    result.changed[row_key] = [name for name in self.columns
+                                               if a.properties.get(name) != b.properties.get(name)]
+        
+        result.added.sort(key=_sort_key)
+        result.removed.sort(key=_sort_key)
+        result.changed = dict(sorted(result.changed.items(), key=lambda item: _sort_key(item[0])))
+        return result
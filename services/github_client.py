@@ -0,0 +1,31 @@
+"""Shared GitHub API client with a persistent connection pool."""
+
+import threading
+from typing import Optional
+
+from config import Config
+from services.http_client import ApiClient
+
+
+class GitHubClient(ApiClient):
+    """Keep-alive GitHub client used by the bootstrap, GitHubService and plan apply."""
+    
+    def __init__(self, token: Optional[str] = None):
+        headers = Config.get_headers("github")
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        super().__init__(Config.GITHUB_API, headers, timeout=Config.HTTP_TIMEOUT, name="github")
+
+
+_client: Optional[GitHubClient] = None
+_client_lock = threading.Lock()
+
+
+def get_github_client() -> GitHubClient:
+    """Return the process-wide GitHub client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GitHubClient()
+    return _client
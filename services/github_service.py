@@ -1,13 +1,12 @@
 """GitHub API service for repository management."""
 
 import base64
-import json
 import time
 from typing import Dict, List, Tuple
-import requests
 
 from config import Config
 from data.project_templates import ProjectTemplates
+from services.github_client import get_github_client
 
 
 class GitHubService:
@@ -16,7 +15,7 @@ class GitHubService:
     def __init__(self):
         self.config = Config()
         self.api_url = self.config.GITHUB_API
-        self.headers = self.config.get_headers("github")
+        self.client = get_github_client()
         self.templates = ProjectTemplates()
     
     def create_all_repositories(self) -> Dict[str, str]:
@@ -51,7 +50,7 @@ class GitHubService:
         }
         
         try:
-            resp = requests.post(url, headers=self.headers, data=json.dumps(payload))
+            resp = self.client.post(url, json=payload)
             if resp.status_code in (201, 202):
                 print(f"[GitHub] Created repo {name}")
                 return f"https://github.com/{self.config.GITHUB_USERNAME}/{name}"
@@ -66,7 +65,7 @@ class GitHubService:
         """Check if a GitHub repository already exists."""
         url = f"{self.api_url}/repos/{self.config.GITHUB_USERNAME}/{name}"
         try:
-            resp = requests.get(url, headers=self.headers)
+            resp = self.client.get(url)
             return resp.status_code == 200
         except Exception:
             return False
@@ -105,7 +104,7 @@ class GitHubService:
             data["sha"] = existing_file
         
         try:
-            resp = requests.put(url, headers=self.headers, data=json.dumps(data))
+            resp = self.client.put(url, json=data)
             if resp.status_code not in (201, 200):
                 print(f"[GitHub] Failed to create {repo}:{path}: {resp.status_code} {resp.text}")
                 return False
@@ -118,7 +117,7 @@ class GitHubService:
         """Get the SHA of an existing file, or None if it doesn't exist."""
         url = f"{self.api_url}/repos/{self.config.GITHUB_USERNAME}/{repo}/contents/{path}"
         try:
-            resp = requests.get(url, headers=self.headers)
+            resp = self.client.get(url)
             if resp.status_code == 200:
                 return resp.json().get("sha", "")
             return ""
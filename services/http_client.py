@@ -0,0 +1,94 @@
+"""Pooled HTTP client shared by the API services."""
+
+import time
+from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+from services.metrics import get_metrics, is_throttled
+from services.rate_limiter import TokenBucket, parse_retry_after
+
+
+class ApiClient:
+    """Thin wrapper around a keep-alive requests.Session for one API.
+    
+    Every attempt is recorded in the shared metrics registry under ``name``.
+    """
+    
+    def __init__(self, base_url: str, headers: Dict[str, str], pool_size: int = 10,
+                 timeout: Optional[float] = 30.0, limiter: Optional[TokenBucket] = None,
+                 max_retries: int = 5, name: str = "api"):
+        self.base_url = base_url.rstrip("/")
+        self.name = name
+        self.metrics = get_metrics()
+        self.metrics.register(name, self.base_url)
+        self.timeout = timeout
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        
+        # One adapter per scheme; pool_maxsize bounds concurrent sockets per host
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def url(self, path: str) -> str:
+        """Resolve an endpoint path (or absolute URL) against the base URL."""
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+    
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Send a request over the pooled session, pacing it through the limiter.
+        
+        429 responses are retried after the server's Retry-After delay (or an
+        exponential fallback) up to ``max_retries`` times.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        url = self.url(path)
+        _, endpoint = self.metrics.resolve(url)
+        attempt = 0
+        while True:
+            if self.limiter:
+                self.metrics.waited(self.name, self.limiter.acquire())
+            started = time.perf_counter()
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                self.metrics.observe(self.name, method, endpoint, time.perf_counter() - started, error=type(e).__name__)
+                raise
+            self.metrics.observe(self.name, method, endpoint, time.perf_counter() - started, resp.status_code,
+                                 throttled=is_throttled(resp.status_code, resp.headers))
+            if resp.status_code != 429 or attempt >= self.max_retries:
+                if self.limiter and resp.status_code != 429:
+                    self.limiter.on_success()
+                return resp
+            
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"), float(2 ** attempt))
+            self.metrics.retry(self.name, method, endpoint)
+            self.metrics.waited(self.name, retry_after, "retry_after")
+            if self.limiter:
+                self.limiter.on_throttle(retry_after)
+            else:
+                time.sleep(retry_after)
+            attempt += 1
+    
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+    
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+    
+    def patch(self, path: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", path, **kwargs)
+    
+    def put(self, path: str, **kwargs) -> requests.Response:
+        return self.request("PUT", path, **kwargs)
+    
+    def delete(self, path: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", path, **kwargs)
+    
+    def close(self):
+        """Release pooled connections."""
+        self.session.close()
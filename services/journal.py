@@ -0,0 +1,122 @@
+"""Append-only write-ahead journal for resumable bulk mutations."""
+
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+
+
+class MutationJournal:
+    """JSON-lines journal of planned and acknowledged mutations for one job.
+    
+    Every mutation is recorded as ``plan`` before it is sent and ``ack`` once the
+    API confirmed it (``fail`` once it definitely rejected it); each record is fsynced. A rerun loads the file and only
+    replays keys that were never acknowledged. A torn last line (crash mid-write)
+    is ignored. The file is removed by ``complete()`` once the job finished.
+    """
+    
+    def __init__(self, name: str, directory: Optional[str] = None):
+        self.name = name
+        self.directory = directory or Config.JOURNAL_DIR
+        self.path = os.path.join(self.directory, f"{name}.jsonl")
+        self._planned: Dict[str, Any] = {}
+        self._acked: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        self._load()
+    
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("op") == "plan":
+                    self._planned[record["key"]] = record.get("data")
+                elif record.get("op") == "ack":
+                    self._acked[record["key"]] = record.get("result")
+                elif record.get("op") == "fail":
+                    self._planned.pop(record["key"], None)
+    
+    def _append(self, record: Dict[str, Any]):
+        with self._lock:
+            if self._file is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+    
+    @property
+    def resuming(self) -> bool:
+        """True when an earlier run left work behind."""
+        return bool(self._planned)
+    
+    def plan(self, key: str, data: Any = None):
+        """Record that a mutation is about to be sent (no-op if already planned)."""
+        if key in self._planned:
+            return
+        self._planned[key] = data
+        self._append({"op": "plan", "key": key, "data": data})
+    
+    def ack(self, key: str, result: Any = None):
+        """Record that a mutation was confirmed by the API."""
+        self._acked[key] = result
+        self._append({"op": "ack", "key": key, "result": result})
+    
+    def fail(self, key: str, error: Any = None):
+        """Record that the API definitely rejected a mutation, so it is safe to resend."""
+        self._planned.pop(key, None)
+        self._append({"op": "fail", "key": key, "error": error})
+    
+    def done(self, key: str) -> bool:
+        return key in self._acked
+    
+    def result(self, key: str) -> Any:
+        """Return the result stored with an acknowledged mutation."""
+        return self._acked.get(key)
+    
+    def in_doubt(self, key: str) -> bool:
+        """True when a mutation was sent by an earlier run but never acknowledged."""
+        return key in self._planned and key not in self._acked
+    
+    def pending(self) -> List[Tuple[str, Any]]:
+        """Return planned but unacknowledged mutations in plan order."""
+        return [(key, data) for key, data in self._planned.items() if key not in self._acked]
+    
+    def planned(self) -> List[Tuple[str, Any]]:
+        """Return every planned mutation in plan order."""
+        return list(self._planned.items())
+    
+    def once(self, key: str, fn: Callable[[], Any], data: Any = None) -> Any:
+        """Run ``fn`` unless ``key`` is already acknowledged and return its result.
+        
+        Falsy results count as failures (the scripts report errors by returning
+        ``None``/``False``/``""``) and are left unacknowledged for the next run.
+        """
+        if self.done(key):
+            return self.result(key)
+        self.plan(key, data)
+        result = fn()
+        if result:
+            self.ack(key, result)
+        return result
+    
+    def complete(self):
+        """Close and delete the journal after the whole job succeeded."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._planned.clear()
+        self._acked.clear()
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
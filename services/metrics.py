@@ -0,0 +1,333 @@
+"""Per-endpoint request metrics for the Notion, GitHub and AWS clients."""
+
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from config import Config
+
+# Upper bounds (seconds) of the latency histogram buckets; a final +Inf bucket is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# AWS error codes that mean "slow down" rather than "failed"
+AWS_THROTTLING_CODES = {"Throttling", "ThrottlingException", "TooManyRequestsException",
+                        "RequestLimitExceeded", "SlowDown", "ProvisionedThroughputExceededException"}
+
+# Metrics.waited kinds -> keys in the per-service totals
+WAIT_KEYS = {"limiter": "limiter_wait_seconds", "retry_after": "retry_after_seconds"}
+
+_ID = re.compile(r"[0-9a-f]{32}|[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}|[0-9a-f]{40}|\d+")
+_GIT_OBJECTS = {"ref", "refs", "trees", "commits", "blobs", "tags"}
+
+
+def endpoint_label(path: str) -> str:
+    """Collapse ids, owners, repos and file paths so requests group by endpoint.
+    
+    ``pages/1f59...`` becomes ``pages/{id}`` and
+    ``repos/me/etl/contents/dags/x.py`` becomes ``repos/{owner}/{repo}/contents/{path}``.
+    """
+    parts = [part for part in path.split("?")[0].split("/") if part]
+    if parts[:1] == ["repos"] and len(parts) >= 3:
+        rest = parts[3:]
+        if rest[:1] == ["contents"]:
+            rest = ["contents", "{path}"]
+        elif rest[:1] == ["git"] and len(rest) > 2 and rest[1] in _GIT_OBJECTS:
+            rest = rest[:2] + ["{ref}"]
+        parts = ["repos", "{owner}", "{repo}", *rest]
+    return "/".join("{id}" if _ID.fullmatch(part) else part for part in parts)
+
+
+def is_throttled(status: Optional[int], headers: Optional[Dict[str, str]] = None) -> bool:
+    """429s, and GitHub's 403s for primary (remaining 0) and secondary (Retry-After) limits."""
+    if status == 429:
+        return True
+    if status == 403 and headers is not None:
+        return "Retry-After" in headers or headers.get("X-RateLimit-Remaining") == "0"
+    return False
+
+
+@dataclass
+class EndpointStats:
+    """Counters and a latency histogram for one (service, method, endpoint)."""
+    statuses: Counter = field(default_factory=Counter)
+    retries: int = 0
+    throttled: int = 0
+    latency_sum: float = 0.0
+    latency_max: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    
+    @property
+    def requests(self) -> int:
+        return sum(self.buckets)
+    
+    def observe(self, seconds: float, status: str, throttled: bool):
+        self.statuses[status] += 1
+        self.throttled += throttled
+        self.latency_sum += seconds
+        self.latency_max = max(self.latency_max, seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+    
+    def quantile(self, q: float) -> float:
+        """Estimate a latency quantile from the histogram (linear within a bucket, like Prometheus)."""
+        total = self.requests
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            if count and seen + count >= rank:
+                if i == len(LATENCY_BUCKETS):
+                    return self.latency_max
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = min(LATENCY_BUCKETS[i], self.latency_max)
+                return lower + (upper - lower) * max(0.0, rank - seen) / count
+            seen += count
+        return self.latency_max
+
+
+class Metrics:
+    """Thread-safe registry of request metrics, keyed by service, method and endpoint.
+    
+    ``observe`` records one HTTP attempt (so a request retried after a 429 counts
+    twice), ``retry`` the decision to resend it, and ``waited`` time spent before
+    sending: ``limiter`` is our own pacing (the token bucket, including the pause
+    it imposes after a 429) and ``retry_after`` is what the server asked for.
+    Latencies measure the API alone, so slow APIs and our own throttling can be
+    told apart.
+    """
+    
+    def __init__(self):
+        self.endpoints: Dict[Tuple[str, str, str], EndpointStats] = {}
+        self.waits: Dict[Tuple[str, str], float] = {}
+        self.bases: Dict[str, str] = {}
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self._lock = threading.Lock()
+    
+    def register(self, service: str, base_url: str):
+        """Name the service behind a base URL so absolute URLs can be attributed to it."""
+        with self._lock:
+            self.bases[base_url.rstrip("/")] = service
+    
+    def resolve(self, url: str) -> Tuple[str, str]:
+        """Return (service, endpoint) for a URL under a registered base URL."""
+        for base, service in sorted(self.bases.items(), key=lambda item: -len(item[0])):
+            if url.startswith(base):
+                return service, endpoint_label(url[len(base):])
+        parsed = urlparse(url)
+        return parsed.netloc or "http", endpoint_label(parsed.path)
+    
+    def _stats(self, service: str, method: str, endpoint: str) -> EndpointStats:
+        key = (service, method.upper(), endpoint)
+        if key not in self.endpoints:
+            self.endpoints[key] = EndpointStats()
+        return self.endpoints[key]
+    
+    def observe(self, service: str, method: str, endpoint: str, seconds: float,
+                status: Optional[Any] = None, throttled: bool = False, error: Optional[str] = None):
+        """Record one attempt: its latency and status (or the exception name when it raised)."""
+        with self._lock:
+            self._stats(service, method, endpoint).observe(seconds, str(status if error is None else error),
+                                                           throttled)
+    
+    def retry(self, service: str, method: str, endpoint: str, count: int = 1):
+        with self._lock:
+            self._stats(service, method, endpoint).retries += count
+    
+    def waited(self, service: str, seconds: float, kind: str = "limiter"):
+        if seconds <= 0:
+            return
+        with self._lock:
+            self.waits[(service, kind)] = self.waits.get((service, kind), 0.0) + seconds
+    
+    def reset(self):
+        with self._lock:
+            self.endpoints.clear()
+            self.waits.clear()
+            self.started_at = datetime.now(timezone.utc).isoformat()
+    
+    # Export --------------------------------------------------------------------
+    def services(self) -> Dict[str, Dict[str, float]]:
+        """Totals per service: requests, throttled, retries, API seconds and wait seconds."""
+        with self._lock:
+            totals: Dict[str, Dict[str, float]] = {}
+            
+            def entry(service: str) -> Dict[str, float]:
+                return totals.setdefault(service, {"requests": 0, "throttled": 0, "retries": 0, "api_seconds": 0.0,
+                                                   "limiter_wait_seconds": 0.0, "retry_after_seconds": 0.0})
+            
+            for (service, _, _), stats in self.endpoints.items():
+                totals_for = entry(service)
+                totals_for["requests"] += stats.requests
+                totals_for["throttled"] += stats.throttled
+                totals_for["retries"] += stats.retries
+                totals_for["api_seconds"] += stats.latency_sum
+            for (service, kind), seconds in self.waits.items():
+                entry(service)[WAIT_KEYS.get(kind, f"{kind}_seconds")] += seconds
+            return totals
+    
+    def to_json(self) -> Dict[str, Any]:
+        endpoints = []
+        with self._lock:
+            items = sorted(self.endpoints.items())
+            for (service, method, endpoint), stats in items:
+                endpoints.append({
+                    "service": service,
+                    "method": method,
+                    "endpoint": endpoint,
+                    "requests": stats.requests,
+                    "statuses": dict(stats.statuses),
+                    "throttled": stats.throttled,
+                    "retries": stats.retries,
+                    "latency_seconds": {
+                        "sum": round(stats.latency_sum, 6),
+                        "mean": round(stats.latency_sum / stats.requests, 6) if stats.requests else 0.0,
+                        "max": round(stats.latency_max, 6),
+                        "p50": round(stats.quantile(0.5), 6),
+                        "p90": round(stats.quantile(0.9), 6),
+                        "p99": round(stats.quantile(0.99), 6),
+                        "buckets": {str(bound): count for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), stats.buckets)},
+                    },
+                })
+        return {"started_at": self.started_at, "exported_at": datetime.now(timezone.utc).isoformat(),
+                "services": self.services(), "endpoints": endpoints}
+    
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+        
+        with self._lock:
+            items = sorted(self.endpoints.items())
+            waits = sorted(self.waits.items())
+        
+        family("api_requests_total", "counter", "HTTP attempts by service, method, endpoint and status.")
+        for (service, method, endpoint), stats in items:
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f"api_requests_total{_labels(service, method, endpoint, status=status)} {count}")
+        
+        family("api_request_duration_seconds", "histogram", "API latency per attempt, excluding limiter waits.")
+        for (service, method, endpoint), stats in items:
+            cumulative = 0
+            for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), stats.buckets):
+                cumulative += count
+                labels = _labels(service, method, endpoint, le=str(bound))
+                lines.append(f"api_request_duration_seconds_bucket{labels} {cumulative}")
+            labels = _labels(service, method, endpoint)
+            lines.append(f"api_request_duration_seconds_sum{labels} {stats.latency_sum:.6f}")
+            lines.append(f"api_request_duration_seconds_count{labels} {stats.requests}")
+        
+        family("api_throttled_total", "counter", "Responses that were rate limits (429, GitHub 403 limits, AWS throttling).")
+        for (service, method, endpoint), stats in items:
+            lines.append(f"api_throttled_total{_labels(service, method, endpoint)} {stats.throttled}")
+        
+        family("api_retries_total", "counter", "Requests resent after a rate limit or transient failure.")
+        for (service, method, endpoint), stats in items:
+            lines.append(f"api_retries_total{_labels(service, method, endpoint)} {stats.retries}")
+        
+        family("api_wait_seconds_total", "counter",
+               "Time spent before sending: limiter = our own pacing, retry_after = requested by the server.")
+        for (service, kind), seconds in waits:
+            lines.append(f'api_wait_seconds_total{{service="{_escape(service)}",kind="{kind}"}} {seconds:.6f}')
+        return "\n".join(lines) + "\n"
+    
+    def export(self, path: str):
+        """Write the metrics to ``path``: Prometheus text for .prom/.txt, JSON otherwise (atomically)."""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else json.dumps(self.to_json(), indent=1)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    
+    def print_summary(self, limit: int = 12):
+        """Print where API time went: the slowest endpoints, then totals per service."""
+        with self._lock:
+            items = sorted(self.endpoints.items(), key=lambda item: -item[1].latency_sum)
+        if not items:
+            return
+        print(f"\n📈 API time by endpoint (top {min(limit, len(items))} of {len(items)})")
+        print(f"   {'endpoint':<52} {'reqs':>5} {'p50 ms':>8} {'p99 ms':>8} {'total s':>8} {'429s':>5} {'retries':>7}")
+        for (service, method, endpoint), stats in items[:limit]:
+            name = f"{service} {method} {endpoint}"
+            print(f"   {name[:52]:<52} {stats.requests:>5} {stats.quantile(0.5) * 1000:>8.1f} "
+                  f"{stats.quantile(0.99) * 1000:>8.1f} {stats.latency_sum:>8.2f} {stats.throttled:>5} {stats.retries:>7}")
+        for service, totals in sorted(self.services().items()):
+            print(f"   ⏱️  {service}: {totals['api_seconds']:.2f}s in the API, "
+                  f"{totals['limiter_wait_seconds']:.2f}s waiting on our limiter (summed over threads), "
+                  f"{int(totals['throttled'])} throttled ({totals['retry_after_seconds']:.1f}s Retry-After)")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(service: str, method: str, endpoint: str, **extra: str) -> str:
+    pairs = [("service", service), ("method", method), ("endpoint", endpoint), *extra.items()]
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs) + "}"
+
+
+def instrument_boto3(client, metrics: Optional["Metrics"] = None):
+    """Record every call a boto3 client makes (botocore retries are counted, not split out)."""
+    metrics = metrics or get_metrics()
+    service_name = client.meta.service_model.service_name
+    
+    def before_call(context, **kwargs):
+        context["metrics_started"] = time.perf_counter()
+    
+    def after_call(model, context, http_response=None, parsed=None, exception=None, **kwargs):
+        started = context.pop("metrics_started", None)
+        if started is None:
+            return
+        endpoint = f"{service_name}.{model.name}"
+        method = model.http.get("method", "POST")
+        parsed = parsed or {}
+        code = parsed.get("Error", {}).get("Code")
+        status = http_response.status_code if http_response is not None else None
+        metrics.observe("aws", method, endpoint, time.perf_counter() - started, status,
+                        throttled=code in AWS_THROTTLING_CODES,
+                        error=type(exception).__name__ if exception is not None else None)
+        attempts = parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+        if attempts:
+            metrics.retry("aws", method, endpoint, attempts)
+    
+    client.meta.events.register("before-call", before_call)
+    client.meta.events.register("after-call", after_call)
+    client.meta.events.register("after-call-error", after_call)
+    return client
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics registry, creating it on first use.
+    
+    When METRICS_PATH is set, the metrics are written there when the process exits.
+    """
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics()
+                if Config.METRICS_PATH:
+                    atexit.register(_metrics.export, Config.METRICS_PATH)
+    return _metrics
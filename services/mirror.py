@@ -0,0 +1,302 @@
+"""Local SQLite mirror of Notion databases with incremental sync."""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from config import Config
+from services.decoder import property_text
+from services.notion_client import NotionClient, get_notion_client
+
+
+class NotionMirror:
+    """SQLite copy of database schemas and pages, refreshed by last_edited_time.
+    
+    Each sync re-reads the database schema and queries only the pages edited at
+    or after the stored watermark. Notion's query endpoint never returns archived
+    pages, so deletions are only picked up by a ``full`` sync.
+    
+    Every sync also updates an FTS5 index over database titles, property names
+    and row text, so ``search`` and ``search_databases`` answer offline.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS databases (
+            database_id TEXT PRIMARY KEY,
+            title TEXT NOT NULL DEFAULT '',
+            properties TEXT NOT NULL DEFAULT '{}',
+            watermark TEXT,
+            synced_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS pages (
+            page_id TEXT PRIMARY KEY,
+            database_id TEXT NOT NULL,
+            created_time TEXT NOT NULL,
+            last_edited_time TEXT NOT NULL,
+            properties TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS pages_by_database ON pages (database_id, last_edited_time);
+        CREATE TABLE IF NOT EXISTS analyses (
+            database_id TEXT PRIMARY KEY,
+            last_edited_time TEXT NOT NULL,
+            analysis TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+    
+    # Full-text index: one row of display text per (page, property), indexed by an
+    # external-content FTS5 table kept in step by triggers, plus database titles
+    # and property names.
+    TEXT_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS page_text (
+            id INTEGER PRIMARY KEY,
+            page_id TEXT NOT NULL,
+            database_id TEXT NOT NULL,
+            property TEXT NOT NULL,
+            content TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS page_text_by_page ON page_text (page_id);
+        CREATE VIRTUAL TABLE IF NOT EXISTS page_fts USING fts5(
+            content, content='page_text', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        );
+        CREATE TRIGGER IF NOT EXISTS page_text_insert AFTER INSERT ON page_text BEGIN
+            INSERT INTO page_fts (rowid, content) VALUES (new.id, new.content);
+        END;
+        CREATE TRIGGER IF NOT EXISTS page_text_delete AFTER DELETE ON page_text BEGIN
+            INSERT INTO page_fts (page_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END;
+        CREATE VIRTUAL TABLE IF NOT EXISTS database_fts USING fts5(
+            database_id UNINDEXED, title, properties, tokenize='unicode61 remove_diacritics 2'
+        );
+    """
+    
+    def __init__(self, path: Optional[str] = None, client: Optional[NotionClient] = None):
+        self.path = path or Config.MIRROR_PATH
+        self.client = client or get_notion_client()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(self.SCHEMA)
+        self._conn.executescript(self.TEXT_SCHEMA)
+        self._lock = threading.Lock()
+        
+        # Mirrors created before the text index existed are indexed once on open
+        unindexed = self._conn.execute(
+            "SELECT EXISTS (SELECT 1 FROM pages) AND NOT EXISTS (SELECT 1 FROM page_text)").fetchone()[0]
+        if unindexed:
+            self.reindex()
+    
+    def sync(self, db_id: str, full: bool = False, db_info: Optional[Dict[str, Any]] = None) -> int:
+        """Refresh one database from the API; return the number of pages written.
+        
+        Pass ``db_info`` when the database object is already at hand (e.g. from
+        /search) to skip the schema GET. If the page listing fails partway, the
+        RuntimeError propagates before the watermark moves, so the next sync
+        fetches the missed pages again.
+        """
+        db_info = db_info or self.client.get_database(db_id)
+        if not db_info:
+            return 0
+        
+        title = "".join(item.get("plain_text", "") for item in db_info.get("title", []))
+        watermark = None if full else self.watermark(db_id)
+        query_filter = None
+        if watermark:
+            query_filter = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": watermark}}
+        
+        written = 0
+        seen = set()
+        latest = watermark or ""
+        for page in self.client.iter_database_pages(db_id, filter=query_filter):
+            edited = page.get("last_edited_time", "")
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO pages "
+                    "(page_id, database_id, created_time, last_edited_time, properties) VALUES (?, ?, ?, ?, ?)",
+                    (page["id"], db_id, page.get("created_time", ""), edited,
+                     json.dumps(page.get("properties", {}))),
+                )
+                self._index_page(page["id"], db_id, page.get("properties", {}))
+            seen.add(page["id"])
+            latest = max(latest, edited)
+            written += 1
+        
+        with self._lock:
+            if full:
+                stale = [row[0] for row in self._conn.execute(
+                    "SELECT page_id FROM pages WHERE database_id = ?", (db_id,)) if row[0] not in seen]
+                self._conn.executemany("DELETE FROM pages WHERE page_id = ?", [(pid,) for pid in stale])
+                self._conn.executemany("DELETE FROM page_text WHERE page_id = ?", [(pid,) for pid in stale])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO databases (database_id, title, properties, watermark, synced_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (db_id, title, json.dumps(db_info.get("properties", {})), latest or None,
+                 datetime.now(timezone.utc).isoformat()),
+            )
+            self._index_database(db_id, title, db_info.get("properties", {}))
+            self._conn.commit()
+        return written
+    
+    def watermark(self, db_id: str) -> Optional[str]:
+        """Return the newest last_edited_time mirrored for a database."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark FROM databases WHERE database_id = ?", (db_id,)).fetchone()
+        return row[0] if row else None
+    
+    def database(self, db_id: str) -> Optional[Dict[str, Any]]:
+        """Return the mirrored database in the shape of a Notion database object."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, properties FROM databases WHERE database_id = ?", (db_id,)).fetchone()
+        if not row:
+            return None
+        return {
+            "id": db_id,
+            "title": [{"type": "text", "plain_text": row[0], "text": {"content": row[0]}}],
+            "properties": json.loads(row[1]),
+        }
+    
+    def pages(self, db_id: str) -> Iterator[Dict[str, Any]]:
+        """Yield mirrored pages in creation order, shaped like query results."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_id, created_time, last_edited_time, properties FROM pages "
+                "WHERE database_id = ? ORDER BY created_time, page_id", (db_id,)).fetchall()
+        for page_id, created, edited, properties in rows:
+            yield {"id": page_id, "created_time": created, "last_edited_time": edited,
+                   "properties": json.loads(properties)}
+    
+    def count(self, db_id: str) -> int:
+        """Return how many pages are mirrored for a database."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM pages WHERE database_id = ?", (db_id,)).fetchone()[0]
+    
+    def get_state(self, key: str) -> Optional[str]:
+        """Return a persisted value such as the workspace scan watermark."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def set_state(self, key: str, value: Optional[str]):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+            self._conn.commit()
+    
+    def analyses(self) -> Dict[str, Dict[str, Any]]:
+        """Return the cached scan analyses keyed by database id."""
+        with self._lock:
+            rows = self._conn.execute("SELECT database_id, analysis FROM analyses").fetchall()
+        return {db_id: json.loads(analysis) for db_id, analysis in rows}
+    
+    def save_analyses(self, analyses: Iterable[Dict[str, Any]], replace: bool = False):
+        """Cache scan analyses; with ``replace`` drop every analysis not in ``analyses``."""
+        with self._lock:
+            if replace:
+                self._conn.execute("DELETE FROM analyses")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO analyses (database_id, last_edited_time, analysis) VALUES (?, ?, ?)",
+                [(a["id"], a.get("last_edited_time", ""), json.dumps(a)) for a in analyses],
+            )
+            self._conn.commit()
+    
+    def search(self, query: str, property: Optional[str] = None, db_id: Optional[str] = None,
+               limit: int = 20) -> List[Dict[str, Any]]:
+        """Full-text search over mirrored row text, best matches first.
+        
+        Every word of ``query`` must occur (prefix with ``*`` for prefix
+        matches); ``property`` and ``db_id`` narrow the search to one column or
+        database. Each hit carries the page, property and a highlighted snippet.
+        """
+        sql = (
+            "SELECT t.database_id, d.title, t.page_id, t.property, "
+            "snippet(page_fts, 0, '[', ']', '…', 12) "
+            "FROM page_fts JOIN page_text t ON t.id = page_fts.rowid "
+            "LEFT JOIN databases d ON d.database_id = t.database_id "
+            "WHERE page_fts MATCH ?"
+        )
+        params: List[Any] = [_match_expression(query)]
+        if property:
+            sql += " AND t.property = ?"
+            params.append(property)
+        if db_id:
+            sql += " AND t.database_id = ?"
+            params.append(db_id)
+        sql += " ORDER BY page_fts.rank LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {"database_id": row[0], "database_title": row[1] or "", "page_id": row[2],
+             "property": row[3], "snippet": row[4]}
+            for row in rows
+        ]
+    
+    def search_databases(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Full-text search over mirrored database titles and property names."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT database_id, title, properties FROM database_fts WHERE database_fts MATCH ? "
+                "ORDER BY rank LIMIT ?", (_match_expression(query), limit)).fetchall()
+        return [{"database_id": row[0], "title": row[1], "properties": row[2].split("\n")} for row in rows]
+    
+    def reindex(self):
+        """Rebuild the full-text index from the mirrored databases and pages."""
+        with self._lock:
+            self._conn.execute("DELETE FROM page_text")
+            self._conn.execute("DELETE FROM database_fts")
+            for db_id, title, properties in self._conn.execute(
+                    "SELECT database_id, title, properties FROM databases").fetchall():
+                self._index_database(db_id, title, json.loads(properties))
+            for page_id, db_id, properties in self._conn.execute(
+                    "SELECT page_id, database_id, properties FROM pages").fetchall():
+                self._index_page(page_id, db_id, json.loads(properties))
+            self._conn.commit()
+    
+    def _index_page(self, page_id: str, db_id: str, properties: Dict[str, Any]):
+        self._conn.execute("DELETE FROM page_text WHERE page_id = ?", (page_id,))
+        rows = []
+        for name, prop in properties.items():
+            text = property_text(prop)
+            if text:
+                rows.append((page_id, db_id, name, text))
+        self._conn.executemany(
+            "INSERT INTO page_text (page_id, database_id, property, content) VALUES (?, ?, ?, ?)", rows)
+    
+    def _index_database(self, db_id: str, title: str, properties: Dict[str, Any]):
+        self._conn.execute("DELETE FROM database_fts WHERE database_id = ?", (db_id,))
+        self._conn.execute(
+            "INSERT INTO database_fts (database_id, title, properties) VALUES (?, ?, ?)",
+            (db_id, title, "\n".join(properties)))
+    
+    def close(self):
+        self._conn.close()
+
+
+def _match_expression(query: str) -> str:
+    """Quote each word of a free-text query so FTS5 reads it literally (``*`` keeps prefix search)."""
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return " ".join(terms) or '""'
+
+
+_mirror: Optional[NotionMirror] = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror() -> NotionMirror:
+    """Return the process-wide mirror, opening it on first use."""
+    global _mirror
+    if _mirror is None:
+        with _mirror_lock:
+            if _mirror is None:
+                _mirror = NotionMirror()
+    return _mirror
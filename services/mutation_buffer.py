@@ -0,0 +1,107 @@
+"""Per-page buffer that coalesces property updates from several stages into one PATCH."""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import Config
+from services.concurrency import TaskResult, run_ordered, send_with_retries
+from services.journal import MutationJournal
+from services.notion_client import NotionClient, get_notion_client
+
+
+@dataclass
+class PagePatch:
+    """Property changes needed to bring one page to its desired state."""
+    page_id: str
+    week: Optional[int]
+    properties: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    
+    @property
+    def key(self) -> str:
+        """Journal key for this patch."""
+        return f"patch:{self.page_id}"
+
+
+class MutationBuffer:
+    """Collect property updates per page id and flush one merged PATCH per page.
+    
+    Merging is last-writer-wins per property in the order ``add`` was called, so
+    a stage queued later overrides an earlier stage's value for the same
+    property while leaving its other properties alone. Property order within a
+    patch follows first appearance and pages flush in week order, which keeps
+    the requests sent deterministic for a given sequence of stages.
+    """
+    
+    def __init__(self, client: Optional[NotionClient] = None):
+        self.client = client or get_notion_client()
+        self._patches: Dict[str, PagePatch] = {}
+        self._lock = threading.Lock()
+        self.queued = 0
+    
+    def add(self, page_id: str, properties: Dict[str, Dict[str, Any]], week: Optional[int] = None):
+        """Queue property updates for a page."""
+        if not properties:
+            return
+        with self._lock:
+            patch = self._patches.get(page_id)
+            if patch is None:
+                patch = self._patches[page_id] = PagePatch(page_id, week)
+            elif patch.week is None:
+                patch.week = week
+            patch.properties.update(properties)
+            self.queued += 1
+    
+    def extend(self, patches: Iterable[PagePatch]):
+        """Queue planned patches (e.g. from Reconciler.plan)."""
+        for patch in patches:
+            self.add(patch.page_id, patch.properties, patch.week)
+    
+    def __len__(self) -> int:
+        return len(self._patches)
+    
+    def pending(self) -> List[PagePatch]:
+        """Return the merged patches in the order they will be sent."""
+        with self._lock:
+            patches = list(self._patches.values())
+        return sorted(patches, key=lambda patch: (patch.week is None, patch.week or 0, patch.page_id))
+    
+    def flush(self, max_workers: Optional[int] = None,
+              journal: Optional[MutationJournal] = None) -> List[TaskResult[PagePatch]]:
+        """Send one PATCH per page concurrently and report them in week order.
+        
+        With a ``journal``, each patch is acknowledged as soon as it lands and
+        patches acknowledged by an earlier run are skipped.
+        """
+        patches = self.pending()
+        queued = self.queued
+        with self._lock:
+            self._patches.clear()
+            self.queued = 0
+        
+        if journal:
+            patches = [patch for patch in patches if not journal.done(patch.key)]
+            
+            def send(patch: PagePatch):
+                self._patch_page(patch)
+                journal.ack(patch.key, True)
+        else:
+            send = self._patch_page
+        
+        results = run_ordered(send, patches, max_workers or Config.NOTION_MAX_WORKERS)
+        for result in results:
+            week = result.item.week if result.item.week is not None else "?"
+            changed = ", ".join(result.item.properties)
+            if result.ok:
+                print(f"   ✅ Updated Week {week} ({changed})")
+            else:
+                print(f"   ❌ Failed Week {week}: {result.error}")
+        if queued > len(patches):
+            print(f"   📦 Coalesced {queued} queued updates into {len(patches)} PATCHes")
+        return results
+    
+    def _patch_page(self, patch: PagePatch):
+        resp = send_with_retries(
+            lambda: self.client.patch(f"pages/{patch.page_id}", json={"properties": patch.properties}))
+        if resp.status_code != 200:
+            raise RuntimeError(f"{resp.status_code} {resp.text}")
@@ -0,0 +1,219 @@
+"""Shared Notion API client with a persistent connection pool."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from config import Config
+from services.http_client import ApiClient
+from services.rate_limiter import TokenBucket
+
+# Notion accepts at most 100 children per append request and 2000 characters per rich_text item
+MAX_BLOCK_CHILDREN = 100
+MAX_TEXT_LENGTH = 2000
+
+
+class NotionClient(ApiClient):
+    """Keep-alive Notion client; every script and service goes through one instance."""
+    
+    def __init__(self, token: Optional[str] = None, pool_size: Optional[int] = None,
+                 limiter: Optional[TokenBucket] = None):
+        headers = Config.get_headers("notion")
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        super().__init__(
+            Config.NOTION_BASE,
+            headers,
+            pool_size=pool_size or Config.NOTION_POOL_SIZE,
+            timeout=Config.HTTP_TIMEOUT,
+            limiter=limiter or TokenBucket(Config.NOTION_RATE_LIMIT, Config.NOTION_BURST),
+            max_retries=Config.NOTION_MAX_RETRIES,
+            name="notion",
+        )
+    
+    def get_database(self, db_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a database object (title + property schema); return None on API errors."""
+        resp = self.get(f"databases/{db_id}")
+        if resp.status_code != 200:
+            print(f"❌ Failed to get database {db_id}: {resp.status_code}")
+            return None
+        return resp.json()
+    
+    def find_child_database(self, parent_page_id: str, title: str) -> Optional[str]:
+        """Return the id of the first database titled ``title`` directly under a page.
+        
+        Reads the page's child blocks rather than /search, whose index lags
+        behind freshly created databases.
+        """
+        for block in self.iter_block_children(parent_page_id):
+            if block.get("type") == "child_database" and block["child_database"].get("title") == title:
+                return block["id"]
+        return None
+    
+    def iter_block_children(self, block_id: str) -> Iterator[Dict[str, Any]]:
+        """Stream the child blocks of a page or block, following next_cursor."""
+        cursor = None
+        while True:
+            params: Dict[str, Any] = {"page_size": 100}
+            if cursor:
+                params["start_cursor"] = cursor
+            resp = self.get(f"blocks/{block_id}/children", params=params)
+            if resp.status_code != 200:
+                print(f"❌ Failed to list children of {block_id}: {resp.status_code}")
+                return
+            data = resp.json()
+            yield from data.get("results", [])
+            if not data.get("has_more") or not data.get("next_cursor"):
+                return
+            cursor = data["next_cursor"]
+    
+    def iter_search(self, object_type: str = "database", direction: str = "descending") -> Iterator[Dict[str, Any]]:
+        """Stream /search results of one object type sorted by last_edited_time, following next_cursor.
+        
+        Stop iterating early (e.g. at a watermark) to skip fetching the remaining
+        pages. Raises RuntimeError on API errors so a truncated listing is never
+        mistaken for a complete one.
+        """
+        payload: Dict[str, Any] = {
+            "filter": {"property": "object", "value": object_type},
+            "sort": {"timestamp": "last_edited_time", "direction": direction},
+            "page_size": 100,
+        }
+        while True:
+            resp = self.post("search", json=payload)
+            if resp.status_code != 200:
+                raise RuntimeError(f"Search failed: {resp.status_code} - {resp.text}")
+            data = resp.json()
+            yield from data.get("results", [])
+            if not data.get("has_more") or not data.get("next_cursor"):
+                return
+            payload["start_cursor"] = data["next_cursor"]
+    
+    def append_block_children(self, block_id: str, children: List[Dict[str, Any]]) -> int:
+        """Append blocks under a page or block, 100 top-level blocks per request (the API limit).
+        
+        Returns the number of requests sent; raises RuntimeError on the first failed batch.
+        """
+        requests_sent = 0
+        for start in range(0, len(children), MAX_BLOCK_CHILDREN):
+            batch = children[start:start + MAX_BLOCK_CHILDREN]
+            resp = self.patch(f"blocks/{block_id}/children", json={"children": batch})
+            requests_sent += 1
+            if resp.status_code != 200:
+                raise RuntimeError(f"{resp.status_code} {resp.text}")
+        return requests_sent
+    
+    def find_pages_by_number(self, db_id: str, prop: str, numbers: Iterable[int]) -> Dict[int, str]:
+        """Map each number to the oldest page whose number property ``prop`` equals it.
+        
+        All numbers are matched by one OR-filtered query (per 100 numbers, the
+        compound filter limit), so existence checks cost a single request.
+        Raises RuntimeError when a query fails rather than report a partial map.
+        """
+        found: Dict[int, str] = {}
+        numbers = sorted(set(numbers))
+        for start in range(0, len(numbers), 100):
+            conditions = [{"property": prop, "number": {"equals": n}} for n in numbers[start:start + 100]]
+            query_filter = conditions[0] if len(conditions) == 1 else {"or": conditions}
+            sorts = [{"timestamp": "created_time", "direction": "ascending"}]
+            for page in self.iter_database_pages(db_id, filter=query_filter, sorts=sorts):
+                value = (page.get("properties", {}).get(prop) or {}).get("number")
+                if value is not None:
+                    found.setdefault(int(value), page["id"])
+        return found
+    
+    def resolve_property_ids(self, db_id: str, names: List[str]) -> List[str]:
+        """Map property names (or ids) to the property ids filter_properties expects.
+        
+        Names the database does not have are dropped so a projection never fails
+        on an optional column. The shared client reads the schema through the
+        shared SchemaCache, so repeated queries cost no extra GET.
+        """
+        from services.schema import get_schema_cache  # services.schema imports this module
+        
+        cache = get_schema_cache()
+        db_info = cache.get(db_id) if cache.client is self else self.get_database(db_id)
+        if not db_info:
+            return list(names)
+        
+        schema = db_info.get("properties", {})
+        known_ids = {prop["id"] for prop in schema.values()}
+        ids = []
+        for name in names:
+            if name in schema:
+                ids.append(schema[name]["id"])
+            elif name in known_ids:
+                ids.append(name)
+        return ids
+    
+    def query_database(self, db_id: str, filter: Optional[Dict[str, Any]] = None,
+                       sorts: Optional[List[Dict[str, Any]]] = None,
+                       start_cursor: Optional[str] = None, page_size: int = 100,
+                       filter_property_ids: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Fetch a single page of query results; return None on API errors."""
+        payload: Dict[str, Any] = {"page_size": page_size}
+        if filter:
+            payload["filter"] = filter
+        if sorts:
+            payload["sorts"] = sorts
+        if start_cursor:
+            payload["start_cursor"] = start_cursor
+        params = [("filter_properties", prop_id) for prop_id in filter_property_ids or []]
+        
+        resp = self.post(f"databases/{db_id}/query", json=payload, params=params)
+        if resp.status_code != 200:
+            print(f"❌ Failed to query database {db_id}: {resp.status_code} {resp.text}")
+            return None
+        return resp.json()
+    
+    def iter_database_pages(self, db_id: str, filter: Optional[Dict[str, Any]] = None,
+                            sorts: Optional[List[Dict[str, Any]]] = None,
+                            filter_properties: Optional[List[str]] = None,
+                            page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Stream every page of a database query, following next_cursor.
+        
+        ``filter`` and ``sorts`` are Notion query objects evaluated server-side;
+        ``filter_properties`` limits the returned properties to the named columns.
+        The next batch is fetched in the background while the caller works
+        through the current one, so at most two batches are held in memory.
+        Raises RuntimeError when a batch cannot be fetched, so a listing that
+        was cut short is never mistaken for a complete one.
+        """
+        property_ids = None
+        if filter_properties:
+            property_ids = self.resolve_property_ids(db_id, filter_properties)
+        
+        def fetch(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+            return self.query_database(db_id, filter, sorts, cursor, page_size, property_ids)
+        
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            pending = prefetch.submit(fetch, None)
+            while pending is not None:
+                data = pending.result()
+                if data is None:
+                    raise RuntimeError(f"query of database {db_id} failed before the last page of results")
+                pending = None
+                if data.get("has_more") and data.get("next_cursor"):
+                    pending = prefetch.submit(fetch, data["next_cursor"])
+                yield from data.get("results", [])
+
+
+_client: Optional[NotionClient] = None
+_client_lock = threading.Lock()
+
+
+def get_notion_client() -> NotionClient:
+    """Return the process-wide Notion client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = NotionClient()
+    return _client
+
+
+def iter_database_pages(db_id: str, filter: Optional[Dict[str, Any]] = None,
+                        sorts: Optional[List[Dict[str, Any]]] = None,
+                        filter_properties: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Stream all pages of a database through the shared client."""
+    return get_notion_client().iter_database_pages(db_id, filter, sorts, filter_properties)
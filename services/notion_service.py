@@ -1,12 +1,47 @@
 """Notion API service for managing databases and pages."""
 
-import json
-import time
 from typing import Dict, List, Optional
-import requests
 
 from config import Config
 from models import WeekItem
+from services.concurrency import TaskResult, create_unique, run_ordered
+from services.notion_client import get_notion_client
+from services.page_template import Getter, PageTemplate
+
+# Map month numbers to descriptive names
+MONTH_NAMES = {
+    1: "Month 1: SQL & ETL Basics",
+    2: "Month 2: Data Warehousing",
+    3: "Month 3: DataOps & Automation",
+    4: "Month 4: Big Data Processing",
+    5: "Month 5: Real-Time Streaming",
+    6: "Month 6: Capstone Projects"
+}
+
+
+def _priority(week: WeekItem) -> str:
+    """Set priority based on week number."""
+    if week.week <= 8:
+        return "🔥 High"
+    elif week.week <= 16:
+        return "⚡ Medium"
+    return "📝 Low"
+
+
+# Per-row values spliced into the page template; everything else is prebuilt
+PAGE_GETTERS: Dict[str, Getter] = {
+    "Week": lambda w, urls: w.week,
+    "Month": lambda w, urls: MONTH_NAMES.get(w.month, f"Month {w.month}"),
+    "Learning Topic": lambda w, urls: w.topic,
+    "Project Phase": lambda w, urls: w.project,
+    "Details": lambda w, urls: w.details or "",
+    "GitHub Repo": lambda w, urls: urls.get(w.repo_hint or "", "") or None,
+    "Dataset/Resource": lambda w, urls: w.dataset_url or None,
+    "Priority": lambda w, urls: _priority(w),
+    "Week Timeline": lambda w, urls: w.due_label,
+}
+
+PAGE_CONSTANTS = {"Status": "📋 To Do"}
 
 
 class NotionService:
@@ -14,8 +49,8 @@ class NotionService:
     
     def __init__(self):
         self.config = Config()
-        self.base_url = self.config.NOTION_BASE
-        self.headers = self.config.get_headers("notion")
+        self.client = get_notion_client()
+        self._templates: Dict[str, PageTemplate] = {}
     
     def create_database(self, title: str = "6‑Month Data Engineering Career Plan") -> Optional[str]:
         """Create a Notion database with the roadmap structure."""
@@ -23,42 +58,69 @@ class NotionService:
             print("[Notion] Skipping (missing env vars)")
             return None
         
-        url = f"{self.base_url}/databases"
+        parent_id = self.config.NOTION_PARENT_PAGE_ID
         payload = self._build_database_payload(title)
         
         try:
-            resp = requests.post(url, headers=self.headers, data=json.dumps(payload))
-            if resp.status_code == 200:
-                db_id = resp.json()["id"]
-                print(f"[Notion] Database created: {db_id}")
+            db_id = self.client.find_child_database(parent_id, title)
+            if db_id:
+                print(f"[Notion] Database exists: {db_id}")
                 return db_id
-            else:
-                print(f"[Notion] Create DB response: {resp.status_code} {resp.text}")
-                return None
+            db_id = create_unique(lambda: self.client.post("databases", json=payload),
+                                  lambda: self.client.find_child_database(parent_id, title))
+            print(f"[Notion] Database created: {db_id}")
+            return db_id
         except Exception as e:
             print(f"[Notion] Error creating database: {e}")
             return None
     
-    def add_weeks_to_database(self, db_id: str, weeks: List[WeekItem], repo_urls: Dict[str, str]):
-        """Add all 24 weeks as pages in the Notion database."""
+    def add_weeks_to_database(self, db_id: str, weeks: List[WeekItem], repo_urls: Dict[str, str],
+                              max_workers: Optional[int] = None) -> List[TaskResult[WeekItem]]:
+        """Add all 24 weeks as pages in the Notion database.
+        
+        Weeks that already have a row (matched by Week number in one query) are
+        reused instead of duplicated. Pages are created ``max_workers`` at a time
+        under the shared rate limiter; results come back in week order with
+        per-week failures collected.
+        """
         if not db_id:
-            return
+            return []
+        
+        workers = max_workers or self.config.NOTION_MAX_WORKERS
+        self._page_template(db_id)
+        try:
+            existing = self.client.find_pages_by_number(db_id, "Week", [week.week for week in weeks])
+        except RuntimeError as e:
+            print(f"[Notion] Could not check existing weeks: {e}")
+            return []
+        
+        def ensure_page(week: WeekItem) -> str:
+            return existing.get(week.week) or self._create_week_page(db_id, week, repo_urls)
         
-        url = f"{self.base_url}/pages"
+        results = run_ordered(ensure_page, weeks, workers)
         
-        for week in weeks:
-            try:
-                page_payload = self._build_page_payload(db_id, week, repo_urls)
-                resp = requests.post(url, headers=self.headers, data=json.dumps(page_payload))
-                
-                if resp.status_code != 200:
-                    print(f"[Notion] Failed to add Week {week.week}: {resp.status_code} {resp.text}")
-                else:
-                    print(f"[Notion] Added Week {week.week}")
-                
-                time.sleep(0.2)  # Rate limiting
-            except Exception as e:
-                print(f"[Notion] Error adding Week {week.week}: {e}")
+        for result in results:
+            if result.ok and result.item.week in existing:
+                print(f"[Notion] Week {result.item.week} already exists")
+            elif result.ok:
+                print(f"[Notion] Added Week {result.item.week}")
+            else:
+                print(f"[Notion] Failed to add Week {result.item.week}: {result.error}")
+        
+        failed = [r.item.week for r in results if not r.ok]
+        if failed:
+            print(f"[Notion] {len(failed)}/{len(results)} weeks failed: {failed}")
+        return results
+    
+    def _create_week_page(self, db_id: str, week: WeekItem, repo_urls: Dict[str, str]) -> str:
+        """Create one week page, retrying transient failures; return the page id.
+        
+        Before a retry the page is looked up by Week number, so a create that
+        timed out but landed is not sent twice.
+        """
+        body = self._page_template(db_id).render_json(week, repo_urls)
+        return create_unique(lambda: self.client.post("pages", data=body),
+                             lambda: self.client.find_pages_by_number(db_id, "Week", [week.week]).get(week.week))
     
     def _build_database_payload(self, title: str) -> Dict:
         """Build the payload for creating a Notion database."""
@@ -95,40 +157,15 @@ class NotionService:
             }
         }
     
+    def _page_template(self, db_id: str) -> PageTemplate:
+        """Return the compiled page template for a database, building it on first use."""
+        template = self._templates.get(db_id)
+        if template is None:
+            schema = {name: next(iter(spec)) for name, spec in self._build_database_payload("")["properties"].items()}
+            template = PageTemplate.compile(db_id, schema, PAGE_GETTERS, PAGE_CONSTANTS)
+            self._templates[db_id] = template
+        return template
+    
     def _build_page_payload(self, db_id: str, week: WeekItem, repo_urls: Dict[str, str]) -> Dict:
         """Build the payload for creating a page in the database."""
-        github_url = repo_urls.get(week.repo_hint or "", "")
-        
-        # Map month numbers to descriptive names
-        month_names = {
-            1: "Month 1: SQL & ETL Basics",
-            2: "Month 2: Data Warehousing", 
-            3: "Month 3: DataOps & Automation",
-            4: "Month 4: Big Data Processing",
-            5: "Month 5: Real-Time Streaming",
-            6: "Month 6: Capstone Projects"
-        }
-        
-        # Set priority based on week number
-        if week.week <= 8:
-            priority = "🔥 High"
-        elif week.week <= 16:
-            priority = "⚡ Medium"
-        else:
-            priority = "📝 Low"
-        
-        return {
-            "parent": {"database_id": db_id},
-            "properties": {
-                "Week": {"number": week.week},
-                "Month": {"select": {"name": month_names.get(week.month, f"Month {week.month}")}},
-                "Learning Topic": {"title": [{"type": "text", "text": {"content": week.topic}}]},
-                "Project Phase": {"rich_text": [{"type": "text", "text": {"content": week.project}}]},
-                "Details": {"rich_text": [{"type": "text", "text": {"content": week.details or ""}}]},
-                "Status": {"select": {"name": "📋 To Do"}},
-                "GitHub Repo": {"url": github_url or None},
-                "Dataset/Resource": {"url": week.dataset_url or None},
-                "Priority": {"select": {"name": priority}},
-                "Week Timeline": {"rich_text": [{"type": "text", "text": {"content": week.due_label}}]},
-            }
-        }
\ No newline at end of file
+        return self._page_template(db_id).render(week, repo_urls)
@@ -0,0 +1,89 @@
+"""Precompiled page payload templates for bulk page creation."""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from models import WeekItem
+
+try:
+    import orjson
+    
+    JSON_BACKEND = "orjson"
+    
+    def encode_json(value: Any) -> bytes:
+        """Serialize a value to UTF-8 JSON (orjson backend)."""
+        return orjson.dumps(value)
+except ImportError:
+    JSON_BACKEND = "json"
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    
+    def encode_json(value: Any) -> bytes:
+        """Serialize a value to UTF-8 JSON (stdlib backend)."""
+        return _encoder.encode(value).encode("utf-8")
+
+
+Getter = Callable[[WeekItem, Dict[str, str]], Any]
+
+# Property type -> (JSON before the value, JSON after the value, dict builder)
+_WRAPPERS: Dict[str, Tuple[str, str, Callable[[Any], Dict[str, Any]]]] = {
+    "number": ('{"number":', "}", lambda v: {"number": v}),
+    "url": ('{"url":', "}", lambda v: {"url": v}),
+    "select": ('{"select":{"name":', "}}", lambda v: {"select": {"name": v}}),
+    "status": ('{"status":{"name":', "}}", lambda v: {"status": {"name": v}}),
+    "title": ('{"title":[{"type":"text","text":{"content":', "}}]}",
+              lambda v: {"title": [{"type": "text", "text": {"content": v}}]}),
+    "rich_text": ('{"rich_text":[{"type":"text","text":{"content":', "}}]}",
+                  lambda v: {"rich_text": [{"type": "text", "text": {"content": v}}]}),
+}
+
+
+class PageTemplate:
+    """Page payload for one database with the static JSON prebuilt.
+    
+    Compiling walks the schema once: properties with constant values are
+    serialized completely, the rest become (prefix, suffix, getter) slots. A row
+    then only needs its per-row values encoded and spliced between fragments.
+    """
+    
+    def __init__(self, db_id: str, slots: List[Tuple[str, bytes, bytes, Callable, Getter]], static: bytes,
+                 constants: Dict[str, Dict[str, Any]]):
+        self.db_id = db_id
+        self._slots = slots
+        self._static = static
+        self._constants = constants
+        self._head = encode_json({"database_id": db_id})
+    
+    @classmethod
+    def compile(cls, db_id: str, schema: Dict[str, str], getters: Dict[str, Getter],
+                constants: Optional[Dict[str, Any]] = None) -> "PageTemplate":
+        """Build a template from ``{property: type}``, per-row getters and constant values."""
+        constants = constants or {}
+        slots = []
+        static_parts = []
+        constant_props = {}
+        for name, prop_type in schema.items():
+            if prop_type not in _WRAPPERS or (name not in getters and name not in constants):
+                continue
+            before, after, build = _WRAPPERS[prop_type]
+            key = encode_json(name) + b":"
+            if name in constants:
+                value = build(constants[name])
+                constant_props[name] = value
+                static_parts.append(key + encode_json(value))
+            else:
+                slots.append((name, key + before.encode("utf-8"), after.encode("utf-8"), build, getters[name]))
+        return cls(db_id, slots, b",".join(static_parts), constant_props)
+    
+    def render(self, week: WeekItem, repo_urls: Dict[str, str]) -> Dict[str, Any]:
+        """Build the payload as a dict."""
+        properties = {name: build(getter(week, repo_urls)) for name, _, _, build, getter in self._slots}
+        properties.update(self._constants)
+        return {"parent": {"database_id": self.db_id}, "properties": properties}
+    
+    def render_json(self, week: WeekItem, repo_urls: Dict[str, str]) -> bytes:
+        """Build the payload as request-ready JSON bytes."""
+        parts = [prefix + encode_json(getter(week, repo_urls)) + suffix
+                 for _, prefix, suffix, _, getter in self._slots]
+        if self._static:
+            parts.append(self._static)
+        return b'{"parent":' + self._head + b',"properties":{' + b",".join(parts) + b"}}"
@@ -0,0 +1,224 @@
+"""Execution plans: record every write a run would make, estimate it, and apply it later."""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from services.concurrency import run_ordered, send_with_retries
+from services.github_client import get_github_client
+from services.http_client import ApiClient
+from services.journal import MutationJournal
+from services.notion_client import get_notion_client
+
+# "{ref:<key>}" inside a path or body string is replaced by the id returned by call <key>
+REF_PATTERN = re.compile(r"\{ref:([^}]+)\}")
+
+
+@dataclass
+class PlannedCall:
+    """One write request, ready to be sent as-is (apart from ``{ref:...}`` ids).
+    
+    ``key`` names the call in the apply journal and for references from later
+    phases. Calls in one phase are independent; phases run in order. ``ledger``
+    optionally names a ``[journal, key]`` to acknowledge once the call lands, so
+    the scripts that keep their own ledgers see the work as done. Calls that are
+    not ``idempotent`` (creates, block appends) are never retried blindly.
+    """
+    service: str
+    method: str
+    path: str
+    key: str
+    body: Optional[Dict[str, Any]] = None
+    label: str = ""
+    phase: int = 0
+    ledger: Optional[List[str]] = None
+    idempotent: bool = True
+
+
+@dataclass
+class ExecutionPlan:
+    """Ordered list of planned calls with a request-count and wall-time estimate."""
+    name: str
+    calls: List[PlannedCall] = field(default_factory=list)
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    
+    def add(self, service: str, method: str, path: str, key: str, body: Optional[Dict[str, Any]] = None,
+            label: str = "", phase: int = 0, ledger: Optional[List[str]] = None,
+            idempotent: bool = True) -> PlannedCall:
+        call = PlannedCall(service, method, path, key, body, label, phase, ledger, idempotent)
+        self.calls.append(call)
+        return call
+    
+    def __len__(self) -> int:
+        return len(self.calls)
+    
+    def phases(self) -> List[int]:
+        return sorted({call.phase for call in self.calls})
+    
+    def counts(self) -> Counter:
+        """Count calls per ``"service METHOD endpoint"`` (ids collapsed)."""
+        return Counter(f"{call.service} {call.method} {_endpoint(call.path)}" for call in self.calls)
+    
+    def estimate(self, latency: Optional[float] = None, max_workers: Optional[int] = None) -> Dict[str, float]:
+        """Estimate apply wall time per service (seconds) under the configured limits.
+        
+        Notion calls run ``max_workers`` at a time but no faster than the token
+        bucket allows (``NOTION_BURST`` immediately, then ``NOTION_RATE_LIMIT``
+        per second); GitHub calls run one at a time. Phases run back to back.
+        """
+        latency = Config.PLAN_REQUEST_LATENCY if latency is None else latency
+        workers = max_workers or Config.NOTION_MAX_WORKERS
+        totals: Dict[str, float] = {}
+        for phase in self.phases():
+            per_service = Counter(call.service for call in self.calls if call.phase == phase)
+            for service, n in per_service.items():
+                if service == "notion":
+                    seconds = max(latency * math.ceil(n / workers),
+                                  max(0, n - Config.NOTION_BURST) / Config.NOTION_RATE_LIMIT)
+                else:
+                    seconds = latency * n
+                totals[service] = totals.get(service, 0.0) + seconds
+        return totals
+    
+    def print_summary(self):
+        """Print request counts and the wall-time estimate."""
+        if not self.calls:
+            print(f"✅ Plan '{self.name}': nothing to do - 0 requests")
+            return
+        print(f"📋 Plan '{self.name}': {len(self.calls)} requests in {len(self.phases())} phase(s)")
+        for endpoint, n in sorted(self.counts().items()):
+            print(f"   {n:>5}  {endpoint}")
+        estimate = self.estimate()
+        for service, seconds in sorted(estimate.items()):
+            print(f"   ⏱️  {service}: ~{seconds:.1f}s")
+        print(f"   ⏱️  total: ~{sum(estimate.values()):.1f}s "
+              f"(at {Config.NOTION_RATE_LIMIT:g} req/s Notion, {Config.PLAN_REQUEST_LATENCY:g}s per request)")
+    
+    def save(self, path: str):
+        """Write the plan as JSON (atomically)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"name": self.name, "created_at": self.created_at,
+                       "calls": [asdict(call) for call in self.calls]}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+    
+    @classmethod
+    def load(cls, path: str) -> "ExecutionPlan":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["name"], [PlannedCall(**call) for call in data.get("calls", [])], data.get("created_at", ""))
+
+
+def _endpoint(path: str) -> str:
+    """Collapse ids, refs and repo paths so calls group by endpoint (``pages/{id}``)."""
+    if "/contents/" in path:
+        return "repos/{owner}/{repo}/contents/{path}"
+    parts = []
+    for part in path.split("?")[0].split("/"):
+        if REF_PATTERN.fullmatch(part) or re.fullmatch(r"[0-9a-f-]{32,36}", part):
+            part = "{id}"
+        parts.append(part)
+    return "/".join(parts)
+
+
+def _resolve(value: Any, ids: Dict[str, Any]) -> Any:
+    """Substitute ``{ref:key}`` placeholders with ids returned by earlier calls."""
+    if isinstance(value, str):
+        def lookup(match: re.Match) -> str:
+            if match.group(1) not in ids:
+                raise RuntimeError(f"unresolved reference {match.group(0)}")
+            return str(ids[match.group(1)])
+        return REF_PATTERN.sub(lookup, value)
+    if isinstance(value, dict):
+        return {k: _resolve(v, ids) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve(v, ids) for v in value]
+    return value
+
+
+def apply_plan(plan: ExecutionPlan, max_workers: Optional[int] = None,
+               clients: Optional[Dict[str, ApiClient]] = None) -> bool:
+    """Send every planned call, phase by phase, without re-reading any state.
+    
+    Notion calls in a phase run concurrently under the shared rate limiter and
+    GitHub calls run one at a time. Each call is acknowledged in a journal named
+    after the plan and its timestamp, with the id it returned, so an interrupted
+    apply resumes with only the calls that never landed. Calls the API rejected
+    with an error response are recorded as failed and resent by the next apply; a
+    non-idempotent call whose outcome is unknown (the apply died or the connection
+    dropped mid-request) is not resent, since it may have landed; re-plan instead.
+    Returns True when all calls landed.
+    """
+    if not plan.calls:
+        print("✅ Nothing to apply")
+        return True
+    
+    clients = clients or {"notion": get_notion_client(), "github": get_github_client()}
+    journal = MutationJournal(f"apply-{plan.name}-{re.sub(r'[^0-9]', '', plan.created_at)[:14]}")
+    ledgers: Dict[str, MutationJournal] = {}
+    ledger_lock = threading.Lock()
+    ids: Dict[str, Any] = {call.key: journal.result(call.key) for call in plan.calls if journal.done(call.key)}
+    if ids:
+        print(f"♻️  Resuming: {len(ids)}/{len(plan.calls)} calls already applied ({journal.path})")
+    
+    def send(call: PlannedCall) -> Any:
+        path = _resolve(call.path, ids)
+        body = _resolve(call.body, ids)
+        client = clients[call.service]
+        if not call.idempotent and journal.in_doubt(call.key):
+            raise RuntimeError("an earlier apply may have sent this already; re-plan to check")
+        journal.plan(call.key, call.label or None)
+        resp = send_with_retries(lambda: client.request(call.method, path, json=body),
+                                 attempts=3 if call.idempotent else 1)
+        if resp.status_code >= 300:
+            # A definite error response means the write did not happen
+            journal.fail(call.key, resp.status_code)
+            raise RuntimeError(f"{resp.status_code} {resp.text[:200]}")
+        try:
+            result = resp.json().get("id") or True
+        except ValueError:
+            result = True
+        journal.ack(call.key, result)
+        if call.ledger:
+            ledger_name, ledger_key = call.ledger
+            with ledger_lock:
+                if ledger_name not in ledgers:
+                    ledgers[ledger_name] = MutationJournal(ledger_name)
+            ledgers[ledger_name].ack(ledger_key, True)
+        return result
+    
+    started = time.monotonic()
+    failed = 0
+    for phase in plan.phases():
+        pending = [call for call in plan.calls if call.phase == phase and not journal.done(call.key)]
+        for service, workers in (("github", 1), ("notion", max_workers or Config.NOTION_MAX_WORKERS)):
+            batch = [call for call in pending if call.service == service]
+            for result in run_ordered(send, batch, workers):
+                if result.ok:
+                    ids[result.item.key] = result.value
+                    print(f"   ✅ {result.item.label or result.item.key}")
+                else:
+                    failed += 1
+                    print(f"   ❌ {result.item.label or result.item.key}: {result.error}")
+        if failed:
+            print(f"⚠️  Stopping after phase {phase}: later phases may depend on the failed calls")
+            break
+    
+    for ledger in ledgers.values():
+        ledger.close()
+    elapsed = time.monotonic() - started
+    if failed:
+        journal.close()
+        print(f"❌ {failed} calls failed after {elapsed:.1f}s; re-run apply to retry them ({journal.path})")
+        return False
+    journal.complete()
+    print(f"🎉 Applied {len(plan.calls)} calls in {elapsed:.1f}s")
+    return True
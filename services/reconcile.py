@@ -0,0 +1,108 @@
+"""Desired-state reconciliation for roadmap database pages."""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from services.concurrency import TaskResult
+from services.journal import MutationJournal
+from services.mutation_buffer import MutationBuffer, PagePatch
+from services.notion_client import NotionClient, get_notion_client
+from services.schema import SchemaCache, get_schema_cache
+
+# Desired state: week number -> {property name: Notion property write payload}
+DesiredState = Dict[int, Dict[str, Dict[str, Any]]]
+
+
+def comparable_value(prop: Optional[Dict[str, Any]]) -> Any:
+    """Reduce a property (as read from the API or as a write payload) to a comparable value."""
+    if not prop:
+        return None
+    prop_type = prop.get("type") or next(iter(prop), None)
+    value = prop.get(prop_type)
+    
+    if prop_type in ("title", "rich_text"):
+        return "".join(
+            item.get("plain_text") or item.get("text", {}).get("content", "")
+            for item in value or []
+        )
+    elif prop_type in ("select", "status"):
+        return value.get("name") if value else None
+    elif prop_type == "multi_select":
+        return sorted(option.get("name", "") for option in value or [])
+    return value
+
+
+def text_property(kind: str, content: str) -> Dict[str, Any]:
+    """Build a title/rich_text write payload."""
+    return {kind: [{"type": "text", "text": {"content": content}}]}
+
+
+class Reconciler:
+    """Diff desired page state against a database and send only the PATCHes that change something."""
+    
+    def __init__(self, db_id: str, client: Optional[NotionClient] = None,
+                 schema_cache: Optional[SchemaCache] = None):
+        self.db_id = db_id
+        self.client = client or get_notion_client()
+        self.schema_cache = schema_cache or (SchemaCache(client) if client else get_schema_cache())
+    
+    def plan(self, desired: DesiredState, defaults: Optional[Dict[str, Dict[str, Any]]] = None,
+             contains_ok: Iterable[str] = (), planned_properties: Iterable[str] = ()) -> Optional[List[PagePatch]]:
+        """Compute the patches needed, in week order (None when the pages could not be read).
+        
+        ``desired`` values are enforced; ``defaults`` are only written to pages
+        where the property is still empty. Text properties named in
+        ``contains_ok`` are left alone when the current text already contains the
+        desired text (e.g. decorated titles). Properties the database does not
+        have are ignored, except ``planned_properties``: columns a plan adds
+        before the page updates run, diffed as empty on every page.
+        """
+        defaults = defaults or {}
+        contains_ok = set(contains_ok)
+        schema = self.schema_cache.properties(self.db_id)
+        if not schema:
+            return []
+        
+        planned = set(planned_properties) - set(schema)
+        wanted = {name for props in desired.values() for name in props} | set(defaults)
+        wanted &= set(schema) | planned
+        pages = self.client.iter_database_pages(
+            self.db_id,
+            filter={"property": "Week", "number": {"is_not_empty": True}},
+            filter_properties=["Week", *sorted(wanted - planned)],
+        )
+        
+        patches = []
+        try:
+            for page in pages:
+                current = page.get("properties", {})
+                week = (current.get("Week") or {}).get("number")
+                if week not in desired:
+                    continue
+                
+                changes = {}
+                for name, payload in desired[week].items():
+                    if name not in wanted:
+                        continue
+                    have, want = comparable_value(current.get(name)), comparable_value(payload)
+                    if have == want or (name in contains_ok and isinstance(have, str) and want in have):
+                        continue
+                    changes[name] = payload
+                for name, payload in defaults.items():
+                    if name in wanted and comparable_value(current.get(name)) in (None, "", []):
+                        changes[name] = payload
+                
+                if changes:
+                    patches.append(PagePatch(page["id"], int(week), changes))
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return None
+        
+        patches.sort(key=lambda patch: patch.week)
+        return patches
+    
+    def apply(self, patches: List[PagePatch], max_workers: Optional[int] = None,
+              journal: Optional[MutationJournal] = None) -> List[TaskResult[PagePatch]]:
+        """Send the planned patches concurrently and report them in week order."""
+        buffer = MutationBuffer(self.client)
+        buffer.extend(patches)
+        return buffer.flush(max_workers, journal)
@@ -0,0 +1,136 @@
+"""Database schema cache and schema-compiled property encoders."""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from models import WeekItem
+from services.notion_client import NotionClient, get_notion_client
+
+
+class SchemaCache:
+    """TTL cache of database objects so repeated schema lookups cost no requests."""
+    
+    def __init__(self, client: Optional[NotionClient] = None, ttl: Optional[float] = None):
+        self.client = client or get_notion_client()
+        self.ttl = Config.SCHEMA_CACHE_TTL if ttl is None else ttl
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, db_id: str) -> Optional[Dict[str, Any]]:
+        """Return the database object, fetching it only when missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(db_id)
+        if entry and entry[0] > now:
+            return entry[1]
+        
+        db_info = self.client.get_database(db_id)
+        if db_info:
+            with self._lock:
+                self._entries[db_id] = (now + self.ttl, db_info)
+        return db_info
+    
+    def properties(self, db_id: str) -> Dict[str, Any]:
+        """Return the property schema of a database (empty if unavailable)."""
+        db_info = self.get(db_id)
+        return db_info.get("properties", {}) if db_info else {}
+    
+    def invalidate(self, db_id: Optional[str] = None):
+        """Drop one database (or everything) after a schema change."""
+        with self._lock:
+            if db_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(db_id, None)
+
+
+_cache: Optional[SchemaCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_schema_cache() -> SchemaCache:
+    """Return the process-wide schema cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SchemaCache()
+    return _cache
+
+
+def _text(kind: str, content: str) -> Dict[str, Any]:
+    return {kind: [{"type": "text", "text": {"content": content}}]}
+
+
+def _priority(w: WeekItem) -> str:
+    return "High" if w.month <= 2 else "Medium" if w.month <= 4 else "Low"
+
+
+FieldEncoder = Callable[[WeekItem, Dict[str, str]], Optional[Dict[str, Any]]]
+
+# WeekItem field -> accepted property names, in lookup order
+PROPERTY_ALIASES: Dict[str, List[str]] = {
+    "week": ["Week", "week", "Week #", "Week Number"],
+    "month": ["Month", "month", "Month #"],
+    "topic": ["Learning Topic", "Topic", "Learning", "Title", "Name"],
+    "details": ["Details", "Description", "Notes", "Content"],
+    "project": ["Project Phase", "Project", "Phase"],
+    "status": ["Status", "status"],
+    "priority": ["Priority", "priority"],
+    "github": ["GitHub", "Github", "Repo", "Repository"],
+    "dataset": ["Dataset", "Data", "Source"],
+}
+
+# (field, property type) -> payload builder; None results are left out of the page
+FIELD_ENCODERS: Dict[Tuple[str, str], FieldEncoder] = {
+    ("week", "number"): lambda w, urls: {"number": w.week},
+    ("month", "select"): lambda w, urls: {"select": {"name": str(w.month)}},
+    ("month", "number"): lambda w, urls: {"number": w.month},
+    ("topic", "title"): lambda w, urls: _text("title", w.topic),
+    ("details", "rich_text"): lambda w, urls: _text("rich_text", w.details or ""),
+    ("project", "rich_text"): lambda w, urls: _text("rich_text", w.project),
+    ("status", "select"): lambda w, urls: {"select": {"name": "To Do"}},
+    ("priority", "select"): lambda w, urls: {"select": {"name": _priority(w)}},
+    ("github", "url"): lambda w, urls: {"url": urls[w.repo_hint]} if urls.get(w.repo_hint or "") else None,
+    ("dataset", "url"): lambda w, urls: {"url": w.dataset_url} if w.dataset_url else None,
+}
+
+
+class PropertyEncoder:
+    """WeekItem -> page properties encoder compiled once from a database schema.
+    
+    Alias matching and type dispatch happen at compile time; encoding a week is
+    then one builder call per mapped property.
+    """
+    
+    def __init__(self, fields: List[Tuple[str, FieldEncoder]]):
+        self.fields = fields
+    
+    @classmethod
+    def compile(cls, schema: Dict[str, Any]) -> "PropertyEncoder":
+        """Pick the first aliased property per field whose type we know how to write."""
+        fields = []
+        for field_name, names in PROPERTY_ALIASES.items():
+            for prop_name, prop in schema.items():
+                if prop_name in names:
+                    encoder = FIELD_ENCODERS.get((field_name, prop.get("type", "")))
+                    if encoder:
+                        fields.append((prop_name, encoder))
+                    break
+        return cls(fields)
+    
+    @property
+    def property_names(self) -> List[str]:
+        return [name for name, _ in self.fields]
+    
+    def encode(self, week: WeekItem, repo_urls: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Build the properties payload for one week."""
+        repo_urls = repo_urls or {}
+        properties = {}
+        for prop_name, encoder in self.fields:
+            value = encoder(week, repo_urls)
+            if value is not None:
+                properties[prop_name] = value
+        return properties
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Bring the roadmap database to its desired state in one pass.
+
+The desired state combines:
+- Clean Learning Topic titles, Details, Project Phase and Dataset/Resource from RoadmapData
+- A default "Not started" Status 1 for pages without a status
+- Daily subtask checklists from the CSV plan (appended once per page)
+
+Only pages whose current values differ are patched, so re-running this on an
+up-to-date database makes no writes.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+from add_subtasks_from_csv import add_subtasks_to_notion, parse_csv_file, plan_subtask_blocks
+from clean_titles import clean_title
+from enhance_best_database import build_enhanced_state
+from models import RoadmapData
+from services.reconcile import DesiredState, Reconciler, text_property
+
+load_dotenv()
+
+NOTION_TOKEN = os.getenv("NOTION_TOKEN")
+
+# The enhanced database ID
+ENHANCED_DB_ID = "2600693c-0443-81cc-ac0e-e94f2fa52616"
+
+CSV_FILENAME = "data_engineering_6_month_plan_detailed.csv"
+
+STATUS_DEFAULTS = {"Status 1": {"status": {"name": "Not started"}}}
+
+def build_desired_state() -> DesiredState:
+    """Merge the per-stage desired properties into one state keyed by week."""
+    weeks = RoadmapData.build_weeks()
+    desired = build_enhanced_state(weeks)
+    
+    # Titles are enforced exactly, in their cleaned form
+    for week in weeks:
+        desired[week.week]["Learning Topic"] = text_property("title", clean_title(week.topic))
+    
+    return desired
+
+def sync_roadmap(db_id: str = ENHANCED_DB_ID, dry_run: bool = False) -> bool:
+    """Plan and apply the patches needed to reach the desired state."""
+    print("🧮 Computing desired state...")
+    desired = build_desired_state()
+    
+    print("🔍 Diffing against the database...")
+    reconciler = Reconciler(db_id)
+    patches = reconciler.plan(desired, defaults=STATUS_DEFAULTS)
+    if patches is None:
+        return False
+    
+    ok = True
+    if not patches:
+        print("✅ Properties already match the desired state - 0 writes needed.")
+    else:
+        print(f"📝 {len(patches)} pages need updates:")
+        for patch in patches:
+            print(f"   Week {patch.week}: {', '.join(patch.properties)}")
+    
+    if dry_run:
+        if os.path.exists(CSV_FILENAME):
+            pending = plan_subtask_blocks(parse_csv_file(CSV_FILENAME), db_id)
+            if pending is None:
+                return False
+            print(f"📋 {len(pending)} weeks need subtask checklists")
+        print("👋 Dry run - no changes sent.")
+        return True
+    
+    if patches:
+        results = reconciler.apply(patches)
+        success_count = sum(1 for r in results if r.ok)
+        print(f"\n🎉 Applied {success_count}/{len(patches)} page updates!")
+        ok = success_count == len(patches)
+    
+    if os.path.exists(CSV_FILENAME):
+        print("\n📋 Syncing subtask checklists...")
+        ok = add_subtasks_to_notion(CSV_FILENAME, db_id, confirm=False) and ok
+    else:
+        print(f"⚠️  CSV file not found, skipping subtasks: {CSV_FILENAME}")
+    return ok
+
+def main():
+    """Main function."""
+    print("🔁 Roadmap Desired-State Sync")
+    print("=" * 50)
+    print(f"Target database: {ENHANCED_DB_ID}")
+    
+    if not NOTION_TOKEN:
+        print("❌ NOTION_TOKEN not found")
+        return
+    
+    sync_roadmap()
+
+if __name__ == "__main__":
+    main()